@@ -0,0 +1,132 @@
+"""Compare the ORM and the Core-row read paths used to list items.
+
+Seeds a throwaway SQLite database and serializes the same page of items both
+ways, the way ``GET /items/`` did before and does now:
+
+* orm: ``select(Item)`` instances, validated into ``ItemSchema`` and encoded
+  through ``jsonable_encoder`` and ``json.dumps`` as a ``JSONResponse`` does.
+* core: ``select(*ITEM_COLUMNS)`` rows encoded by a prebuilt ``TypeAdapter``.
+
+Reports rows per second and the peak memory allocated per page. Run with:
+
+    uv run python -m learn_fastapi.benchmarks.item_reads --rows 10000 --page 100 1000
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from learn_fastapi.src.database import Base
+from learn_fastapi.src.items.models import Item
+from learn_fastapi.src.items.schema import ItemSchema
+from learn_fastapi.src.items.serializers import ITEM_COLUMNS, dump_items
+from learn_fastapi.src.utils.keys import uuid7_at
+
+REPEATS = 20
+INSERT_CHUNK = 10_000
+
+
+async def seed(session: AsyncSession, rows: int) -> None:
+    start = datetime(2026, 1, 1, tzinfo=UTC)
+    for chunk_start in range(0, rows, INSERT_CHUNK):
+        chunk = [
+            {
+                "id": uuid7_at(start + timedelta(milliseconds=index)),
+                "name": f"Item {index}",
+                "description": "Benchmark item description",
+                "price": float(index % 1000),
+                "tax": 1.0,
+                "image_url": "",
+                "created_at": start + timedelta(milliseconds=index),
+                "updated_at": start + timedelta(milliseconds=index),
+            }
+            for index in range(chunk_start, min(chunk_start + INSERT_CHUNK, rows))
+        ]
+        await session.execute(insert(Item), chunk)
+    await session.commit()
+
+
+async def orm_page(session: AsyncSession, page: int) -> bytes:
+    statement = select(Item).order_by(Item.created_at, Item.id).limit(page)
+    items = (await session.execute(statement)).scalars().all()
+    content = [ItemSchema.model_validate(item, from_attributes=True) for item in items]
+    body = json.dumps(jsonable_encoder(content), separators=(",", ":"))
+    # Like a request-scoped session, drop the instances the page loaded
+    session.expunge_all()
+    return body.encode()
+
+
+async def core_page(session: AsyncSession, page: int) -> bytes:
+    statement = select(*ITEM_COLUMNS).order_by(Item.created_at, Item.id).limit(page)
+    return dump_items((await session.execute(statement)).all())
+
+
+async def measure(
+    session: AsyncSession,
+    read_page: Callable[[AsyncSession, int], Awaitable[bytes]],
+    page: int,
+) -> tuple[float, float]:
+    """Time REPEATS reads of one page, then trace the allocations of one more.
+
+    Returns:
+        Rows per second (median) and peak KiB allocated while reading a page.
+
+    """
+    await read_page(session, page)
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        await read_page(session, page)
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    await read_page(session, page)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return page / statistics.median(timings), peak / 1024
+
+
+async def run(rows: int, pages: list[int]) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{Path(directory) / 'bench.db'}"
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+        async with session_factory() as session:
+            await seed(session, rows)
+            for page in pages:
+                assert json.loads(await orm_page(session, page)) == json.loads(  # noqa: S101
+                    await core_page(session, page)
+                )
+                for name, read_page in (("orm", orm_page), ("core", core_page)):
+                    rate, peak = await measure(session, read_page, page)
+                    print(
+                        f"page {page:>6,} | {name:<4} | {rate:>12,.0f} rows/s"
+                        f" | peak {peak:>10,.1f} KiB"
+                    )
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--page", type=int, nargs="+", default=[100, 1000])
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.page))
+
+
+if __name__ == "__main__":
+    main()
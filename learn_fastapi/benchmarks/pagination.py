@@ -0,0 +1,118 @@
+"""Compare offset and keyset (cursor) pagination on the items table.
+
+Seeds a throwaway SQLite database for each size and times fetching the last page
+both ways. Run with:
+
+    uv run python -m learn_fastapi.benchmarks.pagination --rows 10000 100000 1000000
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from learn_fastapi.src.database import Base
+from learn_fastapi.src.items.models import Item
+from learn_fastapi.src.utils.keys import uuid7_at
+
+PAGE_SIZE = 50
+REPEATS = 5
+INSERT_CHUNK = 10_000
+
+
+async def seed(engine: AsyncEngine, rows: int) -> tuple[datetime, uuid.UUID]:
+    """Insert ``rows`` items and return the keyset position before the last page.
+
+    Returns:
+        The ``(created_at, id)`` of the row preceding the final page.
+
+    """
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    start = datetime(2026, 1, 1, tzinfo=UTC)
+    boundary_index = rows - PAGE_SIZE - 1
+    boundary = (start, uuid7_at(start))
+    async with engine.begin() as conn:
+        for chunk_start in range(0, rows, INSERT_CHUNK):
+            chunk = []
+            for index in range(chunk_start, min(chunk_start + INSERT_CHUNK, rows)):
+                created_at = start + timedelta(milliseconds=index)
+                item_id = uuid7_at(created_at)
+                if index == boundary_index:
+                    boundary = (created_at, item_id)
+                chunk.append(
+                    {
+                        "id": item_id,
+                        "name": f"Item {index}",
+                        "description": "Benchmark item description",
+                        "price": float(index % 1000),
+                        "tax": 1.0,
+                        "image_url": "",
+                        "created_at": created_at,
+                        "updated_at": created_at,
+                    }
+                )
+            await conn.execute(insert(Item), chunk)
+    return boundary
+
+
+async def time_query(engine: AsyncEngine, statement: object) -> float:
+    """Run ``statement`` REPEATS times.
+
+    Returns:
+        The median wall time in milliseconds.
+
+    """
+    timings = []
+    async with engine.connect() as conn:
+        for _ in range(REPEATS):
+            started = time.perf_counter()
+            result = await conn.execute(statement)  # ty:ignore[invalid-argument-type]
+            result.fetchall()
+            timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+async def run(rows: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{Path(directory) / 'bench.db'}"
+        )
+        boundary = await seed(engine, rows)
+        ordered = select(Item).order_by(Item.created_at, Item.id).limit(PAGE_SIZE)
+
+        first_page = await time_query(engine, ordered)
+        offset_page = await time_query(engine, ordered.offset(rows - PAGE_SIZE))
+        keyset_page = await time_query(
+            engine,
+            ordered.where(tuple_(Item.created_at, Item.id) > tuple_(*boundary)),
+        )
+        await engine.dispose()
+
+    print(
+        f"{rows:>10,} rows | first page {first_page:8.2f} ms"
+        f" | last page offset {offset_page:8.2f} ms"
+        f" | last page cursor {keyset_page:8.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    args = parser.parse_args()
+    for rows in args.rows:
+        asyncio.run(run(rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Measure how much a burst of password hashes delays the rest of the event loop.
+
+A ticker coroutine sleeps for one millisecond in a loop and records how late it
+wakes up, standing in for every other request handled by the process, while a
+burst of concurrent Argon2 hashes runs either inline on the event loop or on
+the bounded worker pool used by ``/auth/register`` and ``/auth/token``.
+Run with:
+
+    uv run python -m learn_fastapi.benchmarks.password_hashing --burst 8 32
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+
+from learn_fastapi.src.auth.hashing import EXECUTORS, PasswordHashingPool
+from learn_fastapi.src.auth.utils import hash_password
+from learn_fastapi.src.config import settings
+
+TICK_SECONDS = 0.001
+PASSWORD = "correct horse battery staple"  # noqa: S105 - sample input
+
+
+async def ticker(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append((time.perf_counter() - started - TICK_SECONDS) * 1000)
+
+
+async def measure(
+    burst: int, hash_one: Callable[[], Awaitable[object]]
+) -> tuple[float, float, float]:
+    lags: list[float] = []
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(lags, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(hash_one() for _ in range(burst)))
+    elapsed = (time.perf_counter() - started) * 1000
+    stop.set()
+    await tick
+    return elapsed, statistics.quantiles(lags, n=100)[98], max(lags)
+
+
+async def run(burst: int) -> None:
+    async def inline() -> None:
+        hash_password(PASSWORD)
+
+    pool = PasswordHashingPool(
+        EXECUTORS["thread"],
+        max_workers=settings.password_hashing_workers,
+        max_queued=burst,
+    )
+
+    async def pooled() -> None:
+        await pool.hash(PASSWORD)
+
+    await pooled()  # start the workers outside the measurement
+    for label, hash_one in (("inline", inline), ("pool", pooled)):
+        elapsed, p99, worst = await measure(burst, hash_one)
+        print(
+            f"{burst:>4} hashes | {label:<6} | burst {elapsed:8.1f} ms"
+            f" | loop lag p99 {p99:7.2f} ms, max {worst:7.2f} ms"
+        )
+    pool.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--burst", type=int, nargs="+", default=[8, 32])
+    args = parser.parse_args()
+    for burst in args.burst:
+        asyncio.run(run(burst))
+
+
+if __name__ == "__main__":
+    main()
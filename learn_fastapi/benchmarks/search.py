@@ -0,0 +1,119 @@
+"""Compare a LIKE scan with the in-process search index used on SQLite.
+
+Seeds a throwaway SQLite database for each size with names and descriptions
+drawn from a small vocabulary, then times finding one ranked page of matches
+both ways; the LIKE scan has to fetch every match before it could rank them.
+Run with:
+
+    uv run python -m learn_fastapi.benchmarks.search --rows 10000 100000
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from sqlalchemy import insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from learn_fastapi.src.database import Base
+from learn_fastapi.src.items.models import Item
+from learn_fastapi.src.items.search import SearchIndex
+
+PAGE_SIZE = 20
+REPEATS = 5
+INSERT_CHUNK = 10_000
+QUERY = "walnut de"
+
+WORDS = (
+    *("oak", "walnut", "pine", "maple", "birch", "desk", "table", "chair", "lamp"),
+    *("shelf", "sofa", "bed", "rug", "mirror", "clock", "vase", "frame", "cabinet"),
+    *("drawer", "stool", "bench", "light", "reading", "writing", "dining"),
+    *("kitchen", "office", "garden", "modern", "classic", "rustic", "compact"),
+    *("large", "small", "solid"),
+)
+
+
+async def seed(engine: AsyncEngine, rows: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    generator = random.Random(rows)  # noqa: S311 - reproducible sample data
+    async with engine.begin() as conn:
+        for chunk_start in range(0, rows, INSERT_CHUNK):
+            chunk = [
+                {
+                    "id": uuid.uuid7(),
+                    "name": " ".join(generator.sample(WORDS, 3)).capitalize(),
+                    "description": " ".join(generator.sample(WORDS, 8)),
+                    "price": 1.0,
+                    "tax": 0.0,
+                    "image_url": "",
+                }
+                for _ in range(chunk_start, min(chunk_start + INSERT_CHUNK, rows))
+            ]
+            await conn.execute(insert(Item), chunk)
+
+
+async def median_ms(search: object) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        await search()  # ty:ignore[call-non-callable]
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+async def run(rows: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{Path(directory) / 'bench.db'}"
+        )
+        await seed(engine, rows)
+        terms = QUERY.split()
+        like = select(Item.id, Item.name).where(
+            *(
+                or_(Item.name.ilike(f"%{term}%"), Item.description.ilike(f"%{term}%"))
+                for term in terms
+            )
+        )
+        index = SearchIndex()
+
+        async with AsyncSession(engine) as session:
+
+            async def like_scan() -> None:
+                (await session.execute(like)).all()
+
+            async def indexed() -> None:
+                await index.refresh(session)
+                page = index.search(QUERY, PAGE_SIZE)
+                statement = select(Item.id, Item.name).where(Item.id.in_(page))  # ty:ignore[invalid-argument-type]
+                (await session.execute(statement)).all()
+
+            started = time.perf_counter()
+            await index.refresh(session)
+            build = (time.perf_counter() - started) * 1000
+            scan = await median_ms(like_scan)
+            lookup = await median_ms(indexed)
+        await engine.dispose()
+
+    print(
+        f"{rows:>10,} rows | LIKE scan {scan:8.2f} ms"
+        f" | index search {lookup:8.2f} ms | index build {build:9.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+    for rows in args.rows:
+        asyncio.run(run(rows))
+
+
+if __name__ == "__main__":
+    main()
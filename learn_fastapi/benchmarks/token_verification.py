@@ -0,0 +1,80 @@
+"""Compare verifying an access token on every request with the verified-token cache.
+
+Times ``jwt.decode`` plus building ``TokenData``, as ``verify_access_token``
+does on a cache miss, against a cache hit, for the configured HMAC algorithm
+and for the asymmetric ones a deployment may move to. Run with:
+
+    uv run python -m learn_fastapi.benchmarks.token_verification
+"""
+
+import argparse
+import hashlib
+import time
+from datetime import UTC, datetime, timedelta
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+from learn_fastapi.src.auth.schema import TokenData
+from learn_fastapi.src.utils.cache import LRUCache
+
+RSA_KEY_BITS = 2048
+RSA_PUBLIC_EXPONENT = 65537
+
+
+def keys(algorithm: str) -> tuple[object, object]:
+    if algorithm.startswith("RS"):
+        private = rsa.generate_private_key(
+            public_exponent=RSA_PUBLIC_EXPONENT, key_size=RSA_KEY_BITS
+        )
+        return private, private.public_key()
+    if algorithm.startswith("ES"):
+        private = ec.generate_private_key(ec.SECP256R1())
+        return private, private.public_key()
+    secret = "benchmark-secret-key-of-at-least-32-bytes"  # noqa: S105 - sample key
+    return secret, secret
+
+
+def per_call_us(function: object, calls: int) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        function()  # ty:ignore[call-non-callable]
+    return (time.perf_counter() - started) / calls * 1_000_000
+
+
+def run(algorithm: str, calls: int) -> None:
+    signing_key, verifying_key = keys(algorithm)
+    exp = datetime.now(tz=UTC) + timedelta(minutes=30)
+    token = jwt.encode({"sub": "user", "exp": exp}, signing_key, algorithm=algorithm)  # ty:ignore[invalid-argument-type]
+    cache: LRUCache[bytes, TokenData] = LRUCache(max_size=1024, ttl=0.0)
+
+    def decode() -> TokenData:
+        payload = jwt.decode(
+            token,
+            verifying_key,  # ty:ignore[invalid-argument-type]
+            algorithms=[algorithm],
+            options={"require": ["exp", "sub"]},
+        )
+        return TokenData(sub=payload["sub"], exp=payload["exp"])
+
+    def cached() -> TokenData | None:
+        return cache.get(hashlib.sha256(token.encode()).digest())
+
+    cache.set(hashlib.sha256(token.encode()).digest(), decode(), ttl=1800)
+    print(
+        f"{algorithm:>6} | decode {per_call_us(decode, calls):8.1f} us"
+        f" | cache hit {per_call_us(cached, calls):6.2f} us"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=5_000)
+    parser.add_argument("--algorithms", nargs="+", default=["HS256", "ES256", "RS256"])
+    args = parser.parse_args()
+    for algorithm in args.algorithms:
+        run(algorithm, args.calls)
+
+
+if __name__ == "__main__":
+    main()
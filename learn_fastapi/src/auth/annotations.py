@@ -1,7 +1,9 @@
+from datetime import datetime
 from typing import Annotated
 
-from fastapi import Depends
+from fastapi import Cookie, Depends
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from sqlalchemy import DateTime
 from sqlalchemy.orm import mapped_column
 
 # OAuth2 scheme definition
@@ -15,6 +17,7 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 str_idx_unique = Annotated[str, mapped_column(unique=True, index=True)]
 bool_default_true = Annotated[bool, mapped_column(default=True)]
 bool_default_false = Annotated[bool, mapped_column(default=False)]
+timestamp_tz = Annotated[datetime, mapped_column(DateTime(timezone=True))]
 
 # ---------------------------------------------------------------------------
 # Auth annotations
@@ -22,3 +25,4 @@ bool_default_false = Annotated[bool, mapped_column(default=False)]
 
 OAuth2PRFDep = Annotated[OAuth2PasswordRequestForm, Depends()]
 OAuth2_Dep = Annotated[str, Depends(oauth2_scheme)]
+RefreshTokenCookie = Annotated[str | None, Cookie()]
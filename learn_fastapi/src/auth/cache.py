@@ -0,0 +1,80 @@
+from typing import Annotated, Any
+from uuid import UUID
+
+from fastapi import Depends
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from learn_fastapi.src.config import settings
+from learn_fastapi.src.utils.cache import CacheBackend, LRUCache
+from learn_fastapi.src.utils.metrics import register_metrics
+
+from .models import User
+from .schema import TokenData, UserResponse
+
+_principal_cache: CacheBackend[UUID, UserResponse] = LRUCache(
+    max_size=settings.principal_cache_max_size,
+    ttl=settings.principal_cache_ttl_seconds,
+)
+register_metrics("auth.principal_cache", _principal_cache.stats)
+
+
+def get_principal_cache() -> CacheBackend[UUID, UserResponse]:
+    """Return the cache of authenticated users, keyed by user id.
+
+    Override this dependency to plug in a shared backend (e.g. Redis).
+
+    Returns:
+        The active principal cache backend.
+
+    """
+    return _principal_cache
+
+
+PrincipalCacheDep = Annotated[
+    CacheBackend[UUID, UserResponse], Depends(get_principal_cache)
+]
+
+# Entries expire with their token; the default TTL is never used
+_token_cache: CacheBackend[bytes, TokenData] = LRUCache(
+    max_size=settings.token_cache_max_size, ttl=0.0
+)
+register_metrics("auth.token_cache", _token_cache.stats)
+
+
+def get_token_cache() -> CacheBackend[bytes, TokenData]:
+    """Return the cache of verified access tokens, keyed by their SHA-256.
+
+    Returns:
+        The active token cache backend.
+
+    """
+    return _token_cache
+
+
+# Session.info key of the users changed by the session's pending transaction
+_CHANGED_PRINCIPALS = "changed_principals"
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _collect_changed_principal(_mapper: Any, _connection: Any, target: User) -> None:  # noqa: ANN401
+    # Evicted on commit: evicted at flush time, the entry could be cached again
+    # from the old row by a request reading before the commit, for a whole TTL
+    if (session := object_session(target)) is not None:
+        session.info.setdefault(_CHANGED_PRINCIPALS, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _forget_changed_principals(session: Session) -> None:
+    # Any change committed through the ORM, such as a deactivation, takes
+    # effect on this process's next request; other processes see it within
+    # the TTL. Writers using Core UPDATE or DELETE statements delete the entry
+    # themselves
+    for user_id in session.info.pop(_CHANGED_PRINCIPALS, ()):
+        get_principal_cache().delete(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _keep_cached_principals(session: Session) -> None:
+    session.info.pop(_CHANGED_PRINCIPALS, None)
@@ -0,0 +1,93 @@
+"""Choose Argon2 parameters that take a target time to verify on this machine.
+
+Runs at startup when ``ARGON2_TARGET_VERIFY_MS`` is set. To pin the result
+instead, run it from the command line and copy the settings it prints:
+
+    uv run python -m learn_fastapi.src.auth.calibration --target-ms 250
+"""
+
+import argparse
+import statistics
+import time
+from dataclasses import replace
+
+from argon2 import Parameters
+
+from learn_fastapi.src.config import settings
+
+from .utils import HASH_PARAMETERS, hash_password, verify_password
+
+# Lowest memory cost calibration may settle for, in KiB (the OWASP minimum)
+MIN_MEMORY_COST = 19 * 1024
+SAMPLES = 3
+_PASSWORD = "calibration"  # noqa: S105 - only ever hashed, never stored
+
+
+def measure_verify(parameters: Parameters) -> float:
+    """Time verifying a password against a hash made with ``parameters``.
+
+    Returns:
+        The median of a few verifications, in seconds.
+
+    """
+    password_hash = hash_password(_PASSWORD, parameters)
+    timings = []
+    for _ in range(SAMPLES):
+        started = time.perf_counter()
+        verify_password(_PASSWORD, password_hash)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def calibrate_hash_parameters(
+    target_seconds: float,
+    max_memory_cost: int = settings.argon2_memory_cost,
+    parallelism: int = settings.argon2_parallelism,
+    min_memory_cost: int = MIN_MEMORY_COST,
+) -> Parameters:
+    """Find the costliest parameters that verify within ``target_seconds``.
+
+    Memory is what makes guessing expensive on GPUs, so it stays at
+    ``max_memory_cost`` and is only halved while a single pass is too slow;
+    passes are then added for as long as the target allows. Blocks for a few
+    multiples of the target, so run it in a thread from async code.
+
+    Returns:
+        The parameters to hash new passwords with.
+
+    """
+    parameters = replace(
+        HASH_PARAMETERS,
+        time_cost=1,
+        memory_cost=max_memory_cost,
+        parallelism=parallelism,
+    )
+    seconds = measure_verify(parameters)
+    while seconds > target_seconds and parameters.memory_cost // 2 >= min_memory_cost:
+        parameters = replace(parameters, memory_cost=parameters.memory_cost // 2)
+        seconds = measure_verify(parameters)
+
+    # Verification time grows linearly with the passes: estimate, then check
+    time_cost = max(int(target_seconds / seconds), 1)
+    while (
+        time_cost > 1
+        and measure_verify(replace(parameters, time_cost=time_cost)) > target_seconds
+    ):
+        time_cost -= 1
+    return replace(parameters, time_cost=time_cost)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    args = parser.parse_args()
+    parameters = calibrate_hash_parameters(args.target_ms / 1000)
+    seconds = measure_verify(parameters)
+    print(f"ARGON2_TIME_COST={parameters.time_cost}")
+    print(f"ARGON2_MEMORY_COST={parameters.memory_cost}")
+    print(f"ARGON2_PARALLELISM={parameters.parallelism}")
+    print(f"# verifies in {seconds * 1000:.1f} ms on this machine")
+
+
+if __name__ == "__main__":
+    main()
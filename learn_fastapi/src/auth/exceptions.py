@@ -1,5 +1,9 @@
 from fastapi import HTTPException
-from starlette.status import HTTP_400_BAD_REQUEST, HTTP_401_UNAUTHORIZED
+from starlette.status import (
+    HTTP_400_BAD_REQUEST,
+    HTTP_401_UNAUTHORIZED,
+    HTTP_503_SERVICE_UNAVAILABLE,
+)
 
 invalid_expire_token_exception = HTTPException(
     status_code=HTTP_401_UNAUTHORIZED,
@@ -23,3 +27,16 @@ email_already_registered_exception = HTTPException(
     status_code=HTTP_400_BAD_REQUEST,
     detail="Email already registered",
 )
+password_hashing_busy_exception = HTTPException(
+    status_code=HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Too many sign-ins in progress, try again shortly",
+    headers={"Retry-After": "1"},
+)
+invalid_refresh_token_exception = HTTPException(
+    status_code=HTTP_401_UNAUTHORIZED,
+    detail="Invalid or expired refresh token",
+)
+refresh_token_reused_exception = HTTPException(
+    status_code=HTTP_401_UNAUTHORIZED,
+    detail="Refresh token already used, sign in again",
+)
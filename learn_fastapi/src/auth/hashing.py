@@ -0,0 +1,161 @@
+import asyncio
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Annotated
+
+from argon2 import Parameters
+from fastapi import Depends
+
+from learn_fastapi.src.config import settings
+from learn_fastapi.src.utils.metrics import register_metrics
+
+from .exceptions import password_hashing_busy_exception
+from .utils import HASH_PARAMETERS, hash_password, needs_rehash, verify_password
+
+
+def _timed[T](function: Callable[..., T], *args: object) -> tuple[T, float]:
+    # Runs in the worker, so that the time spent queued is not counted
+    started = time.perf_counter()
+    return function(*args), time.perf_counter() - started
+
+
+class PasswordHashingPool:
+    """Hash and verify passwords off the event loop on a bounded worker pool.
+
+    Argon2 is deliberately slow: run inline, every hash stalls all the other
+    requests of the process. Here at most ``max_workers`` run at once and up to
+    ``max_queued`` more wait for a worker; past that, requests are turned away
+    with a 503 straight away instead of queueing behind a burst of logins.
+
+    New hashes use ``parameters``, which the workers receive with every call,
+    so that calibrating them at startup also reaches worker processes.
+    """
+
+    def __init__(
+        self,
+        executor_factory: Callable[[int], Executor],
+        max_workers: int,
+        max_queued: int,
+        parameters: Parameters = HASH_PARAMETERS,
+    ) -> None:
+        """Create an idle pool; the workers are started on first use.
+
+        Args:
+            executor_factory: Builds the pool from its number of workers.
+            max_workers: Maximum number of hashes computed at once.
+            max_queued: Maximum number of hashes waiting for a worker.
+            parameters: Argon2 cost of new hashes.
+
+        """
+        self.executor_factory = executor_factory
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.parameters = parameters
+        self._executor: Executor | None = None
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.busy_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.last_busy_seconds = 0.0
+
+    async def _run[T](self, function: Callable[..., T], *args: object) -> T:
+        if self.pending >= self.max_workers + self.max_queued:
+            self.rejected += 1
+            raise password_hashing_busy_exception
+        if self._executor is None:
+            self._executor = self.executor_factory(self.max_workers)
+
+        self.pending += 1
+        started = time.perf_counter()
+        try:
+            result, seconds = await asyncio.get_running_loop().run_in_executor(
+                self._executor, _timed, function, *args
+            )
+        finally:
+            self.pending -= 1
+        self.completed += 1
+        self.busy_seconds += seconds
+        self.wait_seconds += time.perf_counter() - started - seconds
+        self.last_busy_seconds = seconds
+        return result
+
+    async def hash(self, password: str) -> str:
+        """Hash a password with Argon2id on the pool.
+
+        Returns:
+            The hashed password as a string.
+
+        Raises:
+            HTTPException: If the pool is saturated.
+
+        """
+        return await self._run(hash_password, password, self.parameters)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        """Verify a password against its hash on the pool.
+
+        Returns:
+            True if the password is correct, False otherwise.
+
+        Raises:
+            HTTPException: If the pool is saturated.
+
+        """
+        return await self._run(verify_password, password, password_hash)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        # Only parses the hash, so it is cheap enough for the event loop
+        return needs_rehash(password_hash, self.parameters)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "in_flight": min(self.pending, self.max_workers),
+            "queue_depth": max(self.pending - self.max_workers, 0),
+            "max_workers": self.max_workers,
+            "max_queued": self.max_queued,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "busy_seconds_total": self.busy_seconds,
+            "wait_seconds_total": self.wait_seconds,
+            "last_busy_seconds": self.last_busy_seconds,
+            "time_cost": self.parameters.time_cost,
+            "memory_cost_kib": self.parameters.memory_cost,
+            "parallelism": self.parameters.parallelism,
+        }
+
+
+# Argon2 releases the GIL, so threads hash in parallel without the cost of
+# pickling to processes; processes also isolate the hashing from the app
+EXECUTORS: dict[str, Callable[[int], Executor]] = {
+    "thread": lambda workers: ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="password-hashing"
+    ),
+    "process": lambda workers: ProcessPoolExecutor(max_workers=workers),
+}
+
+_hashing_pool = PasswordHashingPool(
+    EXECUTORS[settings.password_hashing_executor],
+    max_workers=settings.password_hashing_workers,
+    max_queued=settings.password_hashing_max_queued,
+)
+register_metrics("auth.password_hashing", _hashing_pool.stats)
+
+
+def get_password_hashing_pool() -> PasswordHashingPool:
+    """Return the pool passwords are hashed and verified on.
+
+    Returns:
+        The active password hashing pool.
+
+    """
+    return _hashing_pool
+
+
+PasswordHashingDep = Annotated[PasswordHashingPool, Depends(get_password_hashing_pool)]
@@ -1,4 +1,8 @@
-from sqlalchemy.orm import Mapped
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, String
+from sqlalchemy.orm import Mapped, mapped_column
 
 from learn_fastapi.src.database import Base
 from learn_fastapi.src.utils.annotations import (
@@ -7,7 +11,12 @@ from learn_fastapi.src.utils.annotations import (
     timestamp_updated,
 )
 
-from .annotations import bool_default_false, bool_default_true, str_idx_unique
+from .annotations import (
+    bool_default_false,
+    bool_default_true,
+    str_idx_unique,
+    timestamp_tz,
+)
 
 
 class User(Base):
@@ -20,3 +29,35 @@ class User(Base):
     is_superuser: Mapped[bool_default_false]
     created_at: Mapped[timestamp_created]
     updated_at: Mapped[timestamp_updated]
+
+
+class RefreshToken(Base):
+    """A refresh token, stored as the SHA-256 of its value.
+
+    Each sign-in starts a family of tokens: every refresh marks the token used
+    and issues its successor in the same family.
+    """
+
+    __tablename__ = "refresh_tokens"
+
+    token_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    family_id: Mapped[uuid.UUID] = mapped_column(index=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        # Follows the user's id when utils/keys.py rewrites it
+        ForeignKey("users.id", ondelete="CASCADE", onupdate="CASCADE")
+    )
+    expires_at: Mapped[timestamp_tz]
+    used_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    created_at: Mapped[timestamp_created]
+
+
+class RevokedTokenFamily(Base):
+    """A token family whose access tokens must no longer be accepted.
+
+    Kept until the last access token issued in the family has expired.
+    """
+
+    __tablename__ = "revoked_token_families"
+
+    family_id: Mapped[uuid.UUID] = mapped_column(primary_key=True)
+    expires_at: Mapped[timestamp_tz]
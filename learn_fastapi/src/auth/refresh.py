@@ -0,0 +1,132 @@
+import hashlib
+import secrets
+import uuid
+from datetime import UTC, datetime, timedelta
+
+from fastapi import Response
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from learn_fastapi.src.config import settings
+
+from .exceptions import invalid_refresh_token_exception, refresh_token_reused_exception
+from .models import RefreshToken, RevokedTokenFamily
+from .revocation import RevocationList
+
+REFRESH_TOKEN_COOKIE = "refresh_token"  # noqa: S105 - a cookie name
+# Only sent along with requests to the auth endpoints
+REFRESH_TOKEN_PATH = "/auth"  # noqa: S105 - a cookie path
+
+
+def _digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def issue_refresh_token(
+    session: AsyncSession, user_id: uuid.UUID, family_id: uuid.UUID
+) -> str:
+    """Add a new refresh token of ``family_id`` to the session.
+
+    Only a hash of the token is stored; the caller commits.
+
+    Returns:
+        The refresh token to hand to the client.
+
+    """
+    token = secrets.token_urlsafe(32)
+    session.add(
+        RefreshToken(
+            token_hash=_digest(token),
+            family_id=family_id,
+            user_id=user_id,
+            expires_at=datetime.now(tz=UTC)
+            + timedelta(days=settings.refresh_token_expire_days),
+        )
+    )
+    return token
+
+
+def set_refresh_token_cookie(response: Response, token: str) -> None:
+    response.set_cookie(
+        REFRESH_TOKEN_COOKIE,
+        token,
+        max_age=settings.refresh_token_expire_days * 24 * 60 * 60,
+        path=REFRESH_TOKEN_PATH,
+        domain=settings.cookie_domain,
+        secure=settings.cookie_secure,
+        httponly=True,
+        samesite=settings.cookie_samesite,  # ty:ignore[invalid-argument-type]
+    )
+
+
+async def revoke_token_family(
+    session: AsyncSession, revocations: RevocationList, family_id: uuid.UUID
+) -> None:
+    """Revoke every refresh and access token issued in ``family_id``."""
+    await session.execute(
+        delete(RefreshToken).where(RefreshToken.family_id == family_id)
+    )
+    # Access tokens are not stored: the family is denied until they expire
+    await session.merge(
+        RevokedTokenFamily(
+            family_id=family_id,
+            expires_at=datetime.now(tz=UTC)
+            + timedelta(minutes=settings.access_token_expire_minutes),
+        )
+    )
+    await session.commit()
+    revocations.add(family_id)
+
+
+async def revoke_refresh_token(
+    session: AsyncSession, revocations: RevocationList, token: str
+) -> None:
+    """Revoke the family of a refresh token, if the token is known."""
+    family_id = await session.scalar(
+        select(RefreshToken.family_id).where(RefreshToken.token_hash == _digest(token))
+    )
+    if family_id is not None:
+        await revoke_token_family(session, revocations, family_id)
+
+
+async def rotate_refresh_token(
+    session: AsyncSession, revocations: RevocationList, token: str
+) -> tuple[uuid.UUID, uuid.UUID]:
+    """Mark a refresh token used, so that it cannot be exchanged again.
+
+    A token can only be used once, even by concurrent requests. Presenting it
+    again means it was copied: the whole family is revoked, signing out both
+    the legitimate client and whoever holds the copy.
+
+    Returns:
+        The user and family ids the token was issued for.
+
+    Raises:
+        invalid_refresh_token_exception: If the token is unknown or expired.
+        refresh_token_reused_exception: If the token was already used.
+
+    """
+    now = datetime.now(tz=UTC)
+    token_hash = _digest(token)
+    result = await session.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.token_hash == token_hash,
+            RefreshToken.used_at.is_(None),
+            RefreshToken.expires_at > now,
+        )
+        .values(used_at=now)
+        .returning(RefreshToken.user_id, RefreshToken.family_id)
+    )
+    if (row := result.one_or_none()) is not None:
+        return row.user_id, row.family_id
+
+    family_id = await session.scalar(
+        select(RefreshToken.family_id).where(
+            RefreshToken.token_hash == token_hash, RefreshToken.used_at.is_not(None)
+        )
+    )
+    if family_id is None:
+        raise invalid_refresh_token_exception
+    await revoke_token_family(session, revocations, family_id)
+    raise refresh_token_reused_exception
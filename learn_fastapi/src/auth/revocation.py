@@ -0,0 +1,178 @@
+import asyncio
+import hashlib
+import math
+from collections.abc import Iterable, Iterator
+from datetime import UTC, datetime
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import Depends
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from learn_fastapi.src.config import settings
+from learn_fastapi.src.utils.metrics import register_metrics
+
+from .models import RefreshToken, RevokedTokenFamily
+
+# Room in a freshly loaded filter for revocations made before the next reload
+MIN_CAPACITY = 1024
+
+
+class BloomFilter:
+    """A fixed-size set of byte strings that may report false positives.
+
+    Membership never misses a key that was added; a key that was not added is
+    reported present with a probability of about ``error_rate``, as long as no
+    more than ``capacity`` keys were added.
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        """Create an empty filter sized for ``capacity`` keys.
+
+        Args:
+            capacity: Number of keys the error rate is guaranteed for.
+            error_rate: Acceptable probability of a false positive.
+
+        """
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        self._bits = bytearray(math.ceil(self.size / 8))
+
+    def _positions(self, key: bytes) -> Iterator[int]:
+        # Double hashing: k positions from the two halves of a single digest
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        first = int.from_bytes(digest[:8])
+        step = int.from_bytes(digest[8:]) | 1
+        return ((first + i * step) % self.size for i in range(self.hashes))
+
+    def add(self, key: bytes) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: bytes) -> bool:
+        """Tell whether ``key`` may have been added."""
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+class RevocationList:
+    """Revoked token families, checked on every request without a query.
+
+    Almost every token belongs to a family that was never revoked, which the
+    Bloom filter confirms in a few bit lookups; the rare "maybe" is settled by
+    the denylist. Both only hold the families whose access tokens may still be
+    live, and are rebuilt from the ``revoked_token_families`` table on every
+    reload. Revocations made by this process apply straight away, those made
+    by other processes after their next reload.
+    """
+
+    def __init__(self, error_rate: float) -> None:
+        """Create an empty list; call `reload` to fill it from the database.
+
+        Args:
+            error_rate: Share of the unrevoked families the filter lets
+                through to the denylist.
+
+        """
+        self.error_rate = error_rate
+        self._filter = BloomFilter(MIN_CAPACITY, error_rate)
+        self._denylist: set[UUID] = set()
+        # Revoked while a reload was reading the table, which may miss them
+        self._revoked_since_reload: set[UUID] = set()
+        self.checks = 0
+        self.filter_hits = 0
+        self.reloads = 0
+        self.failed_reloads = 0
+
+    def is_revoked(self, family_id: UUID) -> bool:
+        self.checks += 1
+        if family_id.bytes not in self._filter:
+            return False
+        self.filter_hits += 1
+        return family_id in self._denylist
+
+    def add(self, family_id: UUID) -> None:
+        self._filter.add(family_id.bytes)
+        self._denylist.add(family_id)
+        self._revoked_since_reload.add(family_id)
+
+    def load(self, family_ids: Iterable[UUID]) -> None:
+        """Replace the revoked families with ``family_ids``."""
+        denylist = set(family_ids)
+        bloom = BloomFilter(max(2 * len(denylist), MIN_CAPACITY), self.error_rate)
+        for family_id in denylist:
+            bloom.add(family_id.bytes)
+        self._filter, self._denylist = bloom, denylist
+
+    async def reload(self, session: AsyncSession) -> int:
+        """Reload the revoked families, dropping the expired ones.
+
+        Expired revocations and refresh tokens are deleted on the way, so the
+        tables stay as small as the denylist.
+
+        Returns:
+            The number of revoked families.
+
+        """
+        self._revoked_since_reload = set()
+        now = datetime.now(tz=UTC)
+        await session.execute(
+            delete(RevokedTokenFamily).where(RevokedTokenFamily.expires_at <= now)
+        )
+        await session.execute(
+            delete(RefreshToken).where(RefreshToken.expires_at <= now)
+        )
+        await session.commit()
+        family_ids = await session.scalars(select(RevokedTokenFamily.family_id))
+        self.load([*family_ids, *self._revoked_since_reload])
+        self.reloads += 1
+        return len(self._denylist)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "revoked_families": len(self._denylist),
+            "filter_bits": self._filter.size,
+            "filter_hashes": self._filter.hashes,
+            "checks": self.checks,
+            "filter_hits": self.filter_hits,
+            "reloads": self.reloads,
+            "failed_reloads": self.failed_reloads,
+        }
+
+
+async def reload_revocations_periodically(
+    revocations: RevocationList,
+    session_factory: async_sessionmaker[AsyncSession],
+    interval: float,
+) -> None:
+    """Run `RevocationList.reload` now and then every ``interval`` seconds.
+
+    Outcomes are reported through the ``auth.revocation`` metrics.
+    """
+    while True:
+        try:
+            async with session_factory() as session:
+                await revocations.reload(session)
+        except Exception:  # noqa: BLE001 - a failed run must not stop the next ones
+            revocations.failed_reloads += 1
+        await asyncio.sleep(interval)
+
+
+_revocation_list = RevocationList(settings.revocation_filter_error_rate)
+register_metrics("auth.revocation", _revocation_list.stats)
+
+
+def get_revocation_list() -> RevocationList:
+    """Return the list of revoked token families.
+
+    Returns:
+        The active revocation list.
+
+    """
+    return _revocation_list
+
+
+RevocationListDep = Annotated[RevocationList, Depends(get_revocation_list)]
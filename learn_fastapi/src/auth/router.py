@@ -1,43 +1,100 @@
+import asyncio
 import uuid
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager, suppress
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    FastAPI,
+    HTTPException,
+    Response,
+)
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from starlette.status import (
     HTTP_201_CREATED,
+    HTTP_204_NO_CONTENT,
 )
 
 from learn_fastapi.src.auth.exceptions import (
     credentials_exception,
     email_already_registered_exception,
     invalid_expire_token_exception,
+    invalid_refresh_token_exception,
     user_doesnt_exist_exception,
     user_inactive_exception,
 )
-from learn_fastapi.src.database import AsyncSessionDep
+from learn_fastapi.src.config import settings
+from learn_fastapi.src.database import AsyncSessionDep, AsyncSessionLocal
 
-from .annotations import OAuth2_Dep, OAuth2PRFDep
+from .annotations import OAuth2_Dep, OAuth2PRFDep, RefreshTokenCookie
+from .cache import PrincipalCacheDep
+from .calibration import calibrate_hash_parameters
+from .hashing import PasswordHashingDep, get_password_hashing_pool
 from .models import User
-from .schema import Token, TokenData, UserCreate, UserResponse
-from .utils import (
-    create_access_token,
-    hash_password,
-    verify_access_token,
-    verify_password,
+from .refresh import (
+    REFRESH_TOKEN_COOKIE,
+    REFRESH_TOKEN_PATH,
+    issue_refresh_token,
+    revoke_refresh_token,
+    rotate_refresh_token,
+    set_refresh_token_cookie,
+)
+from .revocation import (
+    RevocationListDep,
+    get_revocation_list,
+    reload_revocations_periodically,
 )
+from .schema import Token, TokenData, UserCreate, UserResponse
+from .utils import create_access_token, verify_access_token
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncGenerator[None]:
+    hashing = get_password_hashing_pool()
+    if settings.argon2_target_verify_ms is not None:
+        hashing.parameters = await asyncio.to_thread(
+            calibrate_hash_parameters, settings.argon2_target_verify_ms / 1000
+        )
+    reload_task = asyncio.create_task(
+        reload_revocations_periodically(
+            get_revocation_list(), AsyncSessionLocal, settings.revocation_reload_seconds
+        )
+    )
+    yield
+    reload_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await reload_task
+    hashing.shutdown()
+
 
-router = APIRouter()
+router = APIRouter(lifespan=lifespan)
 
 
-async def get_current_user(session: AsyncSessionDep, token: OAuth2_Dep) -> User:
+async def get_current_user(
+    session: AsyncSessionDep,
+    principal_cache: PrincipalCacheDep,
+    revocations: RevocationListDep,
+    token: OAuth2_Dep,
+) -> UserResponse:
     """Get the current authenticated user from a JWT token.
 
+    Users are cached by id for a short while and revocations are checked in
+    memory, so a cache hit neither queries the database nor checks out a
+    connection.
+
     Args:
         session: The database session dependency.
+        principal_cache: Recently authenticated users, by id.
+        revocations: The revoked token families.
         token: The JWT access token from the Authorization header.
 
     Returns:
-        The authenticated User ORM instance.
+        The authenticated user.
 
     Raises:
         invalid_expire_token_exception: If the token is invalid or expired.
@@ -49,28 +106,61 @@ async def get_current_user(session: AsyncSessionDep, token: OAuth2_Dep) -> User:
     user_id = verify_access_token(token)
     if not user_id:
         raise invalid_expire_token_exception
+    if user_id.fam is not None and revocations.is_revoked(user_id.fam):
+        raise invalid_expire_token_exception
 
     try:
         user_id_uuid = uuid.UUID(str(user_id.sub))
     except (TypeError, ValueError) as exception:
         raise invalid_expire_token_exception from exception
 
-    result = await session.execute(select(User).where(User.id == user_id_uuid))
-    user = result.scalar_one_or_none()
-    if not user:
-        raise user_doesnt_exist_exception
+    user = principal_cache.get(user_id_uuid)
+    if user is None:
+        result = await session.execute(select(User).where(User.id == user_id_uuid))
+        user_db = result.scalar_one_or_none()
+        if not user_db:
+            raise user_doesnt_exist_exception
+        user = UserResponse.model_validate(user_db)
+        principal_cache.set(user_id_uuid, user)
     if not user.is_active:
         raise user_inactive_exception
 
     return user
 
 
+async def upgrade_password_hash(
+    session: AsyncSession,
+    hashing: PasswordHashingDep,
+    user_id: uuid.UUID,
+    old_hash: str,
+    password: str,
+) -> None:
+    """Replace a hash made with outdated parameters, once the password is known.
+
+    Best effort: when the pool is saturated the old hash stays until the next
+    login, and a hash changed in the meantime is left alone.
+    """
+    try:
+        new_hash = await hashing.hash(password)
+    except HTTPException:
+        return
+    await session.execute(
+        update(User)
+        .where(User.id == user_id, User.password_hash == old_hash)
+        .values(password_hash=new_hash)
+    )
+    await session.commit()
+
+
 @router.post("/register", response_model=UserResponse, status_code=HTTP_201_CREATED)
-async def register(session: AsyncSessionDep, user_data: UserCreate) -> User:
+async def register(
+    session: AsyncSessionDep, hashing: PasswordHashingDep, user_data: UserCreate
+) -> User:
     """Register a new user account.
 
     Args:
         session: The database session dependency.
+        hashing: The pool the password is hashed on.
         user_data: The user registration data (email and password).
 
     Returns:
@@ -78,6 +168,7 @@ async def register(session: AsyncSessionDep, user_data: UserCreate) -> User:
 
     Raises:
         email_already_registered_exception: If the email is already registered.
+        password_hashing_busy_exception: If too many passwords are being hashed.
 
     """
     result = await session.execute(select(User).where(User.email == user_data.email))
@@ -88,7 +179,7 @@ async def register(session: AsyncSessionDep, user_data: UserCreate) -> User:
 
     new_user = User(
         email=user_data.email,
-        password_hash=hash_password(user_data.password),
+        password_hash=await hashing.hash(user_data.password),
     )
     session.add(new_user)
     await session.commit()
@@ -98,11 +189,24 @@ async def register(session: AsyncSessionDep, user_data: UserCreate) -> User:
 
 
 @router.post("/token", response_model=Token)
-async def login(session: AsyncSessionDep, form_data: OAuth2PRFDep) -> Token:
+async def login(
+    session: AsyncSessionDep,
+    hashing: PasswordHashingDep,
+    background_tasks: BackgroundTasks,
+    response: Response,
+    form_data: OAuth2PRFDep,
+) -> Token:
     """Authenticate a user and return a JWT access token.
 
+    A refresh token starting a new token family is set as an HTTP-only cookie.
+    A password hashed with weaker parameters than the current ones is hashed
+    again after the response is sent, so stored hashes follow cost increases.
+
     Args:
         session: The database session dependency.
+        hashing: The pool the password is verified on.
+        background_tasks: Where the rehash of an outdated hash is queued.
+        response: The response the refresh token cookie is set on.
         form_data: The OAuth2 password request form data (username and password).
 
     Returns:
@@ -111,6 +215,7 @@ async def login(session: AsyncSessionDep, form_data: OAuth2PRFDep) -> Token:
     Raises:
         credentials_exception: If the credentials are incorrect.
         user_inactive_exception: If the user account is inactive.
+        password_hashing_busy_exception: If too many passwords are being hashed.
 
     """
     result = await session.execute(
@@ -118,13 +223,27 @@ async def login(session: AsyncSessionDep, form_data: OAuth2PRFDep) -> Token:
     )
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(form_data.password, user.password_hash):
+    if not user or not await hashing.verify(form_data.password, user.password_hash):
         raise credentials_exception
 
     if not user.is_active:
         raise user_inactive_exception
 
-    access_token = create_access_token(TokenData(sub=str(user.id)))
+    if hashing.needs_rehash(user.password_hash):
+        background_tasks.add_task(
+            upgrade_password_hash,
+            session,
+            hashing,
+            user.id,
+            user.password_hash,
+            form_data.password,
+        )
+
+    family_id = uuid.uuid7()
+    access_token = create_access_token(TokenData(sub=str(user.id), fam=family_id))
+    refresh_token = issue_refresh_token(session, user.id, family_id)
+    await session.commit()
+    set_refresh_token_cookie(response, refresh_token)
 
     return Token(
         access_token=access_token,
@@ -132,18 +251,85 @@ async def login(session: AsyncSessionDep, form_data: OAuth2PRFDep) -> Token:
     )
 
 
-# TODO (FENYXZ): Add endpoint to refresh access tokens using refresh tokens
+@router.post("/refresh", response_model=Token)
+async def refresh(
+    session: AsyncSessionDep,
+    revocations: RevocationListDep,
+    response: Response,
+    refresh_token: RefreshTokenCookie = None,
+) -> Token:
+    """Exchange the refresh token cookie for a new access token.
+
+    The refresh token is rotated: it is replaced by a new one in the same
+    family and cannot be used again. Reusing it revokes the family.
+
+    Args:
+        session: The database session dependency.
+        revocations: The revoked token families.
+        response: The response the new refresh token cookie is set on.
+        refresh_token: The refresh token cookie set at sign-in.
+
+    Returns:
+        A new access token.
+
+    Raises:
+        invalid_refresh_token_exception: If the token is missing, unknown or
+            expired, or its user no longer exists.
+        refresh_token_reused_exception: If the token was already used.
+        user_inactive_exception: If the user account is inactive.
+
+    """
+    if refresh_token is None:
+        raise invalid_refresh_token_exception
+    user_id, family_id = await rotate_refresh_token(session, revocations, refresh_token)
+    user = await session.get(User, user_id)
+    if user is None:
+        raise invalid_refresh_token_exception
+    if not user.is_active:
+        raise user_inactive_exception
+
+    new_refresh_token = issue_refresh_token(session, user_id, family_id)
+    await session.commit()
+    set_refresh_token_cookie(response, new_refresh_token)
+    return Token(
+        access_token=create_access_token(TokenData(sub=str(user_id), fam=family_id))
+    )
+
+
+@router.post("/logout", status_code=HTTP_204_NO_CONTENT)
+async def logout(
+    session: AsyncSessionDep,
+    revocations: RevocationListDep,
+    response: Response,
+    refresh_token: RefreshTokenCookie = None,
+) -> None:
+    """Revoke the refresh token cookie and the access tokens issued with it.
+
+    Args:
+        session: The database session dependency.
+        revocations: The revoked token families.
+        response: The response the refresh token cookie is cleared on.
+        refresh_token: The refresh token cookie set at sign-in.
+
+    """
+    if refresh_token is not None:
+        await revoke_refresh_token(session, revocations, refresh_token)
+    response.delete_cookie(
+        REFRESH_TOKEN_COOKIE, path=REFRESH_TOKEN_PATH, domain=settings.cookie_domain
+    )
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_me(current_user: Annotated[User, Depends(get_current_user)]) -> User:
+async def get_me(
+    current_user: Annotated[UserResponse, Depends(get_current_user)],
+) -> UserResponse:
     """Return the currently authenticated user's profile.
 
     Args:
         current_user: The current authenticated user, injected by the dependency.
 
     Returns:
-        The current User ORM instance.
+        The current user.
 
     """
     return current_user
@@ -31,8 +31,13 @@ class TokenData(BaseModel):
     sub: str = Field(description="Subject (usually user email)")
     exp: datetime | None = Field(
         description="Expiration timestamp",
-        default=datetime.now(tz=UTC)
-        + timedelta(minutes=settings.access_token_expire_minutes),
+        default_factory=lambda: (
+            datetime.now(tz=UTC)
+            + timedelta(minutes=settings.access_token_expire_minutes)
+        ),
+    )
+    fam: UUID | None = Field(
+        default=None, description="Refresh token family the token was issued in"
     )
 
 
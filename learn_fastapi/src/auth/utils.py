@@ -1,7 +1,13 @@
+import hashlib
+import time
+from dataclasses import replace
+
 import jwt
-from argon2 import PasswordHasher
+from argon2 import Parameters, PasswordHasher, extract_parameters
 from argon2.exceptions import InvalidHash, VerifyMismatchError
+from argon2.profiles import RFC_9106_LOW_MEMORY
 
+from learn_fastapi.src.auth.cache import get_token_cache
 from learn_fastapi.src.auth.schema import TokenData
 from learn_fastapi.src.config import settings
 
@@ -10,18 +16,26 @@ SECRET_KEY = settings.secret_key
 ALGORITHM = settings.algorithm
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
 
-# Password hasher instance
-ph = PasswordHasher()
+# Cost of new password hashes, unless calibrated at startup
+HASH_PARAMETERS = replace(
+    RFC_9106_LOW_MEMORY,
+    time_cost=settings.argon2_time_cost,
+    memory_cost=settings.argon2_memory_cost,
+    parallelism=settings.argon2_parallelism,
+)
+
+# Verifies any hash, whatever its parameters: they are read from the hash
+ph = PasswordHasher.from_parameters(HASH_PARAMETERS)
 
 
-def hash_password(password: str) -> str:
+def hash_password(password: str, parameters: Parameters = HASH_PARAMETERS) -> str:
     """Hash a password using Argon2id.
 
     Returns:
         The hashed password as a string.
 
     """
-    return ph.hash(password)
+    return PasswordHasher.from_parameters(parameters).hash(password)
 
 
 def verify_password(password: str, password_hash: str) -> bool:
@@ -38,6 +52,32 @@ def verify_password(password: str, password_hash: str) -> bool:
         return False
 
 
+def needs_rehash(password_hash: str, parameters: Parameters = HASH_PARAMETERS) -> bool:
+    """Tell whether a hash is weaker than one made with ``parameters``.
+
+    Only a lower cost (passes times memory), a shorter salt or hash, or another
+    Argon2 variant or version counts. Workers that calibrated slightly
+    different parameters then leave each other's hashes alone, instead of
+    rewriting them on every login; hashes only move up to the costliest
+    parameters in use.
+
+    Returns:
+        True if the password should be hashed again.
+
+    """
+    try:
+        current = extract_parameters(password_hash)
+    except InvalidHash:
+        return True
+    return (
+        (current.type, current.version) != (parameters.type, parameters.version)
+        or current.salt_len < parameters.salt_len
+        or current.hash_len < parameters.hash_len
+        or current.time_cost * current.memory_cost
+        < parameters.time_cost * parameters.memory_cost
+    )
+
+
 def create_access_token(token_data: TokenData) -> str:
     """Create a JWT access token.
 
@@ -45,7 +85,9 @@ def create_access_token(token_data: TokenData) -> str:
         The encoded JWT token as a string.
 
     """
-    to_encode = token_data.model_dump()
+    to_encode = token_data.model_dump(exclude_none=True)
+    if token_data.fam is not None:
+        to_encode["fam"] = str(token_data.fam)
 
     return jwt.encode(to_encode, SECRET_KEY.get_secret_value(), algorithm=ALGORITHM)
 
@@ -53,6 +95,9 @@ def create_access_token(token_data: TokenData) -> str:
 def verify_access_token(token: str) -> TokenData | None:
     """Verify a JWT access token and return its data.
 
+    Verified tokens are cached until they expire, keyed by a hash of the token,
+    so a client reusing one skips the signature check and the model validation.
+
     Args:
         token: The JWT token string to verify.
 
@@ -60,6 +105,10 @@ def verify_access_token(token: str) -> TokenData | None:
         A TokenData instance if the token is valid, or None if invalid.
 
     """
+    token_cache = get_token_cache()
+    key = hashlib.sha256(token.encode()).digest()
+    if (cached := token_cache.get(key)) is not None:
+        return cached
     try:
         payload = jwt.decode(
             token,
@@ -70,4 +119,8 @@ def verify_access_token(token: str) -> TokenData | None:
     except jwt.InvalidTokenError:
         return None
     # data = {"sub": payload.get("sub"), "exp": payload.get("exp")}
-    return TokenData(sub=payload["sub"], exp=payload["exp"])
+    token_data = TokenData(
+        sub=payload["sub"], exp=payload["exp"], fam=payload.get("fam")
+    )
+    token_cache.set(key, token_data, ttl=payload["exp"] - time.time())
+    return token_data
@@ -1,9 +1,8 @@
 import asyncio
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager, suppress
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Literal
 
-from fastapi.staticfiles import StaticFiles
 from pydantic import SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from starlette.websockets import WebSocket, WebSocketDisconnect
@@ -12,6 +11,7 @@ from watchfiles import awatch
 from learn_fastapi.src.constants import IMAGES_DIR, STATIC_DIR
 from learn_fastapi.src.database import create_db_and_tables
 from learn_fastapi.src.middleware import SwaggerHotReloadMiddleware
+from learn_fastapi.src.static_files import CachedStaticFiles
 
 if TYPE_CHECKING:
     from fastapi import FastAPI
@@ -35,7 +35,7 @@ _clients: list[WebSocket] = []
 
 def mount_static_files(app: FastAPI) -> None:
     IMAGES_DIR.mkdir(parents=True, exist_ok=True)
-    app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
+    app.mount("/static", CachedStaticFiles(directory=STATIC_DIR), name="static")
 
 
 async def _hot_reload_ws(websocket: WebSocket) -> None:
@@ -82,6 +82,30 @@ class Settings(BaseSettings):
     cookie_domain: str | None = (
         None  # Set to your domain in production, or None for localhost
     )
+    item_cache_max_size: int = 1024
+    item_cache_ttl_seconds: float = 60.0
+    principal_cache_max_size: int = 4096
+    principal_cache_ttl_seconds: float = 30.0
+    token_cache_max_size: int = 4096
+    # Revoked token families are reloaded from the database this often
+    revocation_reload_seconds: float = 30.0
+    revocation_filter_error_rate: float = 0.01
+    item_import_batch_size: int = 1000
+    item_export_chunk_size: int = 1000
+    image_max_upload_bytes: int = 10 * 1024 * 1024
+    image_variant_workers: int = 2
+    image_variant_max_pending: int = 64
+    # Pending item statistics deltas are folded into the totals this often
+    item_stats_rollup_seconds: float = 5.0
+    password_hashing_executor: Literal["thread", "process"] = "thread"  # noqa: S105
+    password_hashing_workers: int = 4
+    password_hashing_max_queued: int = 32
+    # Cost of new password hashes; the argon2-cffi defaults (RFC 9106, low memory)
+    argon2_time_cost: int = 3
+    argon2_memory_cost: int = 64 * 1024  # KiB
+    argon2_parallelism: int = 4
+    # When set, the cost is calibrated at startup to take about this long to verify
+    argon2_target_verify_ms: float | None = None
 
 
 settings = Settings()  # ty:ignore[missing-argument]
@@ -1,17 +1,54 @@
 from typing import Annotated
+from uuid import UUID
 
-from fastapi import File, Form, UploadFile
+from fastapi import Body, File, Form, Header, UploadFile
 from fastapi.params import Query
+from sqlalchemy import BigInteger, Computed, Integer, String, text
 from sqlalchemy.orm import mapped_column
 
+from .schema import (
+    ExportFormat,
+    ImageSize,
+    ImportFormat,
+    ItemBulkDeleteSchema,
+    ItemBulkUpdateSchema,
+    ItemSchema,
+)
+
+# Upper bound on the number of elements accepted by a single bulk request
+MAX_BULK_ITEMS = 1000
+
+# Upper bound on the ids of a batch read sent in the query string, which has
+# to fit in a request line; longer lists go in a POST body
+MAX_BATCH_QUERY_IDS = 100
+
+# Upper bound on the items returned by a single page of a listing
+MAX_PAGE_SIZE = 1000
+
 # ---------------------------------------------------------------------------
 # SQLAlchemy ORM column type annotations
 # ---------------------------------------------------------------------------
 
-str_indexed = Annotated[str, mapped_column(index=True)]
 str_default = Annotated[str, mapped_column(default="No text provided")]
+# Compared and ordered by code point, SQLite's default, so that a range over
+# the B-tree index is exactly a case-sensitive prefix match on PostgreSQL too
+str_codepoint = Annotated[
+    str, mapped_column(String().with_variant(String(collation="C"), "postgresql"))
+]
 float_default = Annotated[float, mapped_column(default=0.00)]
 str_url = Annotated[str, mapped_column(default="")]
+str_sha256_pk = Annotated[str, mapped_column(String(64), primary_key=True)]
+str_unique = Annotated[str, mapped_column(unique=True)]
+int_default_zero = Annotated[int, mapped_column(default=0)]
+int_key = Annotated[int, mapped_column(primary_key=True, autoincrement=False)]
+# SQLite only autoincrements INTEGER primary keys, which are 64-bit there anyway
+int_serial_pk = Annotated[
+    int,
+    mapped_column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True),
+]
+float_total = Annotated[float, mapped_column(Computed("price + tax", persisted=True))]
+# Starts at 1 for rows inserted outside the ORM too, such as bulk inserts
+int_version = Annotated[int, mapped_column(server_default=text("1"))]
 
 # ---------------------------------------------------------------------------
 # Item Form field annotations
@@ -24,11 +61,113 @@ ItemDescription = Annotated[
 ItemPrice = Annotated[float, Form(ge=0, description="The price of the item")]
 ItemTax = Annotated[float, Form(ge=0, description="The tax of the item")]
 
+# ---------------------------------------------------------------------------
+# Item bulk Body annotations
+# ---------------------------------------------------------------------------
+
+ItemBulkCreate = Annotated[
+    list[ItemSchema],
+    Body(min_length=1, max_length=MAX_BULK_ITEMS, description="Items to create"),
+]
+ItemBulkUpdate = Annotated[
+    list[ItemBulkUpdateSchema],
+    Body(min_length=1, max_length=MAX_BULK_ITEMS, description="Items to update"),
+]
+ItemBulkDelete = Annotated[
+    list[ItemBulkDeleteSchema],
+    Body(min_length=1, max_length=MAX_BULK_ITEMS, description="Items to delete"),
+]
+ItemBatchIds = Annotated[
+    list[UUID],
+    Body(min_length=1, max_length=MAX_BULK_ITEMS, description="Ids to read"),
+]
+
+# ---------------------------------------------------------------------------
+# Item import annotations
+# ---------------------------------------------------------------------------
+
+ImportFile = Annotated[UploadFile, File(description="NDJSON or CSV file of items")]
+ImportFormatQuery = Annotated[
+    ImportFormat | None,
+    Query(alias="format", description="Defaults to the file extension"),
+]
+
+# ---------------------------------------------------------------------------
+# Item export annotations
+# ---------------------------------------------------------------------------
+
+ExportFormatQuery = Annotated[
+    ExportFormat, Query(alias="format", description="The export file format")
+]
+
+# ---------------------------------------------------------------------------
+# Item Query parameter annotations
+# ---------------------------------------------------------------------------
+
+ItemOffset = Annotated[int, Query(ge=0, description="Number of items to skip")]
+ItemLimit = Annotated[
+    int,
+    Query(ge=1, le=MAX_PAGE_SIZE, description="Number of items to return"),
+]
+ItemCursor = Annotated[
+    str | None,
+    Query(description="Opaque cursor returned in the X-Next-Cursor header"),
+]
+ItemBatchIdsQuery = Annotated[
+    str,
+    Query(
+        alias="ids",
+        description=f"Comma-separated ids to read, at most {MAX_BATCH_QUERY_IDS}",
+    ),
+]
+ItemSearchQuery = Annotated[
+    str,
+    Query(
+        alias="q",
+        min_length=1,
+        max_length=200,
+        description="Words to find in names and descriptions; the last may be partial",
+    ),
+]
+ItemCountApproximate = Annotated[
+    bool,
+    Query(
+        alias="approximate",
+        description="Accept an estimate from the planner's statistics",
+    ),
+]
+ItemFields = Annotated[
+    str | None,
+    Query(
+        description="Comma-separated fields to return, e.g. id,name,price",
+        examples=["id,name,price"],
+    ),
+]
+
+# ---------------------------------------------------------------------------
+# Item Header annotations
+# ---------------------------------------------------------------------------
+
+IfNoneMatch = Annotated[
+    str | None, Header(description="ETag of the representation the client holds")
+]
+IfMatch = Annotated[
+    str | None,
+    Header(description="ETag of the item version the change is based on, or *"),
+]
+
 # ---------------------------------------------------------------------------
 # Image Query parameter annotation
 # ---------------------------------------------------------------------------
 
 ImageFilename = Annotated[str, Query(description="The filename of the image")]
+ImageSizeQuery = Annotated[
+    ImageSize | None,
+    Query(description="Serve a resized variant instead of the original"),
+]
+ImageAccept = Annotated[
+    str | None, Header(description="Image encodings the client can decode")
+]
 
 # ---------------------------------------------------------------------------
 # Image Form field annotations
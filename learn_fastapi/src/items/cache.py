@@ -0,0 +1,37 @@
+from typing import Annotated, Any, NamedTuple
+from uuid import UUID
+
+from fastapi import Depends
+
+from learn_fastapi.src.config import settings
+from learn_fastapi.src.utils.cache import CacheBackend, LRUCache
+from learn_fastapi.src.utils.metrics import register_metrics
+
+
+class CachedItem(NamedTuple):
+    etag: str
+    # The item encoded as JSON, ready to be sent
+    body: bytes
+    # Its column values, to answer sparse fieldset requests
+    row: dict[str, Any]
+
+
+_item_cache: CacheBackend[UUID, CachedItem] = LRUCache(
+    max_size=settings.item_cache_max_size, ttl=settings.item_cache_ttl_seconds
+)
+register_metrics("items.cache", _item_cache.stats)
+
+
+def get_item_cache() -> CacheBackend[UUID, CachedItem]:
+    """Return the read-through cache for single item lookups.
+
+    Override this dependency to plug in a shared backend (e.g. Redis).
+
+    Returns:
+        The active item cache backend.
+
+    """
+    return _item_cache
+
+
+ItemCacheDep = Annotated[CacheBackend[UUID, CachedItem], Depends(get_item_cache)]
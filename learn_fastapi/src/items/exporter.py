@@ -0,0 +1,115 @@
+import csv
+import io
+from collections.abc import AsyncIterator, Sequence
+from typing import Any
+
+import pyarrow as pa
+from pydantic_core import to_json
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Item
+from .schema import ExportFormat
+
+EXPORT_COLUMNS = (
+    Item.id,
+    Item.name,
+    Item.description,
+    Item.price,
+    Item.tax,
+    Item.image_url,
+    Item.created_at,
+    Item.updated_at,
+)
+EXPORT_FIELDS = tuple(column.key for column in EXPORT_COLUMNS)
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.ARROW: "application/vnd.apache.arrow.stream",
+}
+
+# Arrow IPC end-of-stream marker: continuation token followed by a zero length
+_ARROW_EOS = b"\xff\xff\xff\xff\x00\x00\x00\x00"
+
+
+async def stream_partitions(
+    session: AsyncSession, chunk_size: int
+) -> AsyncIterator[Sequence[Row]]:
+    """Fetch every item as plain rows through a server-side cursor.
+
+    Yields:
+        Lists of at most ``chunk_size`` rows, oldest first.
+
+    """
+    result = await session.stream(
+        select(*EXPORT_COLUMNS)
+        .order_by(Item.created_at, Item.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    async for partition in result.partitions():
+        yield partition
+
+
+async def encode_ndjson(
+    partitions: AsyncIterator[Sequence[Row]],
+) -> AsyncIterator[bytes]:
+    async for rows in partitions:
+        yield b"".join(to_json(row._asdict()) + b"\n" for row in rows)
+
+
+async def encode_csv(partitions: AsyncIterator[Sequence[Row]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    async for rows in partitions:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def encode_arrow(
+    partitions: AsyncIterator[Sequence[Row]],
+) -> AsyncIterator[bytes]:
+    """Encode rows as an Arrow IPC stream, one record batch per partition.
+
+    Yields:
+        The schema message, then one message per record batch, then the
+        end-of-stream marker.
+
+    """
+    schema = pa.schema(
+        [
+            ("id", pa.string()),
+            ("name", pa.string()),
+            ("description", pa.string()),
+            ("price", pa.float64()),
+            ("tax", pa.float64()),
+            ("image_url", pa.string()),
+            ("created_at", pa.timestamp("us", tz="UTC")),
+            ("updated_at", pa.timestamp("us", tz="UTC")),
+        ]
+    )
+    yield schema.serialize().to_pybytes()
+    async for rows in partitions:
+        columns: list[list[Any]] = [list(column) for column in zip(*rows, strict=True)]
+        columns[0] = [str(item_id) for item_id in columns[0]]
+        batch = pa.RecordBatch.from_arrays(
+            [
+                pa.array(values, type=field.type)
+                for values, field in zip(columns, schema, strict=True)
+            ],
+            schema=schema,
+        )
+        yield batch.serialize().to_pybytes()
+    yield _ARROW_EOS
+
+
+ENCODERS = {
+    ExportFormat.NDJSON: encode_ndjson,
+    ExportFormat.CSV: encode_csv,
+    ExportFormat.ARROW: encode_arrow,
+}
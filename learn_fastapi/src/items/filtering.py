@@ -0,0 +1,172 @@
+import sys
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Annotated, Any
+from uuid import UUID
+
+from fastapi import Depends, Query
+from sqlalchemy import ColumnElement, Select, tuple_
+
+from .models import Item
+from .schema import ItemSort
+
+# Every filterable and sortable column leads an index ending in id, which
+# serves both its range filters and keyset pagination in either direction
+SORT_COLUMNS = {
+    "created_at": Item.created_at,
+    "updated_at": Item.updated_at,
+    "name": Item.name,
+    "price": Item.price,
+    "tax": Item.tax,
+    "total": Item.total,
+}
+
+SURROGATES_START, SURROGATES_END = 0xD800, 0xDFFF
+
+# Turn the sort key stored in a cursor back into a column value
+KEY_PARSERS: dict[str, Callable[[str], Any]] = {
+    "created_at": datetime.fromisoformat,
+    "updated_at": datetime.fromisoformat,
+    "name": str,
+    "price": float,
+    "tax": float,
+    "total": float,
+}
+
+
+@dataclass
+class ItemFilterParams:
+    """Query parameters that filter and order the items listing."""
+
+    name_prefix: Annotated[
+        str | None,
+        Query(min_length=1, description="Only names starting with this text"),
+    ] = None
+    min_price: Annotated[float | None, Query(description="Lowest price")] = None
+    max_price: Annotated[float | None, Query(description="Highest price")] = None
+    min_tax: Annotated[float | None, Query(description="Lowest tax")] = None
+    max_tax: Annotated[float | None, Query(description="Highest tax")] = None
+    min_total: Annotated[float | None, Query(description="Lowest price + tax")] = None
+    max_total: Annotated[float | None, Query(description="Highest price + tax")] = None
+    created_after: Annotated[
+        datetime | None, Query(description="Created at or after this time")
+    ] = None
+    created_before: Annotated[
+        datetime | None, Query(description="Created before this time")
+    ] = None
+    updated_after: Annotated[
+        datetime | None, Query(description="Updated at or after this time")
+    ] = None
+    updated_before: Annotated[
+        datetime | None, Query(description="Updated before this time")
+    ] = None
+    sort: Annotated[
+        ItemSort, Query(description="Field to order by, descending with a leading -")
+    ] = ItemSort.CREATED_AT
+
+
+def sort_field(sort: ItemSort) -> tuple[str, bool]:
+    """Split a sort value into its field and direction.
+
+    Returns:
+        The field name, and whether the order is descending.
+
+    """
+    return sort.removeprefix("-"), sort.startswith("-")
+
+
+def prefix_upper_bound(prefix: str) -> str | None:
+    """Find the first string past every string starting with ``prefix``.
+
+    Strings are compared by code point. Surrogates cannot be stored, so they
+    are skipped, and a trailing ``U+10FFFF`` has no successor of its own.
+
+    Returns:
+        The exclusive upper bound, or None if no string is greater.
+
+    """
+    while prefix:
+        following = ord(prefix[-1]) + 1
+        if following == SURROGATES_START:
+            following = SURROGATES_END + 1
+        if following <= sys.maxunicode:
+            return prefix[:-1] + chr(following)
+        prefix = prefix[:-1]
+    return None
+
+
+def _filter_clauses(filters: ItemFilterParams) -> dict[str, list[ColumnElement]]:
+    bounds = {
+        "price": (filters.min_price, filters.max_price),
+        "tax": (filters.min_tax, filters.max_tax),
+        "total": (filters.min_total, filters.max_total),
+        "created_at": (filters.created_after, filters.created_before),
+        "updated_at": (filters.updated_after, filters.updated_before),
+    }
+    clauses: dict[str, list[ColumnElement]] = {}
+    if prefix := filters.name_prefix:
+        # A range rather than LIKE, so that the (name, id) index serves it as
+        # it serves the sort; name is compared by code point (see str_codepoint)
+        clauses["name"] = [Item.name >= prefix]
+        if (upper := prefix_upper_bound(prefix)) is not None:
+            clauses["name"].append(Item.name < upper)
+    for field, (low, high) in bounds.items():
+        column = SORT_COLUMNS[field]
+        if low is not None:
+            clauses.setdefault(field, []).append(column >= low)
+        if high is not None:
+            # Upper bounds are inclusive for amounts and exclusive for times
+            clauses.setdefault(field, []).append(
+                column < high if isinstance(high, datetime) else column <= high
+            )
+    return clauses
+
+
+def apply_filters(statement: Select, filters: ItemFilterParams) -> Select:
+    """Filter and order an items query so that one index serves both.
+
+    Filters are only accepted on a single field, and only together with a sort
+    on that same field: the ``(<field>, id)`` index then narrows the range and
+    yields it already in order. Any other combination would need a scan or a
+    sort of the matching rows, so it is rejected instead.
+
+    Returns:
+        The statement with its ``WHERE`` and ``ORDER BY`` clauses.
+
+    Raises:
+        ValueError: If no single index can serve the requested combination.
+
+    """
+    field, descending = sort_field(filters.sort)
+    clauses = _filter_clauses(filters)
+    if len(clauses) > 1:
+        msg = f"Filter on one field at a time, not {', '.join(sorted(clauses))}"
+        raise ValueError(msg)
+    if clauses and field not in clauses:
+        (filtered,) = clauses
+        msg = f"Sort by {filtered} when filtering on it"
+        raise ValueError(msg)
+
+    column = SORT_COLUMNS[field]
+    order = (column.desc(), Item.id.desc()) if descending else (column, Item.id)
+    return statement.where(*clauses.get(field, ())).order_by(*order)
+
+
+def after_cursor(
+    statement: Select, sort: ItemSort, key: object, item_id: UUID
+) -> Select:
+    """Restrict an ordered items query to the rows after a keyset position.
+
+    Returns:
+        The statement, continuing after ``(key, item_id)`` in ``sort`` order.
+
+    """
+    field, descending = sort_field(sort)
+    position = tuple_(SORT_COLUMNS[field], Item.id)
+    if descending:
+        return statement.where(position < tuple_(key, item_id))
+    return statement.where(position > tuple_(key, item_id))
+
+
+ItemFiltersDep = Annotated[ItemFilterParams, Depends()]
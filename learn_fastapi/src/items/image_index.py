@@ -0,0 +1,108 @@
+import asyncio
+import mimetypes
+import re
+from pathlib import Path
+from typing import Annotated, NamedTuple
+
+from fastapi import Depends
+
+from learn_fastapi.src.constants import IMAGES_DIR
+
+from .schema import ImageSize
+
+SHA256_HEX = re.compile(r"^[0-9a-f]{64}$")
+
+_VARIANT_SIZES = {f".{size}" for size in ImageSize}
+
+
+class ImageEntry(NamedTuple):
+    path: Path
+    media_type: str
+
+
+def _entry(path: Path) -> ImageEntry:
+    media_type, _ = mimetypes.guess_type(path.name)
+    return ImageEntry(path, media_type or f"image/{path.suffix.lstrip('.')}")
+
+
+def _is_original(path: Path) -> bool:
+    # Temporary uploads are dot files; variants are named <digest>.<size>.<ext>
+    return (
+        not path.name.startswith(".") and Path(path.stem).suffix not in _VARIANT_SIZES
+    )
+
+
+class ImageIndex:
+    """In-memory map from an image's name without extension to its file.
+
+    Lookups are dictionary hits however many images are stored. The index is
+    filled by one scan of ``root`` and kept current as images are stored and
+    pruned. A hashed name missing from it, e.g. uploaded through another worker,
+    is looked up in its own shard directory only.
+    """
+
+    def __init__(self, root: Path) -> None:
+        """Create an empty index; it is filled on first use.
+
+        Args:
+            root: Directory the images are stored under.
+
+        """
+        self.root = root
+        self._entries: dict[str, ImageEntry] = {}
+        self._built = False
+
+    def build(self) -> None:
+        entries = {
+            path.stem: _entry(path)
+            for path in self.root.rglob("*")
+            if path.is_file() and _is_original(path)
+        }
+        self._entries = entries
+        self._built = True
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._built = False
+
+    def add(self, path: Path) -> None:
+        self._entries[path.stem] = _entry(path)
+
+    def discard(self, stem: str) -> None:
+        self._entries.pop(stem, None)
+
+    async def lookup(self, stem: str) -> ImageEntry | None:
+        """Find the stored original named ``stem``.
+
+        Returns:
+            The file and media type, or None if no such image is stored.
+
+        """
+        if not self._built:
+            await asyncio.to_thread(self.build)
+
+        entry = self._entries.get(stem)
+        if entry is None and SHA256_HEX.match(stem):
+            shard = self.root / stem[:2] / stem[2:4]
+            matches = await asyncio.to_thread(list, shard.glob(f"{stem}.*"))
+            originals = [path for path in matches if path.stem == stem]
+            if originals:
+                self.add(originals[0])
+                entry = self._entries[stem]
+        return entry
+
+
+_image_index = ImageIndex(IMAGES_DIR)
+
+
+def get_image_index() -> ImageIndex:
+    """Return the index used to resolve image names to files.
+
+    Returns:
+        The active image index.
+
+    """
+    return _image_index
+
+
+ImageIndexDep = Annotated[ImageIndex, Depends(get_image_index)]
@@ -0,0 +1,115 @@
+import csv
+import io
+import uuid
+from collections.abc import Iterator
+from datetime import UTC, datetime
+from itertools import islice
+from typing import BinaryIO
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Item
+from .schema import ImportFormat, ItemImportErrorSchema, ItemSchema
+
+# Rejected rows reported back to the client; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+# Columns written for every imported row, in COPY order
+IMPORT_COLUMNS = (
+    "id",
+    "name",
+    "description",
+    "price",
+    "tax",
+    "image_url",
+    "created_at",
+    "updated_at",
+)
+
+
+def iter_records(
+    file: BinaryIO, import_format: ImportFormat
+) -> Iterator[tuple[int, str | dict]]:
+    """Lazily read raw records from an uploaded file.
+
+    Yields:
+        ``(line_number, record)`` pairs: a JSON line for NDJSON, or a column
+        mapping for CSV.
+
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8", newline="")
+    if import_format is ImportFormat.CSV:
+        reader = csv.DictReader(text)
+        for row in reader:
+            # Empty cells fall back to the schema defaults
+            yield reader.line_num, {key: value for key, value in row.items() if value}
+    else:
+        for line_number, line in enumerate(text, start=1):
+            if line.strip():
+                yield line_number, line
+
+
+def read_batch(
+    records: Iterator[tuple[int, str | dict]], batch_size: int
+) -> tuple[list[ItemSchema], list[ItemImportErrorSchema], bool]:
+    """Validate up to ``batch_size`` records against `ItemSchema`.
+
+    Returns:
+        The valid items, the rejected records and whether the input is exhausted.
+
+    """
+    items: list[ItemSchema] = []
+    errors: list[ItemImportErrorSchema] = []
+    consumed = 0
+    for line_number, record in islice(records, batch_size):
+        consumed += 1
+        try:
+            if isinstance(record, str):
+                items.append(ItemSchema.model_validate_json(record))
+            else:
+                items.append(ItemSchema.model_validate(record))
+        except ValidationError as exception:
+            errors.append(
+                ItemImportErrorSchema(
+                    line=line_number,
+                    detail="; ".join(error["msg"] for error in exception.errors()),
+                )
+            )
+    return items, errors, consumed < batch_size
+
+
+def _to_row(item: ItemSchema, now: datetime) -> tuple:
+    return (
+        uuid.uuid7(),
+        item.name,
+        item.description,
+        item.price,
+        item.tax,
+        item.image_url or "",
+        now,
+        now,
+    )
+
+
+async def write_batch(session: AsyncSession, items: list[ItemSchema]) -> None:
+    """Insert a validated batch inside the session's transaction.
+
+    PostgreSQL receives the rows through asyncpg's binary ``COPY``; other
+    databases get a batched executemany ``INSERT``.
+    """
+    now = datetime.now(tz=UTC)
+    rows = [_to_row(item, now) for item in items]
+    connection = await session.connection()
+
+    if connection.dialect.name == "postgresql":
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(  # ty:ignore[possibly-missing-attribute]
+            Item.__tablename__, records=rows, columns=IMPORT_COLUMNS
+        )
+    else:
+        await connection.execute(
+            insert(Item.__table__),
+            [dict(zip(IMPORT_COLUMNS, row, strict=True)) for row in rows],
+        )
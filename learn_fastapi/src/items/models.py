@@ -1,4 +1,5 @@
-from sqlalchemy.orm import Mapped
+from sqlalchemy import DDL, Index, event, text
+from sqlalchemy.orm import Mapped, mapped_column
 
 from learn_fastapi.src.database import Base
 from learn_fastapi.src.utils.annotations import (
@@ -9,20 +10,210 @@ from learn_fastapi.src.utils.annotations import (
 
 from .annotations import (
     float_default,
+    float_total,
+    int_default_zero,
+    int_key,
+    int_serial_pk,
+    int_version,
+    str_codepoint,
     str_default,
-    str_indexed,
+    str_sha256_pk,
+    str_unique,
     str_url,
 )
 
+# Full-text document of an item; queries must repeat it verbatim to use its index
+SEARCH_DOCUMENT = "to_tsvector('simple', name || ' ' || description)"
+
 
 class Item(Base):
     __tablename__ = "items"
+    __table_args__ = (
+        # Keyset pagination walks items in (<sort field>, id) order, and range
+        # filters use the index of the field they filter on
+        Index("ix_items_created_at_id", "created_at", "id"),
+        Index("ix_items_updated_at_id", "updated_at", "id"),
+        Index("ix_items_name_id", "name", "id"),
+        Index("ix_items_price_id", "price", "id"),
+        Index("ix_items_tax_id", "tax", "id"),
+        Index("ix_items_total_id", "total", "id"),
+        # Search: word prefixes through the full-text index, fuzzy names
+        # through trigrams. SQLite uses the in-process index in search.py
+        Index("ix_items_search", text(SEARCH_DOCUMENT), postgresql_using="gin").ddl_if(
+            dialect="postgresql"
+        ),
+        Index(
+            "ix_items_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id: Mapped[int_pk]
-    name: Mapped[str_indexed]
+    name: Mapped[str_codepoint]
     description: Mapped[str_default]
     price: Mapped[float_default]
     tax: Mapped[float_default]
+    # Stored so that it can be indexed for filtering and sorting
+    total: Mapped[float_total]
     image_url: Mapped[str_url]
     created_at: Mapped[timestamp_created]
     updated_at: Mapped[timestamp_updated]
+    # Bumped by every write; conditional writes compare it instead of locking
+    version: Mapped[int_version] = mapped_column()
+
+    __mapper_args__ = {"version_id_col": version}  # noqa: RUF012
+
+
+event.listen(
+    Item.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
+class ImageBlob(Base):
+    """An uploaded image stored once under its SHA-256 digest."""
+
+    __tablename__ = "image_blobs"
+
+    sha256: Mapped[str_sha256_pk]
+    url: Mapped[str_unique]
+    size: Mapped[int]
+    content_type: Mapped[str | None]
+    # Number of items whose image_url points at this blob
+    ref_count: Mapped[int_default_zero]
+    created_at: Mapped[timestamp_created]
+
+
+# Upper bounds of the price histogram buckets; the last bucket is unbounded
+PRICE_BUCKET_BOUNDS = (10.0, 50.0, 100.0, 500.0, 1000.0)
+
+
+def price_bucket_sql(price: str) -> str:
+    """Spell the histogram bucket of a price as a SQL expression.
+
+    Returns:
+        A ``CASE`` expression numbering the buckets from 0.
+
+    """
+    cases = " ".join(
+        f"WHEN {price} < {bound} THEN {bucket}"
+        for bucket, bound in enumerate(PRICE_BUCKET_BOUNDS)
+    )
+    return f"CASE {cases} ELSE {len(PRICE_BUCKET_BOUNDS)} END"
+
+
+class ItemPriceBucket(Base):
+    """Rolled-up totals of the items whose price falls in one histogram bucket.
+
+    The statistics are the sum of these rows and of the pending
+    `ItemStatsDelta` rows, so they are read from a handful of rows instead of
+    a table scan. Only `roll_up_item_stats` writes here, which keeps item
+    writers from queueing on the six rows.
+    """
+
+    __tablename__ = "item_stats"
+
+    bucket: Mapped[int_key]
+    count: Mapped[int_default_zero]
+    price_sum: Mapped[float_default]
+    tax_sum: Mapped[float_default]
+
+
+class ItemStatsDelta(Base):
+    """A change to the totals of one bucket, not yet rolled up.
+
+    Triggers on ``items`` append one on every insert, update and delete,
+    whichever code path or process makes it. Appending takes no lock another
+    writer waits on, unlike updating a shared total row.
+    """
+
+    __tablename__ = "item_stats_deltas"
+
+    id: Mapped[int_serial_pk]
+    bucket: Mapped[int]
+    count: Mapped[int]
+    price_sum: Mapped[float]
+    tax_sum: Mapped[float]
+
+
+def _append_sql(sign: str, rows: str) -> str:
+    return (
+        "INSERT INTO item_stats_deltas (bucket, count, price_sum, tax_sum)"  # noqa: S608 - constants only
+        f" VALUES ({price_bucket_sql(f'{rows}.price')}, {sign}1,"
+        f" {sign}{rows}.price, {sign}{rows}.tax);"
+    )
+
+
+def _append_table_sql(sign: str, rows: str) -> str:
+    # Statement-level: one delta per touched bucket, however many rows changed
+    return (
+        "INSERT INTO item_stats_deltas (bucket, count, price_sum, tax_sum)"  # noqa: S608 - constants only
+        f" SELECT {price_bucket_sql('price')}, {sign}count(*),"
+        f" {sign}sum(price), {sign}sum(tax) FROM {rows} GROUP BY 1;"
+    )
+
+
+_buckets = ", ".join(
+    f"({bucket}, 0, 0, 0)" for bucket in range(len(PRICE_BUCKET_BOUNDS) + 1)
+)
+_ITEM_STATS_DDL = [
+    DDL(
+        "INSERT INTO item_stats (bucket, count, price_sum, tax_sum)"  # noqa: S608
+        f" VALUES {_buckets} ON CONFLICT DO NOTHING"
+    ),
+    # SQLite only has row-level triggers, and no CREATE OR REPLACE for them
+    *(
+        ddl.execute_if(dialect="sqlite")
+        for name, body in (
+            (
+                "item_stats_insert",
+                f"AFTER INSERT ON items BEGIN {_append_sql('', 'NEW')} END",
+            ),
+            (
+                "item_stats_update",
+                "AFTER UPDATE OF price, tax ON items BEGIN"
+                f" {_append_sql('-', 'OLD')} {_append_sql('', 'NEW')} END",
+            ),
+            (
+                "item_stats_delete",
+                f"AFTER DELETE ON items BEGIN {_append_sql('-', 'OLD')} END",
+            ),
+        )
+        for ddl in (
+            DDL(f"DROP TRIGGER IF EXISTS {name}"),
+            DDL(f"CREATE TRIGGER {name} {body}"),
+        )
+    ),
+    DDL(
+        "CREATE OR REPLACE FUNCTION item_stats_apply() RETURNS trigger"
+        " LANGUAGE plpgsql AS $$ BEGIN"
+        f" IF TG_OP <> 'INSERT' THEN {_append_table_sql('-', 'old_rows')} END IF;"
+        f" IF TG_OP <> 'DELETE' THEN {_append_table_sql('', 'new_rows')} END IF;"
+        " RETURN NULL; END $$"
+    ).execute_if(dialect="postgresql"),
+    *(
+        DDL(
+            f"CREATE OR REPLACE TRIGGER item_stats_{operation.lower()}"
+            f" AFTER {operation} ON items REFERENCING {tables}"
+            " FOR EACH STATEMENT EXECUTE FUNCTION item_stats_apply()"
+        ).execute_if(dialect="postgresql")
+        for operation, tables in (
+            ("INSERT", "NEW TABLE AS new_rows"),
+            ("UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+            ("DELETE", "OLD TABLE AS old_rows"),
+        )
+    ),
+]
+# After every table exists, since the triggers write to item_stats_deltas
+for _ddl in _ITEM_STATS_DDL:
+    event.listen(Base.metadata, "after_create", _ddl)
+event.listen(
+    Base.metadata,
+    "before_drop",
+    DDL("DROP FUNCTION IF EXISTS item_stats_apply() CASCADE").execute_if(
+        dialect="postgresql"
+    ),
+)
@@ -0,0 +1,52 @@
+import base64
+import binascii
+from collections.abc import Callable
+from datetime import datetime
+from uuid import UUID
+
+# Response header carrying the cursor of the next keyset page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort: str, key: datetime | float | str, item_id: UUID) -> str:
+    """Encode the position of the last item of a page as an opaque cursor.
+
+    Returns:
+        A URL-safe token encoding ``(sort, key, id)``, where ``key`` is the
+        value of the field the page is sorted by.
+
+    """
+    value = key.isoformat() if isinstance(key, datetime) else str(key)
+    raw = f"{sort}|{value}|{item_id.hex}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor[T](
+    cursor: str, sort: str, parse_key: Callable[[str], T] = datetime.fromisoformat
+) -> tuple[T, UUID]:
+    """Decode a cursor produced by `encode_cursor`.
+
+    Args:
+        cursor: The cursor sent by the client.
+        sort: The order of the requested page, which the cursor must share.
+        parse_key: Converts the encoded sort key back to a column value.
+
+    Returns:
+        The ``(key, id)`` keyset position the cursor points at.
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another order.
+
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        cursor_sort, position = base64.urlsafe_b64decode(padded).decode().split("|", 1)
+        key, item_id = position.rsplit("|", 1)
+        parsed = parse_key(key), UUID(item_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exception:
+        msg = "Invalid pagination cursor"
+        raise ValueError(msg) from exception
+    if cursor_sort != sort:
+        msg = f"Cursor was issued for sort={cursor_sort}, not sort={sort}"
+        raise ValueError(msg)
+    return parsed
@@ -1,173 +1,1021 @@
 import asyncio
+import time
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager, suppress
+from pathlib import Path
 from uuid import UUID
 
-import aiofiles
-from fastapi import APIRouter, HTTPException, UploadFile
-from fastapi.responses import FileResponse
-from sqlalchemy import select, update
-from starlette.status import HTTP_200_OK, HTTP_404_NOT_FOUND
+import aiofiles.os
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    FastAPI,
+    HTTPException,
+    Response,
+    UploadFile,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import bindparam, delete, func, insert, select, tuple_, update
+from starlette.status import (
+    HTTP_200_OK,
+    HTTP_201_CREATED,
+    HTTP_304_NOT_MODIFIED,
+    HTTP_404_NOT_FOUND,
+    HTTP_412_PRECONDITION_FAILED,
+    HTTP_422_UNPROCESSABLE_CONTENT,
+    HTTP_428_PRECONDITION_REQUIRED,
+)
 
-from learn_fastapi.src.constants import IMAGES_DIR
-from learn_fastapi.src.database import AsyncSessionDep
+from learn_fastapi.src.config import settings
+from learn_fastapi.src.database import AsyncSessionDep, AsyncSessionLocal
+from learn_fastapi.src.static_files import REVALIDATE_CACHE_CONTROL, CachedFileResponse
+from learn_fastapi.src.utils.etag import (
+    etag_matches,
+    if_match_versions,
+    version_etag,
+    weak_etag,
+)
 
 from .annotations import (
+    MAX_BATCH_QUERY_IDS,
+    ExportFormatQuery,
+    IfMatch,
+    IfNoneMatch,
+    ImageAccept,
     ImageCaption,
     ImageFile,
     ImageFilename,
     ImageFileOptional,
+    ImageSizeQuery,
+    ImportFile,
+    ImportFormatQuery,
+    ItemBatchIds,
+    ItemBatchIdsQuery,
+    ItemBulkCreate,
+    ItemBulkDelete,
+    ItemBulkUpdate,
+    ItemCountApproximate,
+    ItemCursor,
     ItemDescription,
+    ItemFields,
+    ItemLimit,
     ItemName,
+    ItemOffset,
     ItemPrice,
+    ItemSearchQuery,
     ItemTax,
 )
+from .cache import CachedItem, ItemCacheDep
+from .exporter import ENCODERS, MEDIA_TYPES, stream_partitions
+from .filtering import (
+    KEY_PARSERS,
+    SORT_COLUMNS,
+    ItemFiltersDep,
+    after_cursor,
+    apply_filters,
+    sort_field,
+)
+from .image_index import ImageIndexDep, get_image_index
+from .importer import MAX_REPORTED_ERRORS, iter_records, read_batch, write_batch
 from .models import Item
+from .pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
 from .schema import (
+    ExportFormat,
     ImageSchema,
+    ImportFormat,
+    ItemBatchSchema,
+    ItemBulkResultSchema,
+    ItemCountSchema,
+    ItemImportSummarySchema,
     ItemSchema,
+    ItemStatsSchema,
     ItemUpdateSchema,
 )
+from .search import SearchIndexDep, postgres_search, tokenize
+from .serializers import (
+    ITEM_FIELDS,
+    JSON_MEDIA_TYPE,
+    dump_batch,
+    dump_item,
+    dump_items,
+    item_columns,
+    parse_fields,
+)
+from .stats import (
+    estimate_item_count,
+    read_item_stats,
+    roll_up_item_stats_periodically,
+)
+from .storage import (
+    blob_path,
+    lock_item_image,
+    prune_orphaned_files,
+    prune_unreferenced_blobs,
+    release_image_urls,
+    store_image,
+)
+from .variants import (
+    VariantPipelineDep,
+    accepted_variants,
+    get_variant_pipeline,
+    variant_path,
+)
 
-router = APIRouter()
 
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncGenerator[None]:
+    # Blobs released while the previous process ran are only removed here,
+    # when no upload can be racing to reference them again.
+    async with AsyncSessionLocal() as session:
+        await prune_unreferenced_blobs(session)
+        await prune_orphaned_files(session)
+    await asyncio.to_thread(get_image_index().build)
+    stats_task = asyncio.create_task(
+        roll_up_item_stats_periodically(
+            AsyncSessionLocal, settings.item_stats_rollup_seconds
+        )
+    )
+    yield
+    stats_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await stats_task
+    get_variant_pipeline().shutdown()
 
-@router.get("/")
-async def read_items(
-    session: AsyncSessionDep, offset: int = 0, limit: int = 10
-) -> list[ItemSchema]:
-    list_items = await session.execute(select(Item).offset(offset).limit(limit))  # ty:ignore[invalid-argument-type]
-    return list_items.scalars().all()
 
+router = APIRouter(lifespan=lifespan)
+
+
+def _not_modified(etag: str, headers: dict[str, str] | None = None) -> Response:
+    return Response(
+        status_code=HTTP_304_NOT_MODIFIED, headers={"ETag": etag} | (headers or {})
+    )
+
+
+def _item_etag(version: int, fields: tuple[str, ...]) -> str:
+    # A sparse representation is not byte-identical to the full one, so it
+    # only gets the weak form of the item's tag
+    etag = version_etag(version)
+    return etag if fields == ITEM_FIELDS else f"W/{etag}"
+
+
+def _requested_fields(fields: str | None) -> tuple[str, ...]:
+    try:
+        return parse_fields(fields)
+    except ValueError as exception:
+        raise HTTPException(
+            status_code=HTTP_422_UNPROCESSABLE_CONTENT, detail=str(exception)
+        ) from exception
+
+
+@router.get("/", response_model=list[ItemSchema])
+async def read_items(  # noqa: PLR0913, PLR0917
+    session: AsyncSessionDep,
+    filters: ItemFiltersDep,
+    offset: ItemOffset = 0,
+    limit: ItemLimit = 10,
+    cursor: ItemCursor = None,
+    fields: ItemFields = None,
+    if_none_match: IfNoneMatch = None,
+) -> Response:
+    """List items, optionally filtered, in ``sort`` order (creation time by default).
+
+    Pages can be requested by ``offset`` or, for constant-cost deep pages, by the
+    ``cursor`` returned in the ``X-Next-Cursor`` header of the previous page.
+    The page carries a weak ETag over its rows' ids and versions; a
+    matching ``If-None-Match`` gets a 304 without serializing the page.
+
+    Filters are applied by the database, on one indexed field at a time; see
+    `apply_filters` for the combinations that are accepted.
+
+    Only the needed columns are fetched, as Core rows, and encoded straight to
+    JSON bytes, skipping ORM instances and response model validation. With
+    ``fields``, only those columns are selected and returned.
+
+    Returns:
+        The requested page of items as JSON, or an empty 304 response.
+
+    Raises:
+        HTTPException: If the cursor is malformed, combined with an offset or
+            issued for another ``sort``, an unknown field is requested, or no
+            index can serve the filters.
+
+    """
+    requested = _requested_fields(fields)
+    sort, _ = sort_field(filters.sort)
+    columns = item_columns(requested)
+    if sort not in {column.key for column in columns}:
+        columns += (SORT_COLUMNS[sort],)
+    try:
+        statement = apply_filters(select(*columns), filters).limit(limit)
+    except ValueError as exception:
+        raise HTTPException(
+            status_code=HTTP_422_UNPROCESSABLE_CONTENT, detail=str(exception)
+        ) from exception
+    if cursor is None:
+        statement = statement.offset(offset)
+    else:
+        if offset:
+            raise HTTPException(
+                status_code=HTTP_422_UNPROCESSABLE_CONTENT,
+                detail="Use either offset or cursor, not both",
+            )
+        try:
+            key, item_id = decode_cursor(cursor, filters.sort, KEY_PARSERS[sort])
+        except ValueError as exception:
+            raise HTTPException(
+                status_code=HTTP_422_UNPROCESSABLE_CONTENT, detail=str(exception)
+            ) from exception
+        statement = after_cursor(statement, filters.sort, key, item_id)
+
+    rows = (await session.execute(statement)).all()
+    headers = {"ETag": weak_etag(*((row.id, row.version) for row in rows))}
+    if len(rows) == limit:
+        last = rows[-1]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            filters.sort, getattr(last, sort), last.id
+        )
+    if etag_matches(if_none_match, headers["ETag"]):
+        return _not_modified(headers["ETag"], headers)
+    return Response(
+        dump_items(rows, requested), media_type=JSON_MEDIA_TYPE, headers=headers
+    )
+
+
+# ---------------------------------------------------------------------------
+# Bulk endpoints (declared before the /{id_param} routes they would shadow)
+# ---------------------------------------------------------------------------
+
+
+@router.post("/bulk")
+async def bulk_create_items(
+    session: AsyncSessionDep, search_index: SearchIndexDep, items: ItemBulkCreate
+) -> list[ItemBulkResultSchema]:
+    """Create many items with one multi-row INSERT in a single transaction.
+
+    Returns:
+        One result per submitted item, in request order.
+
+    """
+    rows = [
+        item.model_dump(exclude={"id"}) | {"image_url": item.image_url or ""}
+        for item in items
+    ]
+    result = await session.execute(
+        insert(Item).returning(Item, sort_by_parameter_order=True), rows
+    )
+    created = [
+        ItemSchema.model_validate(item_db, from_attributes=True)
+        for item_db in result.scalars()
+    ]
+    await session.commit()
+    search_index.invalidate(item.id for item in created)
+    return [
+        ItemBulkResultSchema(
+            id=item.id, status_code=HTTP_201_CREATED, detail="Item created", item=item
+        )
+        for item in created
+    ]
+
+
+@router.patch("/bulk")
+async def bulk_update_items(
+    session: AsyncSessionDep,
+    item_cache: ItemCacheDep,
+    search_index: SearchIndexDep,
+    items: ItemBulkUpdate,
+) -> list[ItemBulkResultSchema]:
+    """Apply conditional partial updates to many items in a single transaction.
+
+    Each element names the ``version`` its change is based on, as ``If-Match``
+    does for a single write. The rows are locked in id order and their versions
+    read, so concurrent batches cannot deadlock and every outcome is known
+    before writing. The elements still at their version are sent as one
+    executemany UPDATE guarded by that version, whose unset fields fall back to
+    the stored value, then the rows are read back with one ``IN`` query.
+
+    Returns:
+        One result per submitted update, in request order: 412 for an element
+        based on an outdated version, which leaves its item untouched.
+
+    """
+    table = Item.__table__
+    fields = ItemUpdateSchema.model_fields
+    result = await session.execute(
+        select(Item.id, Item.version)
+        .where(Item.id.in_({item.id for item in items}))  # ty:ignore[invalid-argument-type]
+        .order_by(Item.id)
+        .with_for_update()
+    )
+    versions: dict[UUID, int] = dict(result.tuples().all())
+    statuses = []
+    for item in items:
+        if item.id not in versions:
+            statuses.append(HTTP_404_NOT_FOUND)
+        elif versions[item.id] != item.version:
+            statuses.append(HTTP_412_PRECONDITION_FAILED)
+        else:
+            # A later element for the same item is based on the version this writes
+            versions[item.id] += 1
+            statuses.append(HTTP_200_OK)
+    applied = [
+        item
+        for item, status in zip(items, statuses, strict=True)
+        if status == HTTP_200_OK
+    ]
+
+    updated = {}
+    if applied:
+        await session.execute(
+            update(table)
+            .where(
+                table.c.id == bindparam("item_id"),
+                table.c.version == bindparam("expected_version"),
+            )
+            .values(
+                {
+                    field: func.coalesce(bindparam(f"new_{field}"), table.c[field])
+                    for field in fields
+                }
+                | {"version": table.c.version + 1}
+            ),
+            [
+                {"item_id": item.id, "expected_version": item.version}
+                | {f"new_{field}": getattr(item, field) for field in fields}
+                for item in applied
+            ],
+        )
+        result = await session.execute(
+            select(Item)
+            .where(Item.id.in_({item.id for item in applied}))  # ty:ignore[invalid-argument-type]
+            .execution_options(populate_existing=True)
+        )
+        updated = {
+            item_db.id: ItemSchema.model_validate(item_db, from_attributes=True)
+            for item_db in result.scalars()
+        }
+    await session.commit()
+
+    for item_id in updated:
+        item_cache.delete(item_id)
+    search_index.invalidate(updated)
+    details = {
+        HTTP_200_OK: "Item updated",
+        HTTP_404_NOT_FOUND: "Item not found",
+        HTTP_412_PRECONDITION_FAILED: "Item was modified since the given version",
+    }
+    return [
+        ItemBulkResultSchema(
+            id=item.id,
+            status_code=status,
+            detail=details[status],
+            item=updated[item.id] if status == HTTP_200_OK else None,
+        )
+        for item, status in zip(items, statuses, strict=True)
+    ]
+
+
+@router.post("/bulk/delete")
+async def bulk_delete_items(
+    session: AsyncSessionDep,
+    item_cache: ItemCacheDep,
+    search_index: SearchIndexDep,
+    items: ItemBulkDelete,
+) -> list[ItemBulkResultSchema]:
+    """Delete many items with one ``DELETE ... WHERE (id, version) IN (...)``.
+
+    Like the single delete, each element only deletes its item while it is
+    still at the given ``version``.
+
+    Returns:
+        One result per submitted item, in request order.
+
+    """
+    result = await session.execute(
+        delete(Item)
+        .where(
+            tuple_(Item.id, Item.version).in_(
+                [(item.id, item.version) for item in items]
+            )
+        )
+        .returning(Item.id, Item.image_url)
+    )
+    rows = result.all()
+    await release_image_urls(session, (row.image_url for row in rows))
+    deleted = {row.id for row in rows}
+    # Only failed deletions pay for telling a conflict from a missing item
+    modified: set[UUID] = set()
+    if remaining := {item.id for item in items} - deleted:
+        modified = set(
+            await session.scalars(select(Item.id).where(Item.id.in_(remaining)))  # ty:ignore[invalid-argument-type]
+        )
+    await session.commit()
+
+    for item_id in deleted:
+        item_cache.delete(item_id)
+    search_index.invalidate(deleted)
+    results = []
+    for item in items:
+        if item.id in deleted:
+            status, detail = HTTP_200_OK, "Item deleted successfully"
+        elif item.id in modified:
+            status = HTTP_412_PRECONDITION_FAILED
+            detail = "Item was modified since the given version"
+        else:
+            status, detail = HTTP_404_NOT_FOUND, "Item not found"
+        results.append(
+            ItemBulkResultSchema(id=item.id, status_code=status, detail=detail)
+        )
+    return results
+
+
+async def _read_batch(
+    session: AsyncSessionDep,
+    item_cache: ItemCacheDep,
+    ids: list[UUID],
+    fields: ItemFields,
+) -> Response:
+    """Resolve many ids with at most one ``SELECT ... WHERE id IN (...)``.
+
+    Cached items are served from the cache; only the rest are queried, and on
+    a full-field read the rows found are cached in turn.
+
+    Returns:
+        The items found in request order, and the ids that matched no item.
+
+    """
+    requested = _requested_fields(fields)
+    ids = list(dict.fromkeys(ids))
+    found = {}
+    for item_id in ids:
+        if (cached := item_cache.get(item_id)) is not None:
+            found[item_id] = cached.row
+
+    if uncached := [item_id for item_id in ids if item_id not in found]:
+        result = await session.execute(
+            select(*item_columns(requested)).where(Item.id.in_(uncached))  # ty:ignore[invalid-argument-type]
+        )
+        for row in result:
+            found[row.id] = values = row._asdict()
+            if requested == ITEM_FIELDS:
+                etag = version_etag(row.version)
+                item_cache.set(row.id, CachedItem(etag, dump_item(values), values))
+
+    body = dump_batch(
+        [found[item_id] for item_id in ids if item_id in found],
+        [item_id for item_id in ids if item_id not in found],
+        requested,
+    )
+    return Response(body, media_type=JSON_MEDIA_TYPE)
+
+
+@router.get("/batch", response_model=ItemBatchSchema)
+async def read_item_batch(
+    session: AsyncSessionDep,
+    item_cache: ItemCacheDep,
+    ids: ItemBatchIdsQuery,
+    fields: ItemFields = None,
+) -> Response:
+    """Read up to ``MAX_BATCH_QUERY_IDS`` items, e.g. ``?ids=<id>,<id>``.
+
+    Returns:
+        The items found in request order, and the ids that matched no item.
+
+    Raises:
+        HTTPException: If an id is malformed, too many ids are given, or an
+            unknown field is requested.
+
+    """
+    try:
+        parsed = [UUID(item_id) for part in ids.split(",") if (item_id := part.strip())]
+    except ValueError as exception:
+        raise HTTPException(
+            status_code=HTTP_422_UNPROCESSABLE_CONTENT, detail="Malformed item id"
+        ) from exception
+    if not 0 < len(parsed) <= MAX_BATCH_QUERY_IDS:
+        raise HTTPException(
+            status_code=HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=f"Between 1 and {MAX_BATCH_QUERY_IDS} ids must be given",
+        )
+    return await _read_batch(session, item_cache, parsed, fields)
+
+
+@router.post("/batch", response_model=ItemBatchSchema)
+async def read_item_batch_from_body(
+    session: AsyncSessionDep,
+    item_cache: ItemCacheDep,
+    ids: ItemBatchIds,
+    fields: ItemFields = None,
+) -> Response:
+    """Read many items whose ids do not fit in a query string.
+
+    Returns:
+        The items found in request order, and the ids that matched no item.
+
+    """
+    return await _read_batch(session, item_cache, ids, fields)
+
+
+@router.get("/search", response_model=list[ItemSchema])
+async def search_items(  # noqa: PLR0913, PLR0917
+    session: AsyncSessionDep,
+    search_index: SearchIndexDep,
+    query: ItemSearchQuery,
+    offset: ItemOffset = 0,
+    limit: ItemLimit = 10,
+    fields: ItemFields = None,
+) -> Response:
+    """Find items whose name or description contains every word of ``q``.
+
+    Words match as prefixes, so the endpoint also serves autocompletion.
+    Results are ranked, best match first, and paged by ``offset``. Postgres
+    answers from its full-text and trigram indexes; on SQLite the in-process
+    `SearchIndex` is used instead. The time spent finding and ranking the
+    page is reported in the ``Server-Timing`` header, in milliseconds.
+
+    Returns:
+        The requested page of matching items as JSON.
+
+    Raises:
+        HTTPException: If ``q`` contains no word or an unknown field is requested.
+
+    """
+    requested = _requested_fields(fields)
+    if not tokenize(query):
+        raise HTTPException(
+            status_code=HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="Search query must contain a word",
+        )
+
+    started = time.perf_counter()
+    columns = item_columns(requested)
+    connection = await session.connection()
+    if connection.dialect.name == "postgresql":
+        statement = postgres_search(columns, query).offset(offset).limit(limit)
+        rows = (await session.execute(statement)).all()
+    else:
+        await search_index.refresh(session)
+        page = search_index.search(query, offset + limit)[offset:]
+        result = await session.execute(select(*columns).where(Item.id.in_(page)))  # ty:ignore[invalid-argument-type]
+        by_id = {row.id: row for row in result}
+        rows = [by_id[item_id] for item_id in page if item_id in by_id]
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    return Response(
+        dump_items(rows, requested),
+        media_type=JSON_MEDIA_TYPE,
+        headers={"Server-Timing": f"search;dur={elapsed_ms:.2f}"},
+    )
+
+
+@router.get("/stats")
+async def read_item_stats_endpoint(session: AsyncSessionDep) -> ItemStatsSchema:
+    """Return item count, price and tax sums and averages, and a price histogram.
+
+    The figures are read from running totals and the changes appended to them
+    by every write since the last rollup, so the cost does not grow with the
+    table.
+
+    Returns:
+        ItemStatsSchema: The current statistics.
+
+    """
+    return await read_item_stats(session)
 
-@router.get("/{id_param}")
-async def read_item(id_param: UUID, session: AsyncSessionDep) -> ItemSchema:
-    item = await session.get(Item, id_param)
-    if item is None:
-        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Item not found")
-    return item
+
+@router.get("/stats/count")
+async def count_items(
+    session: AsyncSessionDep, *, approximate: ItemCountApproximate = False
+) -> ItemCountSchema:
+    """Return the number of items, or a planner estimate if ``approximate``.
+
+    Returns:
+        ItemCountSchema: The count, and whether it is an estimate.
+
+    """
+    if approximate:
+        return await estimate_item_count(session)
+    return ItemCountSchema(
+        count=(await read_item_stats(session)).count, approximate=False
+    )
+
+
+@router.post("/import")
+async def import_items(
+    session: AsyncSessionDep,
+    search_index: SearchIndexDep,
+    import_file: ImportFile,
+    import_format: ImportFormatQuery = None,
+) -> ItemImportSummarySchema:
+    """Stream an NDJSON or CSV file of items into the database.
+
+    The upload is read and validated in fixed-size batches, so memory use does
+    not grow with the file. All valid rows are committed in one transaction and
+    invalid rows are skipped and reported.
+
+    Returns:
+        ItemImportSummarySchema: Counts of imported and rejected records.
+
+    Raises:
+        HTTPException: If the file is not valid UTF-8 text.
+
+    """
+    if import_format is None:
+        filename = (import_file.filename or "").lower()
+        import_format = (
+            ImportFormat.CSV if filename.endswith(".csv") else ImportFormat.NDJSON
+        )
+
+    records = iter_records(import_file.file, import_format)
+    summary = ItemImportSummarySchema()
+    exhausted = False
+    while not exhausted:
+        try:
+            items, errors, exhausted = await asyncio.to_thread(
+                read_batch, records, settings.item_import_batch_size
+            )
+        except UnicodeDecodeError as exception:
+            raise HTTPException(
+                status_code=HTTP_422_UNPROCESSABLE_CONTENT,
+                detail="Import file must be UTF-8 encoded",
+            ) from exception
+        if items:
+            await write_batch(session, items)
+        summary.imported += len(items)
+        summary.rejected += len(errors)
+        summary.errors.extend(errors[: MAX_REPORTED_ERRORS - len(summary.errors)])
+
+    await session.commit()
+    if summary.imported:
+        # The imported ids are not collected; rebuild on the next search instead
+        search_index.clear()
+    return summary
+
+
+@router.get("/export")
+async def export_items(
+    session: AsyncSessionDep, export_format: ExportFormatQuery = ExportFormat.NDJSON
+) -> StreamingResponse:
+    """Stream the whole items table as NDJSON, CSV or an Arrow IPC stream.
+
+    Rows are pulled through a server-side cursor and encoded chunk by chunk,
+    skipping ORM objects and Pydantic models, so memory use stays constant.
+
+    Returns:
+        StreamingResponse: The encoded rows.
+
+    """
+    partitions = stream_partitions(session, settings.item_export_chunk_size)
+    return StreamingResponse(
+        ENCODERS[export_format](partitions),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="items.{export_format}"'
+        },
+    )
+
+
+# ---------------------------------------------------------------------------
+# Single item endpoints
+# ---------------------------------------------------------------------------
+
+
+@router.get("/{id_param}", response_model=ItemSchema)
+async def read_item(
+    id_param: UUID,
+    session: AsyncSessionDep,
+    item_cache: ItemCacheDep,
+    fields: ItemFields = None,
+    if_none_match: IfNoneMatch = None,
+) -> Response:
+    """Return one item, tagged with an ETag of its version.
+
+    The full item gets a strong ETag, to send back as ``If-Match`` when writing
+    it. A conditional request that misses the cache first reads only the
+    version through the primary key, and loads the row only if the item has changed.
+    The row is read as Core columns and the cache keeps its encoded JSON, so a
+    cache hit does no serialization at all. With ``fields``, a cache miss only
+    selects those columns, and the result is not cached.
+
+    Returns:
+        The item as JSON, or an empty 304 response if the client's copy is current.
+
+    Raises:
+        HTTPException: If no item matches ``id_param`` or an unknown field is
+            requested.
+
+    """
+    requested = _requested_fields(fields)
+    cached = item_cache.get(id_param)
+    if cached is None and if_none_match:
+        version = await session.scalar(
+            select(Item.version).where(Item.id == id_param)  # ty:ignore[invalid-argument-type]
+        )
+        if version is None:
+            raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Item not found")
+        etag = _item_etag(version, requested)
+        if etag_matches(if_none_match, etag):
+            return _not_modified(etag)
+
+    if cached is None:
+        row = (
+            await session.execute(
+                select(*item_columns(requested)).where(Item.id == id_param)  # ty:ignore[invalid-argument-type]
+            )
+        ).one_or_none()
+        if row is None:
+            raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Item not found")
+        etag = _item_etag(row.version, requested)
+        body = dump_item(row, requested)
+        if requested == ITEM_FIELDS:
+            item_cache.set(id_param, CachedItem(etag, body, row._asdict()))
+    else:
+        etag = cached.etag if requested == ITEM_FIELDS else f"W/{cached.etag}"
+        if etag_matches(if_none_match, etag):
+            return _not_modified(etag)
+        body = (
+            cached.body
+            if requested == ITEM_FIELDS
+            else dump_item(cached.row, requested)
+        )
+
+    return Response(body, media_type=JSON_MEDIA_TYPE, headers={"ETag": etag})
 
 
 @router.post("/")
-async def create_item(item: ItemSchema, session: AsyncSessionDep) -> ItemSchema:
+async def create_item(
+    item: ItemSchema, session: AsyncSessionDep, search_index: SearchIndexDep
+) -> ItemSchema:
     item_db = Item(**item.model_dump(exclude={"id"}))
     session.add(item_db)
     await session.commit()
     await session.refresh(item_db)
+    search_index.invalidate([item_db.id])
     return item
 
 
-@router.put("/{id_param}")
-async def update_item(
-    id_param: UUID, session: AsyncSessionDep, item_param: ItemUpdateSchema
-) -> ItemSchema:
-    item_db = await session.get(Item, id_param)
-    if item_db is None:
-        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Item not found")
+def _expected_versions(if_match: str | None) -> frozenset[int] | None:
+    """Read the item versions a conditional write may replace.
 
-    item_data = item_param.model_dump(exclude_unset=True, exclude={"id"})
-    await session.execute(
-        update(Item).where(Item.id == item_db.id).values(**item_data)  # ty:ignore[invalid-argument-type]
+    Returns:
+        The versions listed in ``If-Match``, or None if any version will do.
+
+    Raises:
+        HTTPException: If the request has no ``If-Match`` header.
+
+    """
+    if if_match is None:
+        raise HTTPException(
+            status_code=HTTP_428_PRECONDITION_REQUIRED,
+            detail="Send the item's ETag in If-Match to modify it",
+        )
+    return if_match_versions(if_match)
+
+
+async def _failed_write(
+    session: AsyncSessionDep, id_param: UUID, versions: frozenset[int] | None
+) -> HTTPException:
+    """Tell why a write to ``id_param`` matched no row.
+
+    Only failed writes pay for telling a conflict from a missing item.
+
+    Returns:
+        A 412 if the item exists at a version outside ``versions``, else a 404.
+
+    """
+    if versions is not None and await session.scalar(
+        select(Item.id).where(Item.id == id_param)  # ty:ignore[invalid-argument-type]
+    ):
+        return HTTPException(
+            status_code=HTTP_412_PRECONDITION_FAILED,
+            detail="Item was modified since the version in If-Match",
+        )
+    return HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Item not found")
+
+
+async def _update_item_returning(
+    session: AsyncSessionDep,
+    id_param: UUID,
+    values: dict[str, object],
+    versions: frozenset[int] | None = None,
+) -> tuple[ItemSchema, int]:
+    """Apply ``values`` to an item with a single ``UPDATE ... RETURNING``.
+
+    With ``versions``, the update only applies if the stored version is one of
+    them, so a write based on a stale read fails instead of overwriting a newer
+    one. The check and the write are the same statement: no row lock is held
+    between reading the item and writing it back.
+
+    Returns:
+        The item as stored after the update, and its new version.
+
+    Raises:
+        HTTPException: If no item matches ``id_param``, or it is no longer at
+            one of ``versions``.
+
+    """
+    statement = update(Item).where(Item.id == id_param)  # ty:ignore[invalid-argument-type]
+    if versions is not None:
+        statement = statement.where(Item.version.in_(versions))  # ty:ignore[unresolved-attribute]
+    result = await session.execute(
+        statement.values(**values, version=Item.version + 1).returning(Item)
     )
+    item_db = result.scalar_one_or_none()
+    if item_db is None:
+        raise await _failed_write(session, id_param, versions)
+
+    # Snapshot before commit, which expires the returned instance
+    item = ItemSchema.model_validate(item_db, from_attributes=True)
+    version = item_db.version
     await session.commit()
-    await session.refresh(item_db)
-    return item_db
+    return item, version
+
+
+@router.put("/{id_param}")
+async def update_item(  # noqa: PLR0913, PLR0917
+    id_param: UUID,
+    session: AsyncSessionDep,
+    item_cache: ItemCacheDep,
+    search_index: SearchIndexDep,
+    item_param: ItemUpdateSchema,
+    response: Response,
+    if_match: IfMatch = None,
+) -> ItemSchema:
+    versions = _expected_versions(if_match)
+    item_data = item_param.model_dump(exclude_unset=True, exclude={"id"})
+    item, version = await _update_item_returning(session, id_param, item_data, versions)
+    response.headers["ETag"] = version_etag(version)
+    item_cache.delete(id_param)
+    search_index.invalidate([id_param])
+    return item
 
 
 # PATCH
 @router.patch("/{id_param}")
-async def patch_item(
-    id_param: UUID, session: AsyncSessionDep, item_param: ItemUpdateSchema
+async def patch_item(  # noqa: PLR0913, PLR0917
+    id_param: UUID,
+    session: AsyncSessionDep,
+    item_cache: ItemCacheDep,
+    search_index: SearchIndexDep,
+    item_param: ItemUpdateSchema,
+    response: Response,
+    if_match: IfMatch = None,
 ) -> ItemSchema:
-    item_db = await session.get(Item, id_param)
-    if item_db is None:
-        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Item not found")
-
+    versions = _expected_versions(if_match)
     item_data = item_param.model_dump(exclude_unset=True, exclude={"id"})
-    [setattr(item_db, key, value) for key, value in item_data.items()]
-
-    await session.commit()
-    await session.refresh(item_db)
-    return item_db
+    item, version = await _update_item_returning(session, id_param, item_data, versions)
+    response.headers["ETag"] = version_etag(version)
+    item_cache.delete(id_param)
+    search_index.invalidate([id_param])
+    return item
 
 
 @router.delete("/{id_param}")
-async def delete_item(id_param: UUID, session: AsyncSessionDep) -> dict[str, str | int]:
-    item = await session.get(Item, id_param)
-    if item is None:
-        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Item not found")
-    await session.delete(item)
+async def delete_item(
+    id_param: UUID,
+    session: AsyncSessionDep,
+    item_cache: ItemCacheDep,
+    search_index: SearchIndexDep,
+    if_match: IfMatch = None,
+) -> dict[str, str | int]:
+    """Delete an item, if it is still at a version listed in ``If-Match``.
+
+    Like an update, a deletion based on a stale read fails with 412 instead of
+    discarding a change the client has not seen.
+
+    Returns:
+        A confirmation of the deletion.
+
+    Raises:
+        HTTPException: If ``If-Match`` is missing, no item matches
+            ``id_param``, or it is no longer at one of the listed versions.
+
+    """
+    versions = _expected_versions(if_match)
+    statement = delete(Item).where(Item.id == id_param)  # ty:ignore[invalid-argument-type]
+    if versions is not None:
+        statement = statement.where(Item.version.in_(versions))  # ty:ignore[unresolved-attribute]
+    result = await session.execute(statement.returning(Item.image_url))
+    image_url = result.scalar_one_or_none()
+    if image_url is None:
+        raise await _failed_write(session, id_param, versions)
+    await release_image_urls(session, [image_url])
     await session.commit()
+    item_cache.delete(id_param)
+    search_index.invalidate([id_param])
     return {"detail": "Item deleted successfully", "status_code": HTTP_200_OK}
 
 
 async def save_image_file(
-    image_file: UploadFile, caption: str = "No description provided"
+    session: AsyncSessionDep,
+    image_file: UploadFile,
+    caption: str = "No description provided",
 ) -> ImageSchema:
-    """Save the image to disk and return an Image Model.
+    """Store the image under its content hash and return an Image Model.
+
+    Identical uploads share one file and one blob row; the reference taken here
+    is committed together with the item that points at it.
 
     Returns:
         ImageSchema: The saved image model.
 
     Raises:
-        HTTPException: If the image file does not have a filename.
+        HTTPException: If the image file does not have a filename or is too large.
 
     """
-    if not image_file.filename:
+    # Only keep the final path component of the client-supplied name
+    filename = Path(image_file.filename or "").name
+    if filename in {"", ".", ".."}:
         raise HTTPException(status_code=422, detail="Image file must have a filename")
 
-    await asyncio.to_thread(IMAGES_DIR.mkdir, parents=True, exist_ok=True)
-    file_path = IMAGES_DIR / image_file.filename
-
-    if not file_path.exists():
-        async with aiofiles.open(file_path, "wb") as f:
-            await f.write(await image_file.read())
-
+    url = await store_image(session, image_file)
     return ImageSchema(
-        name=image_file.filename,
+        name=filename,
         description=caption,
         content_type=image_file.content_type,
-        url=f"/static/images/{image_file.filename}",
+        url=url,
     )
 
 
 @router.post("/image/{id_param}")
-async def submit_an_item_image(
+async def submit_an_item_image(  # noqa: PLR0913, PLR0917
     id_param: UUID,
     session: AsyncSessionDep,
+    item_cache: ItemCacheDep,
+    variants: VariantPipelineDep,
+    background_tasks: BackgroundTasks,
     image_file: ImageFile,
     caption: ImageCaption = "No description provided",
 ) -> ItemSchema:
-    item_db = await session.get(Item, id_param)
+    """Store an image and point the item at it, releasing its previous image.
 
-    if item_db is None:
-        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Item not found")
+    The item row is locked before the upload is stored, so a missing item costs
+    no file and concurrent uploads to one item release each image once.
 
-    image = await save_image_file(image_file, caption)
-    await session.execute(
-        update(Item).where(Item.id == item_db.id).values(image_url=image.url)  # ty:ignore[invalid-argument-type]
-    )
-    await session.commit()
-    await session.refresh(item_db)
-    return item_db
+    Returns:
+        The updated item.
+
+    Raises:
+        HTTPException: If the item does not exist, or the image is invalid.
+
+    """
+    previous_url = await lock_item_image(session, id_param)
+    image = await save_image_file(session, image_file, caption)
+    if previous_url:
+        await release_image_urls(session, [previous_url])
+    item, _ = await _update_item_returning(session, id_param, {"image_url": image.url})
+    item_cache.delete(id_param)
+    background_tasks.add_task(variants.process, blob_path(image.url))
+    return item
 
 
 @router.get("/image/")
-async def get_image(filename: ImageFilename) -> FileResponse:
-    matches = await asyncio.to_thread(lambda: list(IMAGES_DIR.glob(f"{filename}.*")))
-    if not matches:
+async def get_image(
+    filename: ImageFilename,
+    image_index: ImageIndexDep,
+    size: ImageSizeQuery = None,
+    accept: ImageAccept = None,
+) -> CachedFileResponse:
+    """Serve a stored image, or a resized variant of it when one is ready.
+
+    With ``size``, the most compact encoding listed in ``Accept`` is served if
+    it has been generated; otherwise the original is returned. Conditional and
+    ``Range`` requests are honoured, and hashed files are cacheable forever.
+
+    Returns:
+        CachedFileResponse: The chosen file.
+
+    Raises:
+        HTTPException: If no image matches ``filename``.
+
+    """
+    entry = await image_index.lookup(filename)
+    if entry is None:
         raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Image not found")
 
-    file_path = matches[0]
+    file_path, media_type = entry
+    headers = {}
+    if size is not None:
+        headers["Vary"] = "Accept"
+        for variant_type in accepted_variants(accept):
+            candidate = variant_path(file_path, size, variant_type)
+            if await aiofiles.os.path.exists(candidate):
+                file_path, media_type = candidate, variant_type
+                break
+        else:
+            # The variant may appear later, so this answer must not be kept
+            headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
 
-    return FileResponse(
-        path=file_path,
-        media_type=f"image/{file_path.suffix.lstrip('.')}",
-        filename=filename,
+    return CachedFileResponse(
+        path=file_path, media_type=media_type, filename=filename, headers=headers
     )
 
 
 @router.post("/with-image/")
 async def create_item_with_image(  # noqa: PLR0913, PLR0917
     session: AsyncSessionDep,
+    search_index: SearchIndexDep,
+    variants: VariantPipelineDep,
+    background_tasks: BackgroundTasks,
     name: ItemName = "Default Item",
     description: ItemDescription = "No description provided",
     price: ItemPrice = 0.00,
@@ -189,10 +1037,12 @@ async def create_item_with_image(  # noqa: PLR0913, PLR0917
         tax=tax,
     )
     if image_file:
-        image = await save_image_file(image_file, caption)
+        image = await save_image_file(session, image_file, caption)
         item_db.image_url = image.url
+        background_tasks.add_task(variants.process, blob_path(image.url))
 
     session.add(item_db)
     await session.commit()
     await session.refresh(item_db)
+    search_index.invalidate([item_db.id])
     return item_db
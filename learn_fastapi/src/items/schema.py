@@ -1,3 +1,4 @@
+from enum import StrEnum
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -42,3 +43,100 @@ class ItemUpdateSchema(BaseModel):
     )
     price: float | None = Field(ge=0, description="The price of the item", default=None)
     tax: float | None = Field(ge=0, description="The tax of the item", default=None)
+
+
+class ItemBulkUpdateSchema(ItemUpdateSchema):
+    id: UUID = Field(description="The id of the item to update")
+    version: int = Field(
+        ge=1, description="The version the update is based on, from the item's ETag"
+    )
+
+
+class ItemBulkDeleteSchema(BaseModel):
+    id: UUID = Field(description="The id of the item to delete")
+    version: int = Field(
+        ge=1, description="The version the deletion is based on, from the item's ETag"
+    )
+
+
+class ItemBulkResultSchema(BaseModel):
+    id: UUID | None = Field(description="The id of the item", default=None)
+    status_code: int = Field(description="The HTTP status of this element")
+    detail: str = Field(description="The outcome of this element")
+    item: ItemSchema | None = Field(
+        description="The item as stored after the operation", default=None
+    )
+
+
+class ItemBatchSchema(BaseModel):
+    items: list[ItemSchema] = Field(description="The items found, in request order")
+    missing: list[UUID] = Field(description="The requested ids with no item")
+
+
+class ItemSort(StrEnum):
+    """Sortable fields; a leading ``-`` sorts in descending order."""
+
+    CREATED_AT = "created_at"
+    CREATED_AT_DESC = "-created_at"
+    UPDATED_AT = "updated_at"
+    UPDATED_AT_DESC = "-updated_at"
+    NAME = "name"
+    NAME_DESC = "-name"
+    PRICE = "price"
+    PRICE_DESC = "-price"
+    TAX = "tax"
+    TAX_DESC = "-tax"
+    TOTAL = "total"
+    TOTAL_DESC = "-total"
+
+
+class PriceBucketSchema(BaseModel):
+    lower: float = Field(description="Lowest price in the bucket")
+    upper: float | None = Field(description="Price the bucket stops before, if any")
+    count: int = Field(description="Number of items in the bucket")
+
+
+class ItemStatsSchema(BaseModel):
+    count: int = Field(description="Number of items")
+    price_sum: float = Field(description="Sum of all prices")
+    price_avg: float | None = Field(description="Average price, if there are items")
+    tax_sum: float = Field(description="Sum of all taxes")
+    tax_avg: float | None = Field(description="Average tax, if there are items")
+    price_histogram: list[PriceBucketSchema] = Field(
+        description="Item counts per price range"
+    )
+
+
+class ItemCountSchema(BaseModel):
+    count: int = Field(description="Number of items")
+    approximate: bool = Field(description="Whether the count is an estimate")
+
+
+class ImportFormat(StrEnum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class ImageSize(StrEnum):
+    THUMBNAIL = "thumbnail"
+    SMALL = "small"
+    MEDIUM = "medium"
+
+
+class ExportFormat(StrEnum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+    ARROW = "arrow"
+
+
+class ItemImportErrorSchema(BaseModel):
+    line: int = Field(description="The line of the rejected record")
+    detail: str = Field(description="Why the record was rejected")
+
+
+class ItemImportSummarySchema(BaseModel):
+    imported: int = Field(description="Number of items written", default=0)
+    rejected: int = Field(description="Number of records rejected", default=0)
+    errors: list[ItemImportErrorSchema] = Field(
+        description="The first rejected records", default_factory=list
+    )
@@ -0,0 +1,187 @@
+import asyncio
+import bisect
+import heapq
+import itertools
+import re
+from collections.abc import Iterable
+from typing import Annotated, Any
+from uuid import UUID
+
+from fastapi import Depends
+from sqlalchemy import Select, func, literal_column, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from learn_fastapi.src.utils.metrics import register_metrics
+
+from .models import SEARCH_DOCUMENT, Item
+
+_WORD = re.compile(r"\w+")
+
+# Score of a query term found in a name rather than a description, and of an
+# exact word rather than a longer word it is a prefix of
+NAME_WEIGHT = 2.0
+PREFIX_WEIGHT = 0.5
+
+
+def tokenize(text: str) -> list[str]:
+    return _WORD.findall(text.lower())
+
+
+def postgres_search(columns: Iterable[Any], query: str) -> Select:
+    """Rank items against ``query`` with the full-text and trigram GIN indexes.
+
+    Every term matches as a word prefix, so partial input autocompletes; names
+    within trigram distance of the whole query also match, to absorb typos.
+
+    Returns:
+        A select of ``columns`` of the matching items, best match first.
+
+    """
+    # The document is spelled exactly as in the index, or the index is not used
+    document = literal_column(SEARCH_DOCUMENT)
+    tsquery = func.to_tsquery(
+        literal_column("'simple'"), " & ".join(f"{term}:*" for term in tokenize(query))
+    )
+    rank = func.ts_rank(document, tsquery) + func.similarity(Item.name, query)
+    return (
+        select(*columns)
+        .where(or_(document.op("@@")(tsquery), Item.name.op("%")(query)))
+        .order_by(rank.desc(), Item.id)
+    )
+
+
+class SearchIndex:
+    """In-process inverted index over item names and descriptions.
+
+    Stands in for the Postgres full-text index on SQLite. Words map to the
+    items containing them, and are also kept sorted so that every word starting
+    with a prefix is found by binary search. Items are ranked by the sum of
+    their best match per query term, and must match every term.
+
+    Writers report the ids they touched through `invalidate`; those items are
+    re-read before the next search. The index only sees writes made by this
+    process.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty index; it is filled on first search."""
+        self._postings: dict[str, dict[UUID, float]] = {}
+        self._words: list[str] = []
+        self._documents: dict[UUID, set[str]] = {}
+        self._dirty: set[UUID] = set()
+        self._built = False
+        self._lock = asyncio.Lock()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "documents": len(self._documents),
+            "words": len(self._words),
+            "pending_updates": len(self._dirty),
+        }
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._words.clear()
+        self._documents.clear()
+        self._dirty.clear()
+        self._built = False
+
+    def invalidate(self, item_ids: Iterable[UUID]) -> None:
+        if self._built:
+            self._dirty.update(item_ids)
+
+    def _remove(self, item_id: UUID) -> None:
+        for word in self._documents.pop(item_id, ()):
+            postings = self._postings[word]
+            del postings[item_id]
+            if not postings:
+                del self._postings[word]
+                del self._words[bisect.bisect_left(self._words, word)]
+
+    def _add(self, item_id: UUID, name: str, description: str) -> None:
+        weights = dict.fromkeys(tokenize(description), 1.0)
+        weights |= dict.fromkeys(tokenize(name), NAME_WEIGHT)
+        for word, weight in weights.items():
+            if word not in self._postings:
+                self._postings[word] = {}
+                bisect.insort(self._words, word)
+            self._postings[word][item_id] = weight
+        self._documents[item_id] = set(weights)
+
+    def _build(self, rows: Iterable[tuple[UUID, str, str]]) -> None:
+        self.clear()
+        for item_id, name, description in rows:
+            self._add(item_id, name, description)
+        self._built = True
+
+    async def refresh(self, session: AsyncSession) -> None:
+        """Load every item on first use, then re-read the invalidated ones."""
+        columns = select(Item.id, Item.name, Item.description)
+        async with self._lock:
+            if not self._built:
+                rows = (await session.execute(columns)).all()
+                await asyncio.to_thread(self._build, rows)
+                return
+            dirty, self._dirty = self._dirty, set()
+            if not dirty:
+                return
+            rows = (await session.execute(columns.where(Item.id.in_(dirty)))).all()  # ty:ignore[invalid-argument-type]
+            for item_id in dirty:
+                self._remove(item_id)
+            for item_id, name, description in rows:
+                self._add(item_id, name, description)
+
+    def _term_scores(self, term: str) -> dict[UUID, float]:
+        scores: dict[UUID, float] = {}
+        start = bisect.bisect_left(self._words, term)
+        for word in itertools.islice(self._words, start, None):
+            if not word.startswith(term):
+                break
+            factor = 1.0 if word == term else PREFIX_WEIGHT
+            for item_id, weight in self._postings[word].items():
+                scores[item_id] = max(scores.get(item_id, 0.0), weight * factor)
+        return scores
+
+    def search(self, query: str, limit: int) -> list[UUID]:
+        """Rank the items matching every term of ``query``, as word prefixes.
+
+        Only the best ``limit`` matches are ordered, not every match.
+
+        Returns:
+            At most ``limit`` item ids, best match first.
+
+        """
+        totals: dict[UUID, float] | None = None
+        for term in dict.fromkeys(tokenize(query)):
+            scores = self._term_scores(term)
+            if totals is None:
+                totals = scores
+            else:
+                totals = {
+                    item_id: total + scores[item_id]
+                    for item_id, total in totals.items()
+                    if item_id in scores
+                }
+            if not totals:
+                return []
+        ranked = totals or {}
+        return heapq.nsmallest(
+            limit, ranked, key=lambda item_id: (-ranked[item_id], item_id)
+        )
+
+
+_search_index = SearchIndex()
+register_metrics("items.search_index", _search_index.stats)
+
+
+def get_search_index() -> SearchIndex:
+    """Return the in-process search index used on SQLite.
+
+    Returns:
+        The active search index.
+
+    """
+    return _search_index
+
+
+SearchIndexDep = Annotated[SearchIndex, Depends(get_search_index)]
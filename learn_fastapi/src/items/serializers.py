@@ -0,0 +1,110 @@
+from collections.abc import Sequence
+from functools import cache
+from typing import Any, TypedDict, get_type_hints
+from uuid import UUID
+
+from pydantic import TypeAdapter
+from sqlalchemy import Row
+
+from .models import Item
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+class ItemRow(TypedDict):
+    """The JSON shape of `ItemSchema`, filled straight from a Core row."""
+
+    id: UUID
+    name: str
+    description: str
+    price: float
+    tax: float
+    image_url: str | None
+
+
+# Columns an item response can contain, in response order
+RESPONSE_COLUMNS = (
+    Item.id,
+    Item.name,
+    Item.description,
+    Item.price,
+    Item.tax,
+    Item.image_url,
+)
+ITEM_FIELDS = tuple(column.key for column in RESPONSE_COLUMNS)
+
+# Always selected: ETags are built from id and version, cursors from created_at
+_BOOKKEEPING_COLUMNS = (Item.id, Item.created_at, Item.version)
+
+ITEM_COLUMNS = RESPONSE_COLUMNS + _BOOKKEEPING_COLUMNS[1:]
+
+
+def parse_fields(fields: str | None) -> tuple[str, ...]:
+    """Turn a ``fields=`` query value into the fields to return.
+
+    Returns:
+        The requested fields in response order, or every field if none are given.
+
+    Raises:
+        ValueError: If a requested field does not exist.
+
+    """
+    if fields is None:
+        return ITEM_FIELDS
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    if unknown := requested - set(ITEM_FIELDS):
+        msg = f"Unknown fields: {', '.join(sorted(unknown))}"
+        raise ValueError(msg)
+    if not requested:
+        msg = "At least one field must be requested"
+        raise ValueError(msg)
+    return tuple(name for name in ITEM_FIELDS if name in requested)
+
+
+def item_columns(fields: tuple[str, ...] = ITEM_FIELDS) -> tuple[Any, ...]:
+    """Select only the requested response columns plus the bookkeeping ones.
+
+    Returns:
+        The columns to pass to ``select``.
+
+    """
+    requested = tuple(column for column in RESPONSE_COLUMNS if column.key in fields)
+    return requested + tuple(
+        column for column in _BOOKKEEPING_COLUMNS if column.key not in fields
+    )
+
+
+@cache
+def _adapters(fields: tuple[str, ...]) -> tuple[TypeAdapter, ...]:
+    # One TypedDict per field set, built once: serializing through it skips model
+    # instances and validation, and drops the columns it does not declare
+    if fields == ITEM_FIELDS:
+        row_type = ItemRow
+    else:
+        hints = get_type_hints(ItemRow)
+        # The keys are only known at runtime, hence the functional syntax
+        row_type = TypedDict(
+            f"ItemRow[{','.join(fields)}]", {name: hints[name] for name in fields}
+        )
+    batch_type = TypedDict(  # noqa: UP013 - the item type is only known at runtime
+        f"ItemBatch[{','.join(fields)}]",
+        {"items": list[row_type], "missing": list[UUID]},
+    )
+    return TypeAdapter(row_type), TypeAdapter(list[row_type]), TypeAdapter(batch_type)
+
+
+def dump_item(row: Row | dict, fields: tuple[str, ...] = ITEM_FIELDS) -> bytes:
+    values = row if isinstance(row, dict) else row._asdict()
+    return _adapters(fields)[0].dump_json(values)
+
+
+def dump_items(rows: Sequence[Row], fields: tuple[str, ...] = ITEM_FIELDS) -> bytes:
+    return _adapters(fields)[1].dump_json([row._asdict() for row in rows])
+
+
+def dump_batch(
+    rows: Sequence[dict[str, Any]],
+    missing: Sequence[UUID],
+    fields: tuple[str, ...] = ITEM_FIELDS,
+) -> bytes:
+    return _adapters(fields)[2].dump_json({"items": rows, "missing": missing})
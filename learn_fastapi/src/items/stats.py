@@ -0,0 +1,291 @@
+"""Item statistics kept as rolled-up totals plus appended deltas.
+
+Triggers append a delta for every item write, `roll_up_item_stats` folds them
+into the totals every few seconds, and `recompute_item_stats` corrects drift
+against a full scan. The recompute is too expensive to run in every worker;
+schedule it in one place instead, e.g. hourly from cron:
+
+    uv run python -m learn_fastapi.src.items.stats
+"""
+
+import asyncio
+from collections import defaultdict
+
+from sqlalchemy import (
+    Select,
+    bindparam,
+    case,
+    delete,
+    func,
+    insert,
+    literal_column,
+    select,
+    text,
+    union_all,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from learn_fastapi.src.database import AsyncSessionLocal, engine
+from learn_fastapi.src.utils.metrics import register_metrics
+
+from .models import PRICE_BUCKET_BOUNDS, Item, ItemPriceBucket, ItemStatsDelta
+from .schema import ItemCountSchema, ItemStatsSchema, PriceBucketSchema
+
+# Transaction-level advisory lock held by whoever writes to item_stats, so
+# rollups and recomputes from several processes take turns
+MAINTENANCE_LOCK_KEY = 0x6974656D5F737461
+
+_price_bucket = case(
+    *((Item.price < bound, bucket) for bucket, bound in enumerate(PRICE_BUCKET_BOUNDS)),
+    else_=len(PRICE_BUCKET_BOUNDS),
+)
+
+_maintenance_stats = {
+    "rollups": 0,
+    "rolled_up_deltas": 0,
+    "failed": 0,
+    "recomputes": 0,
+    "last_count_drift": 0,
+}
+register_metrics("items.stats", lambda: _maintenance_stats)
+
+
+def _running_totals() -> Select:
+    """Select the per-bucket totals, including the deltas not rolled up yet."""
+    rows = union_all(
+        select(
+            ItemPriceBucket.bucket,
+            ItemPriceBucket.count,
+            ItemPriceBucket.price_sum,
+            ItemPriceBucket.tax_sum,
+        ),
+        select(
+            ItemStatsDelta.bucket,
+            ItemStatsDelta.count,
+            ItemStatsDelta.price_sum,
+            ItemStatsDelta.tax_sum,
+        ),
+    ).subquery()
+    return (
+        select(
+            rows.c.bucket,
+            func.sum(rows.c.count).label("count"),
+            func.sum(rows.c.price_sum).label("price_sum"),
+            func.sum(rows.c.tax_sum).label("tax_sum"),
+        )
+        .group_by(rows.c.bucket)
+        .order_by(rows.c.bucket)
+    )
+
+
+async def read_item_stats(session: AsyncSession) -> ItemStatsSchema:
+    """Assemble the item statistics from the per-bucket running totals.
+
+    Returns:
+        Count, sums and averages of price and tax, and the price histogram.
+
+    """
+    buckets = (await session.execute(_running_totals())).all()
+    histogram = []
+    count, price_sum, tax_sum = 0, 0.0, 0.0
+    lower = 0.0
+    for row, upper in zip(buckets, (*PRICE_BUCKET_BOUNDS, None), strict=True):
+        histogram.append(PriceBucketSchema(lower=lower, upper=upper, count=row.count))
+        count += row.count
+        price_sum += row.price_sum
+        tax_sum += row.tax_sum
+        lower = upper or lower
+    return ItemStatsSchema(
+        count=count,
+        price_sum=price_sum,
+        price_avg=price_sum / count if count else None,
+        tax_sum=tax_sum,
+        tax_avg=tax_sum / count if count else None,
+        price_histogram=histogram,
+    )
+
+
+async def estimate_item_count(session: AsyncSession) -> ItemCountSchema:
+    """Count items from the planner's statistics where the database keeps them.
+
+    On Postgres ``pg_class.reltuples`` is read, which costs nothing however
+    large the table is but is only as fresh as the last ``ANALYZE``. Elsewhere,
+    or before the table was ever analyzed, the exact running count is used.
+
+    Returns:
+        The count, flagged as approximate when it is an estimate.
+
+    """
+    connection = await session.connection()
+    if connection.dialect.name == "postgresql":
+        reltuples = await session.scalar(
+            text("SELECT reltuples FROM pg_class WHERE oid = 'items'::regclass")
+        )
+        # -1 until the table is first vacuumed or analyzed
+        if reltuples is not None and reltuples >= 0:
+            return ItemCountSchema(count=round(reltuples), approximate=True)
+    totals = _running_totals().subquery()
+    count = await session.scalar(select(func.sum(totals.c.count)))
+    return ItemCountSchema(count=count or 0, approximate=False)
+
+
+async def _claim_maintenance(session: AsyncSession) -> bool:
+    """Take the maintenance lock for the current transaction, without waiting.
+
+    Returns:
+        False if another process holds it; SQLite writers are serialized anyway.
+
+    """
+    connection = await session.connection()
+    if connection.dialect.name != "postgresql":
+        return True
+    return bool(
+        await session.scalar(
+            select(func.pg_try_advisory_xact_lock(MAINTENANCE_LOCK_KEY))
+        )
+    )
+
+
+async def roll_up_item_stats(session: AsyncSession) -> int:
+    """Fold the committed deltas into the per-bucket totals.
+
+    The deltas are deleted and returned by one statement, so the deltas of
+    transactions still in flight are left for the next run. The totals are
+    updated in bucket order, by one process at a time.
+
+    Returns:
+        The number of deltas rolled up, 0 if another process is rolling up.
+
+    """
+    if not await _claim_maintenance(session):
+        await session.rollback()
+        return 0
+    result = await session.execute(
+        delete(ItemStatsDelta).returning(
+            ItemStatsDelta.bucket,
+            ItemStatsDelta.count,
+            ItemStatsDelta.price_sum,
+            ItemStatsDelta.tax_sum,
+        )
+    )
+    totals: defaultdict[int, list[float]] = defaultdict(lambda: [0, 0.0, 0.0])
+    moved = 0
+    for row in result:
+        bucket = totals[row.bucket]
+        bucket[0] += row.count
+        bucket[1] += row.price_sum
+        bucket[2] += row.tax_sum
+        moved += 1
+    if totals:
+        table = ItemPriceBucket.__table__
+        await session.execute(
+            update(table)
+            .where(table.c.bucket == bindparam("target"))
+            .values(
+                count=table.c.count + bindparam("add_count"),
+                price_sum=table.c.price_sum + bindparam("add_price_sum"),
+                tax_sum=table.c.tax_sum + bindparam("add_tax_sum"),
+            ),
+            [
+                {
+                    "target": bucket,
+                    "add_count": count,
+                    "add_price_sum": price_sum,
+                    "add_tax_sum": tax_sum,
+                }
+                for bucket, (count, price_sum, tax_sum) in sorted(totals.items())
+            ],
+        )
+    await session.commit()
+
+    _maintenance_stats["rollups"] += 1
+    _maintenance_stats["rolled_up_deltas"] += moved
+    return moved
+
+
+async def recompute_item_stats(session: AsyncSession) -> int:
+    """Correct the running totals against a scan of the items table.
+
+    Fixes whatever the incremental updates missed, such as rounding error
+    accumulated in the sums. The scan and the totals are read from one
+    snapshot (``REPEATABLE READ`` on Postgres) and the difference is appended
+    as a delta, so item writers are never blocked by the scan: the ones that
+    commit meanwhile keep their own deltas on top of the correction.
+
+    Returns:
+        How far the running count had drifted from the actual one, 0 if
+        another process holds the maintenance lock.
+
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        await session.connection(
+            execution_options={"isolation_level": "REPEATABLE READ"}
+        )
+    # Two corrections computed from the same snapshot would both be applied
+    if not await _claim_maintenance(session):
+        await session.rollback()
+        return 0
+    running = {row.bucket: row for row in await session.execute(_running_totals())}
+    actual = await session.execute(
+        select(
+            _price_bucket.label("bucket"),
+            func.count().label("count"),
+            func.sum(Item.price).label("price_sum"),
+            func.sum(Item.tax).label("tax_sum"),
+        ).group_by(literal_column("bucket"))
+    )
+    scanned = {row.bucket: row for row in actual}
+
+    corrections = []
+    for bucket, totals in running.items():
+        found = scanned.get(bucket)
+        count = (found.count if found else 0) - totals.count
+        price_sum = (found.price_sum if found else 0.0) - totals.price_sum
+        tax_sum = (found.tax_sum if found else 0.0) - totals.tax_sum
+        if count or price_sum or tax_sum:
+            corrections.append(
+                {
+                    "bucket": bucket,
+                    "count": count,
+                    "price_sum": price_sum,
+                    "tax_sum": tax_sum,
+                }
+            )
+    if corrections:
+        await session.execute(insert(ItemStatsDelta), corrections)
+    await session.commit()
+
+    drift = sum(correction["count"] for correction in corrections)
+    _maintenance_stats["recomputes"] += 1
+    _maintenance_stats["last_count_drift"] = drift
+    return drift
+
+
+async def roll_up_item_stats_periodically(
+    session_factory: async_sessionmaker[AsyncSession], interval: float
+) -> None:
+    """Run `roll_up_item_stats` now and then every ``interval`` seconds.
+
+    Outcomes are reported through the ``items.stats`` metrics.
+    """
+    while True:
+        try:
+            async with session_factory() as session:
+                await roll_up_item_stats(session)
+        except Exception:  # noqa: BLE001 - a failed run must not stop the next ones
+            _maintenance_stats["failed"] += 1
+        await asyncio.sleep(interval)
+
+
+async def main() -> None:
+    async with AsyncSessionLocal() as session:
+        drift = await recompute_item_stats(session)
+    async with AsyncSessionLocal() as session:
+        rolled_up = await roll_up_item_stats(session)
+    print(f"item_stats: count drift {drift}, {rolled_up} deltas rolled up")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,315 @@
+import asyncio
+import hashlib
+import mimetypes
+import re
+import uuid
+from collections import Counter
+from collections.abc import Iterable
+from contextlib import suppress
+from dataclasses import dataclass
+from pathlib import Path
+from uuid import UUID
+
+import aiofiles
+import aiofiles.os
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import and_, bindparam, delete, exists, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.status import HTTP_404_NOT_FOUND, HTTP_413_CONTENT_TOO_LARGE
+
+from learn_fastapi.src.config import settings
+from learn_fastapi.src.constants import IMAGES_DIR
+
+from .image_index import SHA256_HEX, get_image_index
+from .models import ImageBlob, Item
+
+# Bytes read from the upload and written to disk per iteration
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+IMAGES_URL_PREFIX = "/static/images/"
+
+_SAFE_SUFFIX = re.compile(r"^\.[a-z0-9]{1,10}$")
+# Stored with uploads whose name and content type give no usable extension,
+# so every blob file matches the ``<digest>.*`` pattern its cleanup relies on
+FALLBACK_SUFFIX = ".bin"
+
+
+@dataclass(frozen=True)
+class ReceivedUpload:
+    """An upload streamed to a temporary file and hashed on the way."""
+
+    partial: Path
+    sha256: str
+    size: int
+
+
+def _upload_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=HTTP_413_CONTENT_TOO_LARGE,
+        detail=f"Image exceeds the {settings.image_max_upload_bytes} bytes limit",
+    )
+
+
+def image_suffix(filename: str | None, content_type: str | None) -> str:
+    """Pick the file extension a new blob is stored with.
+
+    Returns:
+        A lowercase extension such as ``".png"``, or ``FALLBACK_SUFFIX``.
+
+    """
+    suffix = Path(filename or "").suffix.lower()
+    if not suffix and content_type:
+        suffix = mimetypes.guess_extension(content_type) or ""
+    return suffix if _SAFE_SUFFIX.match(suffix) else FALLBACK_SUFFIX
+
+
+def blob_url(sha256: str, suffix: str) -> str:
+    """Build the immutable URL of a blob, sharded by digest prefix.
+
+    Returns:
+        A URL such as ``/static/images/ab/cd/abcd...ef.png``.
+
+    """
+    return f"{IMAGES_URL_PREFIX}{sha256[:2]}/{sha256[2:4]}/{sha256}{suffix}"
+
+
+def blob_path(url: str) -> Path:
+    """Map a blob URL back to its location under ``IMAGES_DIR``.
+
+    Returns:
+        The absolute path of the stored file.
+
+    """
+    return IMAGES_DIR / url.removeprefix(IMAGES_URL_PREFIX)
+
+
+async def receive_upload(upload: UploadFile) -> ReceivedUpload:
+    """Stream an upload to a temporary file in fixed-size chunks, hashing it.
+
+    Returns:
+        The temporary file with the SHA-256 digest and size of its content.
+
+    Raises:
+        HTTPException: If the upload exceeds ``settings.image_max_upload_bytes``.
+
+    """
+    limit = settings.image_max_upload_bytes
+    if upload.size is not None and upload.size > limit:
+        raise _upload_too_large()
+
+    await aiofiles.os.makedirs(IMAGES_DIR, exist_ok=True)
+    partial = IMAGES_DIR / f".{uuid.uuid4().hex}.part"
+    try:
+        digest, written = await _copy_chunks(upload, partial, limit)
+    except BaseException:
+        await discard_upload(partial)
+        raise
+    return ReceivedUpload(partial=partial, sha256=digest, size=written)
+
+
+async def _copy_chunks(upload: UploadFile, target: Path, limit: int) -> tuple[str, int]:
+    hasher = hashlib.sha256()
+    written = 0
+    async with aiofiles.open(target, "wb") as file:
+        while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+            written += len(chunk)
+            if written > limit:
+                raise _upload_too_large()
+            hasher.update(chunk)
+            await file.write(chunk)
+    return hasher.hexdigest(), written
+
+
+async def discard_upload(partial: Path) -> None:
+    """Remove a file, ignoring it if it is already gone."""
+    with suppress(FileNotFoundError):
+        await aiofiles.os.remove(partial)
+
+
+async def place_blob(received: ReceivedUpload, url: str) -> None:
+    """Move a received upload to its content-addressed location.
+
+    When a file with the same digest is already stored the upload is dropped.
+    """
+    target = blob_path(url)
+    if await aiofiles.os.path.exists(target):
+        await discard_upload(received.partial)
+    else:
+        await aiofiles.os.makedirs(target.parent, exist_ok=True)
+        await aiofiles.os.replace(received.partial, target)
+    get_image_index().add(target)
+
+
+async def store_image(session: AsyncSession, upload: UploadFile) -> str:
+    """Store an uploaded image once per distinct content and reference it.
+
+    The blob row is upserted in the session's transaction; the file is moved
+    into place before the caller commits, so a committed URL always resolves.
+    If the transaction fails instead, the file is left in place: a concurrent
+    upload of the same content may be about to commit a row pointing at it.
+    `prune_orphaned_files` removes it at the next startup if none did.
+
+    Returns:
+        The immutable URL of the stored image.
+
+    """
+    received = await receive_upload(upload)
+    try:
+        url = await acquire_blob(
+            session,
+            received,
+            image_suffix(upload.filename, upload.content_type),
+            upload.content_type,
+        )
+    except BaseException:
+        await discard_upload(received.partial)
+        raise
+    await place_blob(received, url)
+    return url
+
+
+async def acquire_blob(
+    session: AsyncSession,
+    received: ReceivedUpload,
+    suffix: str,
+    content_type: str | None,
+) -> str:
+    """Record one more reference to a blob, creating its row if needed.
+
+    Runs a single ``INSERT ... ON CONFLICT DO UPDATE`` so concurrent uploads of
+    the same content agree on one row and one URL.
+
+    Returns:
+        The canonical URL of the blob.
+
+    """
+    connection = await session.connection()
+    dialect_insert = (
+        postgresql.insert if connection.dialect.name == "postgresql" else sqlite.insert
+    )
+    statement = dialect_insert(ImageBlob).values(
+        sha256=received.sha256,
+        url=blob_url(received.sha256, suffix),
+        size=received.size,
+        content_type=content_type,
+        ref_count=1,
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[ImageBlob.sha256],
+        set_={"ref_count": ImageBlob.ref_count + 1},
+    ).returning(ImageBlob.url)
+    return (await session.execute(statement)).scalar_one()
+
+
+async def lock_item_image(session: AsyncSession, item_id: UUID) -> str | None:
+    """Lock an item's row and read the image URL it currently points at.
+
+    Concurrent image uploads to the same item then release its previous blob
+    one after the other, each seeing the URL the other one wrote.
+
+    Returns:
+        The current image URL, possibly empty.
+
+    Raises:
+        HTTPException: If no item matches ``item_id``.
+
+    """
+    result = await session.execute(
+        select(Item.image_url).where(Item.id == item_id).with_for_update()
+    )
+    row = result.one_or_none()
+    if row is None:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Item not found")
+    return row.image_url
+
+
+async def release_image_urls(session: AsyncSession, urls: Iterable[str]) -> None:
+    """Drop one reference per occurrence of each blob URL."""
+    references = Counter(url for url in urls if url.startswith(IMAGES_URL_PREFIX))
+    if not references:
+        return
+    table = ImageBlob.__table__
+    await session.execute(
+        update(table)
+        .where(table.c.url == bindparam("blob_url"))
+        .values(ref_count=table.c.ref_count - bindparam("references")),
+        [{"blob_url": url, "references": count} for url, count in references.items()],
+    )
+
+
+async def prune_unreferenced_blobs(session: AsyncSession) -> int:
+    """Delete blobs no item points at anymore, along with their files.
+
+    Meant to run while no uploads are in flight, e.g. at startup.
+
+    Returns:
+        The number of blobs removed.
+
+    """
+    result = await session.execute(
+        delete(ImageBlob)
+        .where(
+            and_(
+                ImageBlob.ref_count <= 0,
+                ~exists().where(Item.image_url == ImageBlob.url),
+            )
+        )
+        .returning(ImageBlob.url)
+    )
+    urls = list(result.scalars())
+    await session.commit()
+    for url in urls:
+        await _remove_blob_files(blob_path(url))
+    return len(urls)
+
+
+async def prune_orphaned_files(session: AsyncSession, root: Path = IMAGES_DIR) -> int:
+    """Delete stored blob files that no blob row accounts for.
+
+    They are left behind by uploads whose transaction failed or was
+    interrupted after placing the file, and by leftover temporary files. Only
+    the sharded, content-addressed layout is swept: images stored under other
+    names predate the blob table. Meant to run while no uploads are in flight.
+
+    Returns:
+        The number of blobs whose files were removed.
+
+    """
+    known = {
+        blob_path(url).name.split(".", 1)[0]
+        for url in await session.scalars(select(ImageBlob.url))
+    }
+    stored = await asyncio.to_thread(_stored_originals, root)
+    orphans = [path for path in stored if path.name.split(".", 1)[0] not in known]
+    for original in orphans:
+        await _remove_blob_files(original)
+    for partial in await asyncio.to_thread(_temporary_uploads, root):
+        await discard_upload(partial)
+    return len(orphans)
+
+
+def _temporary_uploads(root: Path) -> list[Path]:
+    return list(root.glob(".*.part"))
+
+
+def _stored_originals(root: Path) -> list[Path]:
+    return [
+        path
+        for path in root.glob("??/??/*")
+        if path.is_file()
+        and SHA256_HEX.match(path.name.split(".", 1)[0])
+        # Variants (<digest>.<size>.<ext>) go along with their original
+        and path.name.count(".") <= 1
+    ]
+
+
+async def _remove_blob_files(original: Path) -> None:
+    # Derived files (e.g. resized variants) share the digest prefix
+    digest = original.name.split(".", 1)[0]
+    get_image_index().discard(digest)
+    derived = original.parent.glob(f"{digest}.*")
+    for path in await asyncio.to_thread(list, derived):
+        await discard_upload(path)
+    # Blobs stored before FALLBACK_SUFFIX existed may have no extension at all
+    await discard_upload(original.parent / digest)
@@ -0,0 +1,176 @@
+import asyncio
+import os
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import suppress
+from pathlib import Path
+from typing import Annotated
+
+from fastapi import Depends
+from PIL import Image, features
+
+from learn_fastapi.src.config import settings
+from learn_fastapi.src.utils.metrics import register_metrics
+
+from .schema import ImageSize
+
+# Longest edge, in pixels, of each derived size
+VARIANT_EDGES = {
+    ImageSize.THUMBNAIL: 160,
+    ImageSize.SMALL: 480,
+    ImageSize.MEDIUM: 1024,
+}
+
+# Encodings generated for every size, most compact first
+VARIANT_FORMATS = {
+    "image/avif": ("AVIF", ".avif"),
+    "image/webp": ("WEBP", ".webp"),
+}
+
+
+def variant_path(original: Path, size: ImageSize, media_type: str) -> Path:
+    """Locate a derived image, stored next to its original.
+
+    Returns:
+        A path such as ``<digest>.thumbnail.webp`` in the original's directory.
+
+    """
+    _, suffix = VARIANT_FORMATS[media_type]
+    return original.with_name(f"{original.name.split('.', 1)[0]}.{size}{suffix}")
+
+
+def accepted_variants(accept: str | None) -> list[str]:
+    """List the variant encodings an ``Accept`` header explicitly allows.
+
+    Wildcards are ignored: ``*/*`` does not promise AVIF or WebP support.
+
+    Returns:
+        Media types from ``VARIANT_FORMATS``, most compact first.
+
+    """
+    accepted = set()
+    for entry in (accept or "").split(","):
+        media_type, *params = entry.split(";")
+        quality = 1.0
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                with suppress(ValueError):
+                    quality = float(value)
+        if quality > 0:
+            accepted.add(media_type.strip().lower())
+    return [media_type for media_type in VARIANT_FORMATS if media_type in accepted]
+
+
+def render_variants(source: str) -> float:
+    """Write every missing size and encoding of an image.
+
+    Runs in a worker process, so it only takes and returns picklable values.
+
+    Returns:
+        The seconds spent decoding, resizing and encoding.
+
+    """
+    started = time.perf_counter()
+    original = Path(source)
+    with Image.open(original) as image:
+        image.load()
+        for size, edge in VARIANT_EDGES.items():
+            resized = image.copy()
+            resized.thumbnail((edge, edge))
+            for media_type, (encoder, _) in VARIANT_FORMATS.items():
+                target = variant_path(original, size, media_type)
+                if target.exists() or not features.check(encoder.lower()):
+                    continue
+                # Encode to a private name so readers never see a partial file
+                partial = target.with_name(f".{target.name}.{os.getpid()}.part")
+                resized.save(partial, format=encoder)
+                partial.replace(target)
+    return time.perf_counter() - started
+
+
+class VariantPipeline:
+    """Generate image variants off the event loop on a bounded worker pool.
+
+    At most ``max_pending`` images wait for or occupy a worker; further images
+    are skipped, and ``get_image`` keeps serving their original.
+    """
+
+    def __init__(
+        self, executor_factory: Callable[[], Executor], max_pending: int
+    ) -> None:
+        """Create an idle pipeline; the pool is started on first use.
+
+        Args:
+            executor_factory: Builds the pool the variants are rendered on.
+            max_pending: Maximum number of images queued or in progress.
+
+        """
+        self.executor_factory = executor_factory
+        self.max_pending = max_pending
+        self._executor: Executor | None = None
+        self.pending = 0
+        self.processed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.processing_seconds = 0.0
+        self.last_processing_seconds = 0.0
+
+    async def process(self, original: Path) -> None:
+        """Render the variants of a stored image, unless the pool is saturated."""
+        if self.pending >= self.max_pending:
+            self.dropped += 1
+            return
+        if self._executor is None:
+            self._executor = self.executor_factory()
+
+        self.pending += 1
+        try:
+            seconds = await asyncio.get_running_loop().run_in_executor(
+                self._executor, render_variants, str(original)
+            )
+        except Exception:  # noqa: BLE001 - a bad image must not fail the upload
+            self.failed += 1
+        else:
+            self.processed += 1
+            self.processing_seconds += seconds
+            self.last_processing_seconds = seconds
+        finally:
+            self.pending -= 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "queue_depth": self.pending,
+            "max_pending": self.max_pending,
+            "processed": self.processed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "processing_seconds_total": self.processing_seconds,
+            "last_processing_seconds": self.last_processing_seconds,
+        }
+
+
+_variant_pipeline = VariantPipeline(
+    lambda: ProcessPoolExecutor(max_workers=settings.image_variant_workers),
+    max_pending=settings.image_variant_max_pending,
+)
+register_metrics("items.image_variants", _variant_pipeline.stats)
+
+
+def get_variant_pipeline() -> VariantPipeline:
+    """Return the pipeline that renders image variants in the background.
+
+    Returns:
+        The active variant pipeline.
+
+    """
+    return _variant_pipeline
+
+
+VariantPipelineDep = Annotated[VariantPipeline, Depends(get_variant_pipeline)]
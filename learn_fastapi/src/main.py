@@ -3,6 +3,7 @@ from fastapi import FastAPI
 from learn_fastapi.src.auth.router import router as auth_router
 from learn_fastapi.src.config import lifespan, register_dev_reload
 from learn_fastapi.src.items.router import router as items_router
+from learn_fastapi.src.utils.metrics import collect_metrics
 
 app = FastAPI(lifespan=lifespan)
 register_dev_reload(app)
@@ -13,6 +14,11 @@ async def root() -> dict[str, str]:
     return {"message": "Hello World"}
 
 
+@app.get("/metrics")
+async def metrics() -> dict[str, dict[str, int | float]]:
+    return collect_metrics()
+
+
 app.include_router(items_router, prefix="/items", tags=["items"])
 app.include_router(auth_router, prefix="/auth", tags=["auth"])
 
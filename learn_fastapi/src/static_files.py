@@ -0,0 +1,198 @@
+import os
+import re
+import stat
+from collections.abc import Mapping
+from email.utils import parsedate_to_datetime
+from pathlib import PurePath
+
+import anyio
+from fastapi.responses import FileResponse
+from fastapi.staticfiles import StaticFiles
+from starlette.background import BackgroundTask
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.status import HTTP_200_OK, HTTP_206_PARTIAL_CONTENT
+from starlette.types import Receive, Scope, Send
+
+from learn_fastapi.src.utils.etag import etag_matches
+
+# Content-addressed files, and the variants derived from them, are named after
+# the SHA-256 digest of the original bytes
+HASHED_NAME = re.compile(r"^[0-9a-f]{64}(\.[a-z0-9]+)*$")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+
+def is_not_modified(response_headers: Headers, request_headers: Headers) -> bool:
+    """Evaluate ``If-None-Match``, or else ``If-Modified-Since``, per RFC 9110.
+
+    Returns:
+        True if the client's copy is current and a 304 can be sent instead.
+
+    """
+    if if_none_match := request_headers.get("if-none-match"):
+        return etag_matches(if_none_match, response_headers["etag"])
+
+    if_modified_since = request_headers.get("if-modified-since")
+    last_modified = response_headers.get("last-modified")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        return parsedate_to_datetime(if_modified_since) >= parsedate_to_datetime(
+            last_modified
+        )
+    except TypeError, ValueError:
+        return False
+
+
+class CachedFileResponse(FileResponse):
+    """File response with HTTP caching semantics and zero-copy transfer.
+
+    Content-addressed files get their name as a strong ETag and may be cached
+    forever; other files must be revalidated on every use. Conditional requests
+    are answered with 304, ``Range`` requests with 206 (by ``FileResponse``),
+    and bodies are handed to the server as a file descriptor when it offers the
+    ASGI zero-copy send extension, so it can use ``os.sendfile``.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        path: str | os.PathLike[str],
+        status_code: int = HTTP_200_OK,
+        headers: Mapping[str, str] | None = None,
+        media_type: str | None = None,
+        background: BackgroundTask | None = None,
+        filename: str | None = None,
+        stat_result: os.stat_result | None = None,
+    ) -> None:
+        """Prepare the response; the file is only stat'ed if no result is given.
+
+        Args:
+            path: The file to send.
+            status_code: Status sent when the whole file is returned.
+            headers: Extra response headers.
+            media_type: Content type, guessed from the name if omitted.
+            background: Task run after the response is sent.
+            filename: Download name for the ``Content-Disposition`` header.
+            stat_result: A previous ``os.stat`` of ``path``.
+
+        """
+        headers = {key.lower(): value for key, value in (headers or {}).items()}
+        name = PurePath(path).name
+        if HASHED_NAME.match(name):
+            headers.setdefault("etag", f'"{name}"')
+            headers.setdefault("cache-control", IMMUTABLE_CACHE_CONTROL)
+        else:
+            headers.setdefault("cache-control", REVALIDATE_CACHE_CONTROL)
+        super().__init__(
+            path,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+            background=background,
+            filename=filename,
+            stat_result=stat_result,
+        )
+        self._zerocopy = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.stat_result is None:
+            try:
+                stat_result = await anyio.to_thread.run_sync(os.stat, self.path)
+            except FileNotFoundError as exception:
+                msg = f"File at path {self.path} does not exist."
+                raise RuntimeError(msg) from exception
+            if not stat.S_ISREG(stat_result.st_mode):
+                msg = f"File at path {self.path} is not a file."
+                raise RuntimeError(msg)
+            self.stat_result = stat_result
+            self.set_stat_headers(stat_result)
+
+        if self.status_code == HTTP_200_OK and is_not_modified(
+            self.headers, Headers(scope=scope)
+        ):
+            await NotModifiedResponse(self.headers)(scope, receive, send)
+            return
+
+        self._zerocopy = ZEROCOPY_EXTENSION in scope.get("extensions", {})
+        await super().__call__(scope, receive, send)
+
+    async def _handle_simple(
+        self,
+        send: Send,
+        send_header_only: bool,  # noqa: FBT001 - FileResponse's signature
+        send_pathsend: bool,  # noqa: FBT001
+    ) -> None:
+        if not self._zerocopy or send_header_only or send_pathsend:
+            await super()._handle_simple(send, send_header_only, send_pathsend)
+            return
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+        await self._zerocopy_send(send, 0, int(self.headers["content-length"]))
+
+    async def _handle_single_range(
+        self,
+        send: Send,
+        start: int,
+        end: int,
+        file_size: int,
+        send_header_only: bool,  # noqa: FBT001 - FileResponse's signature
+    ) -> None:
+        if not self._zerocopy or send_header_only:
+            await super()._handle_single_range(
+                send, start, end, file_size, send_header_only
+            )
+            return
+        self.headers["content-range"] = f"bytes {start}-{end - 1}/{file_size}"
+        self.headers["content-length"] = str(end - start)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": HTTP_206_PARTIAL_CONTENT,
+                "headers": self.raw_headers,
+            }
+        )
+        await self._zerocopy_send(send, start, end - start)
+
+    async def _zerocopy_send(self, send: Send, offset: int, count: int) -> None:
+        file = await anyio.to_thread.run_sync(open, self.path, "rb")
+        try:
+            await send(
+                {
+                    "type": ZEROCOPY_EXTENSION,
+                    "file": file,
+                    "offset": offset,
+                    "count": count,
+                    "more_body": False,
+                }
+            )
+        finally:
+            file.close()
+
+
+class CachedStaticFiles(StaticFiles):
+    """Static files served through `CachedFileResponse`.
+
+    Hashed names are cacheable forever; everything else is revalidated, which
+    is answered with a 304 while the file is unchanged.
+    """
+
+    def file_response(
+        self,
+        full_path: os.PathLike[str] | str,
+        stat_result: os.stat_result,
+        scope: Scope,  # noqa: ARG002 - StaticFiles' signature
+        status_code: int = HTTP_200_OK,
+    ) -> Response:
+        return CachedFileResponse(
+            full_path, status_code=status_code, stat_result=stat_result
+        )
@@ -0,0 +1,81 @@
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Protocol
+
+
+class CacheBackend[K: Hashable, V](Protocol):
+    """Minimal interface every cache backend must provide."""
+
+    def get(self, key: K) -> V | None: ...
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None: ...
+
+    def delete(self, key: K) -> None: ...
+
+    def clear(self) -> None: ...
+
+    def stats(self) -> dict[str, int]: ...
+
+
+class LRUCache[K: Hashable, V]:
+    """In-process LRU cache with a per-entry time to live.
+
+    The cache lives in the worker's memory, so each worker process keeps its own
+    copy. Entries expire after ``ttl`` seconds and the least recently used entry
+    is evicted once ``max_size`` entries are stored.
+    """
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        """Create an empty cache.
+
+        Args:
+            max_size: Maximum number of entries kept before evicting.
+            ttl: Default time to live of an entry, in seconds.
+
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: K) -> V | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: K) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,65 @@
+import hashlib
+from uuid import UUID
+
+
+def weak_etag(*versions: tuple[UUID, int]) -> str:
+    """Build a weak ETag from the ``(id, version)`` of every row in a response.
+
+    Any write to a row bumps its version, so the tag changes exactly when one
+    of the rows it covers does, without serializing them.
+
+    Returns:
+        A quoted weak entity tag such as ``W/"3f2a..."``.
+
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for row_id, version in versions:
+        digest.update(row_id.bytes)
+        digest.update(version.to_bytes(8))
+    return f'W/"{digest.hexdigest()}"'
+
+
+def version_etag(version: int) -> str:
+    """Build the strong ETag of a single row from its version.
+
+    The tag only has to be unique among the versions of one resource, so the
+    version itself is used, and an ``If-Match`` can be checked by the database.
+
+    Returns:
+        A quoted strong entity tag such as ``"3"``.
+
+    """
+    return f'"{version}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Compare an ``If-None-Match`` header with an ETag, weakly (RFC 9110).
+
+    Returns:
+        True if any listed tag, or ``*``, matches ``etag``.
+
+    """
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def if_match_versions(if_match: str) -> frozenset[int] | None:
+    """Read the row versions an ``If-Match`` header accepts.
+
+    ``If-Match`` uses the strong comparison of RFC 9110, so weak tags, like
+    tags that are not a `version_etag`, match no version.
+
+    Returns:
+        The accepted versions, or None for ``*``, which accepts any of them.
+
+    """
+    tags = [tag.strip() for tag in if_match.split(",")]
+    if "*" in tags:
+        return None
+    return frozenset(
+        int(tag[1:-1])
+        for tag in tags
+        if len(tag) > 2 and tag[0] == tag[-1] == '"' and tag[1:-1].isdigit()  # noqa: PLR2004
+    )
@@ -0,0 +1,123 @@
+"""Move existing rows from random UUIDv4 keys to time-ordered UUIDv7 keys.
+
+New rows get UUIDv7 ids from `uuid.uuid7`; rows written before that keep the
+random ids they were created with, which remain valid but sort at random. This
+module rewrites them in creation order. Run it once, with the app stopped:
+
+    uv run python -m learn_fastapi.src.utils.keys
+
+Changing a user's id invalidates the access tokens issued to them, as they name
+the old id. Their refresh tokens follow the new id through the foreign key's
+``ON UPDATE CASCADE``, so clients holding one get a working access token from
+``/auth/refresh``; the others sign in again.
+"""
+
+import asyncio
+import os
+import uuid
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+UUID7_VERSION = 7
+
+# Bits of a UUIDv7 after its 48-bit millisecond timestamp and 4-bit version,
+# less the 2 variant bits: 12 of "rand_a" followed by 62 of "rand_b"
+_TAIL_BITS = 74
+_RAND_B_BITS = 62
+
+
+def uuid7_at(moment: datetime) -> uuid.UUID:
+    """Build a UUIDv7 for a given time instead of the current one.
+
+    Args:
+        moment: Time whose milliseconds lead the id; naive times are UTC.
+
+    Returns:
+        A version 7 UUID that sorts by ``moment``.
+
+    """
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=UTC)
+    return _uuid7(int(moment.timestamp() * 1000))
+
+
+def _uuid7(milliseconds: int, tail: int | None = None) -> uuid.UUID:
+    if tail is None:
+        tail = int.from_bytes(os.urandom(10)) >> (80 - _TAIL_BITS)
+    rand_a, rand_b = tail >> _RAND_B_BITS, tail & ((1 << _RAND_B_BITS) - 1)
+    return uuid.UUID(
+        int=milliseconds << 80
+        | UUID7_VERSION << 76
+        | rand_a << 64
+        | 0b10 << 62
+        | rand_b
+    )
+
+
+def _successor(value: uuid.UUID) -> uuid.UUID:
+    tail = (value.int >> 64 & 0xFFF) << _RAND_B_BITS | value.int & (
+        (1 << _RAND_B_BITS) - 1
+    )
+    return _uuid7(value.int >> 80, tail + 1)
+
+
+async def rekey_to_uuid7(session: AsyncSession, model: Any) -> int:  # noqa: ANN401
+    """Give every row of ``model`` that is not keyed by a UUIDv7 a new one.
+
+    Rows are visited in ``(created_at, id)`` order and each new id is derived
+    from the row's ``created_at``, or counts up from the previous id when that
+    would not sort after it, so ordering by id matches creation order across the
+    whole table, including the rows that already had UUIDv7 ids.
+
+    Returns:
+        The number of rows rekeyed.
+
+    """
+    rows = (
+        await session.execute(
+            select(model.id, model.created_at).order_by(model.created_at, model.id)
+        )
+    ).all()
+    previous: uuid.UUID | None = None
+    changes = []
+    for old_id, created_at in rows:
+        new_id = old_id
+        if old_id.version != UUID7_VERSION:
+            new_id = uuid7_at(created_at)
+            if previous is not None and new_id <= previous:
+                # Not after the previous row's id, typically the same
+                # millisecond: count up from that id instead
+                new_id = _successor(previous)
+            changes.append({"old_id": old_id, "new_id": new_id})
+        previous = new_id
+
+    if changes:
+        table = model.__table__
+        await session.execute(
+            update(table)
+            .where(table.c.id == bindparam("old_id"))
+            .values(id=bindparam("new_id")),
+            changes,
+        )
+    await session.commit()
+    return len(changes)
+
+
+async def main() -> None:
+    # Imported here so that this module stays free of application models
+    from learn_fastapi.src.auth.models import User  # noqa: PLC0415
+    from learn_fastapi.src.database import AsyncSessionLocal, engine  # noqa: PLC0415
+    from learn_fastapi.src.items.models import Item  # noqa: PLC0415
+
+    for model in (Item, User):
+        async with AsyncSessionLocal() as session:
+            rekeyed = await rekey_to_uuid7(session, model)
+        print(f"{model.__tablename__}: {rekeyed} rows rekeyed")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,20 @@
+from collections.abc import Callable, Mapping
+
+type MetricsProvider = Callable[[], Mapping[str, int | float]]
+
+_providers: dict[str, MetricsProvider] = {}
+
+
+def register_metrics(name: str, provider: MetricsProvider) -> None:
+    """Register a callable returning a snapshot of a component's counters."""
+    _providers[name] = provider
+
+
+def collect_metrics() -> dict[str, dict[str, int | float]]:
+    """Collect the current snapshot of every registered component.
+
+    Returns:
+        A mapping of component name to its counters.
+
+    """
+    return {name: dict(provider()) for name, provider in _providers.items()}
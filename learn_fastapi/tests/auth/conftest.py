@@ -4,10 +4,30 @@ from sqlalchemy.ext.asyncio import (
     AsyncSession,
 )
 
+from learn_fastapi.src.auth.cache import get_principal_cache, get_token_cache
 from learn_fastapi.src.auth.models import User
+from learn_fastapi.src.auth.revocation import get_revocation_list
 from learn_fastapi.src.auth.utils import hash_password
 
 
+@pytest.fixture(autouse=True)
+def clear_principal_cache() -> None:
+    """Start every test with an empty principal cache."""
+    get_principal_cache().clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache() -> None:
+    """Start every test with an empty verified-token cache."""
+    get_token_cache().clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_revocation_list() -> None:
+    """Start every test with no revoked token family."""
+    get_revocation_list().load([])
+
+
 @pytest.fixture
 async def seeded_user(test_session: AsyncSession, client: AsyncClient) -> User:
     """Create a test user in the database.
@@ -1,6 +1,40 @@
+import uuid
+from dataclasses import replace
+from datetime import UTC, datetime, timedelta
 from http import HTTPStatus
 
+import jwt
+import pytest
+from argon2 import extract_parameters
 from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from learn_fastapi.src.auth.cache import get_principal_cache, get_token_cache
+from learn_fastapi.src.auth.calibration import calibrate_hash_parameters
+from learn_fastapi.src.auth.hashing import (
+    EXECUTORS,
+    PasswordHashingPool,
+    get_password_hashing_pool,
+)
+from learn_fastapi.src.auth.models import RevokedTokenFamily, User
+from learn_fastapi.src.auth.refresh import REFRESH_TOKEN_COOKIE, REFRESH_TOKEN_PATH
+from learn_fastapi.src.auth.revocation import BloomFilter, RevocationList
+from learn_fastapi.src.auth.schema import TokenData
+from learn_fastapi.src.auth.utils import (
+    HASH_PARAMETERS,
+    create_access_token,
+    hash_password,
+    needs_rehash,
+    verify_access_token,
+)
+from learn_fastapi.src.config import settings
+from learn_fastapi.src.main import app
+
+# Cheap enough to keep the tests fast
+CHEAP_PARAMETERS = replace(
+    HASH_PARAMETERS, time_cost=1, memory_cost=1024, parallelism=1
+)
 
 
 async def test_register_user(client: AsyncClient) -> None:
@@ -138,3 +172,313 @@ async def test_get_me_invalid_token(client: AsyncClient) -> None:
 
     assert response.status_code == HTTPStatus.UNAUTHORIZED
     assert "Invalid or expired token" in response.json()["detail"]
+
+
+async def test_hashing_pool_round_trip() -> None:
+    """Test that passwords hashed on the pool verify on it, off the event loop."""
+    pool = PasswordHashingPool(EXECUTORS["thread"], max_workers=2, max_queued=0)
+    try:
+        password_hash = await pool.hash("secure_password123")
+        assert await pool.verify("secure_password123", password_hash)
+        assert not await pool.verify("wrong_password", password_hash)
+    finally:
+        pool.shutdown()
+
+    stats = pool.stats()
+    assert stats["completed"] == len(("hash", "verify", "verify"))
+    assert stats["busy_seconds_total"] > 0
+    assert stats["in_flight"] == 0
+
+
+async def test_saturated_hashing_pool_returns_503(client: AsyncClient) -> None:
+    """Test that sign-ups are turned away at once when no worker can take them."""
+    saturated = PasswordHashingPool(EXECUTORS["thread"], max_workers=0, max_queued=0)
+    app.dependency_overrides[get_password_hashing_pool] = lambda: saturated
+
+    response = await client.post(
+        "/auth/register",
+        json={"email": "test@example.com", "password": "secure_password123"},
+    )
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.headers["retry-after"] == "1"
+    assert saturated.stats()["rejected"] == 1
+
+
+async def test_metrics_report_password_hashing(client: AsyncClient) -> None:
+    """Test that the hashing pool's counters are exposed on /metrics."""
+    response = await client.get("/metrics")
+
+    assert "wait_seconds_total" in response.json()["auth.password_hashing"]
+
+
+def test_calibration_stops_at_minimum_cost() -> None:
+    """Test that an unreachable target settles for the cheapest parameters."""
+    parameters = calibrate_hash_parameters(
+        0.0, max_memory_cost=4096, parallelism=1, min_memory_cost=1024
+    )
+
+    assert parameters.time_cost == 1
+    assert parameters.memory_cost == 1024  # noqa: PLR2004
+
+
+def test_calibration_adds_passes_within_target() -> None:
+    """Test that a generous target keeps the memory cost and adds passes."""
+    parameters = calibrate_hash_parameters(
+        0.02, max_memory_cost=1024, parallelism=1, min_memory_cost=1024
+    )
+
+    assert parameters.memory_cost == 1024  # noqa: PLR2004
+    assert parameters.time_cost > 1
+
+
+async def test_login_upgrades_outdated_hash(
+    client: AsyncClient, test_session: AsyncSession
+) -> None:
+    """Test that logging in rehashes a password made with other parameters."""
+    pool = PasswordHashingPool(
+        EXECUTORS["thread"], max_workers=1, max_queued=4, parameters=CHEAP_PARAMETERS
+    )
+    app.dependency_overrides[get_password_hashing_pool] = lambda: pool
+    user_data = {"email": "test@example.com", "password": "secure_password123"}
+    await client.post("/auth/register", json=user_data)
+
+    upgraded = replace(CHEAP_PARAMETERS, time_cost=2)
+    pool.parameters = upgraded
+    response = await client.post(
+        "/auth/token",
+        data={"username": user_data["email"], "password": user_data["password"]},
+    )
+    pool.shutdown()
+
+    assert response.status_code == HTTPStatus.OK
+    password_hash = await test_session.scalar(
+        select(User.password_hash).execution_options(populate_existing=True)
+    )
+    assert extract_parameters(password_hash) == upgraded
+    assert not pool.needs_rehash(password_hash)
+
+
+def test_only_weaker_hashes_need_rehash() -> None:
+    """Test that workers with different calibrations keep each other's hashes."""
+    more_passes = replace(CHEAP_PARAMETERS, time_cost=2)
+    more_memory = replace(CHEAP_PARAMETERS, memory_cost=2048)
+    cheap_hash = hash_password("password", CHEAP_PARAMETERS)
+    more_memory_hash = hash_password("password", more_memory)
+
+    assert needs_rehash(cheap_hash, more_passes)
+    assert not needs_rehash(more_memory_hash, more_passes)
+    assert not needs_rehash(more_memory_hash, CHEAP_PARAMETERS)
+    assert needs_rehash("not a hash", CHEAP_PARAMETERS)
+
+
+async def _login(client: AsyncClient, user: User) -> dict[str, str]:
+    response = await client.post(
+        "/auth/token",
+        data={"username": user.email, "password": "mysupersecurepass"},
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def test_get_me_is_served_from_principal_cache(
+    client: AsyncClient, seeded_user: User, query_counter: list[str]
+) -> None:
+    """Test that repeated authenticated requests do not query the users table."""
+    headers = await _login(client, seeded_user)
+    await client.get("/auth/me", headers=headers)
+    query_counter.clear()
+
+    response = await client.get("/auth/me", headers=headers)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()["email"] == seeded_user.email
+    assert query_counter == []
+
+
+async def test_deactivation_invalidates_principal_cache(
+    client: AsyncClient, test_session: AsyncSession, seeded_user: User
+) -> None:
+    """Test that deactivating a user takes effect on their next request."""
+    headers = await _login(client, seeded_user)
+    await client.get("/auth/me", headers=headers)
+
+    seeded_user.is_active = False
+    await test_session.commit()
+    response = await client.get("/auth/me", headers=headers)
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert "Inactive user" in response.json()["detail"]
+
+
+async def test_principal_is_evicted_on_commit_not_flush(
+    client: AsyncClient, test_session: AsyncSession, seeded_user: User
+) -> None:
+    """Test that a change only evicts the cached user once it is committed."""
+    headers = await _login(client, seeded_user)
+    await client.get("/auth/me", headers=headers)
+    principal_cache, user_id = get_principal_cache(), seeded_user.id
+
+    seeded_user.is_active = False
+    await test_session.flush()
+    assert principal_cache.get(user_id) is not None
+
+    await test_session.commit()
+    assert principal_cache.get(user_id) is None
+
+
+def test_verified_token_is_cached(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that verifying the same token again skips decoding it."""
+    token = create_access_token(
+        TokenData(sub="user", exp=datetime.now(tz=UTC) + timedelta(minutes=5))
+    )
+    first = verify_access_token(token)
+    hits = get_token_cache().stats()["hits"]
+
+    def fail_decode(*_args: object, **_kwargs: object) -> None:
+        raise AssertionError
+
+    monkeypatch.setattr(jwt, "decode", fail_decode)
+
+    assert verify_access_token(token) == first
+    assert get_token_cache().stats()["hits"] == hits + 1
+
+
+def test_invalid_token_is_not_cached() -> None:
+    """Test that only tokens that passed verification are cached."""
+    token = create_access_token(
+        TokenData(sub="user", exp=datetime.now(tz=UTC) + timedelta(minutes=5))
+    )
+
+    assert verify_access_token(token[:-2]) is None
+    assert get_token_cache().stats()["size"] == 0
+
+
+def test_token_expiry_is_computed_per_issue() -> None:
+    """Test that a token expires relative to when it is issued."""
+    issued_at = datetime.now(tz=UTC)
+
+    token_data = TokenData(sub="user")
+
+    assert token_data.exp is not None
+    assert token_data.exp >= issued_at + timedelta(
+        minutes=settings.access_token_expire_minutes
+    )
+
+
+async def test_login_sets_refresh_token_cookie(
+    client: AsyncClient, seeded_user: User
+) -> None:
+    """Test that signing in sets an HTTP-only refresh token cookie."""
+    response = await client.post(
+        "/auth/token",
+        data={"username": seeded_user.email, "password": "mysupersecurepass"},
+    )
+
+    cookie = response.headers["set-cookie"]
+    assert cookie.startswith(f"{REFRESH_TOKEN_COOKIE}=")
+    assert "HttpOnly" in cookie
+    assert "Path=/auth" in cookie
+
+
+async def test_refresh_rotates_refresh_token(
+    client: AsyncClient, seeded_user: User
+) -> None:
+    """Test that a refresh returns a working access token and a new cookie."""
+    await _login(client, seeded_user)
+    first = client.cookies[REFRESH_TOKEN_COOKIE]
+
+    response = await client.post("/auth/refresh")
+
+    assert response.status_code == HTTPStatus.OK
+    assert client.cookies[REFRESH_TOKEN_COOKIE] != first
+    me = await client.get(
+        "/auth/me",
+        headers={"Authorization": f"Bearer {response.json()['access_token']}"},
+    )
+    assert me.status_code == HTTPStatus.OK
+    assert me.json()["email"] == seeded_user.email
+
+
+async def test_refresh_without_cookie_is_rejected(client: AsyncClient) -> None:
+    """Test that a refresh needs a refresh token."""
+    response = await client.post("/auth/refresh")
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    assert "Invalid or expired refresh token" in response.json()["detail"]
+
+
+async def test_refresh_token_reuse_revokes_family(
+    client: AsyncClient, seeded_user: User, query_counter: list[str]
+) -> None:
+    """Test that reusing a rotated refresh token signs out the whole family."""
+    headers = await _login(client, seeded_user)
+    stolen = client.cookies[REFRESH_TOKEN_COOKIE]
+    await client.post("/auth/refresh")
+    rotated = client.cookies[REFRESH_TOKEN_COOKIE]
+
+    client.cookies.set(REFRESH_TOKEN_COOKIE, stolen, path=REFRESH_TOKEN_PATH)
+    reused = await client.post("/auth/refresh")
+    client.cookies.set(REFRESH_TOKEN_COOKIE, rotated, path=REFRESH_TOKEN_PATH)
+    after_reuse = await client.post("/auth/refresh")
+    query_counter.clear()
+    me = await client.get("/auth/me", headers=headers)
+
+    assert reused.status_code == HTTPStatus.UNAUTHORIZED
+    assert "already used" in reused.json()["detail"]
+    assert after_reuse.status_code == HTTPStatus.UNAUTHORIZED
+    assert me.status_code == HTTPStatus.UNAUTHORIZED
+    assert query_counter == []
+
+
+async def test_logout_revokes_access_tokens(
+    client: AsyncClient, seeded_user: User
+) -> None:
+    """Test that signing out rejects the access and refresh tokens at once."""
+    headers = await _login(client, seeded_user)
+    await client.get("/auth/me", headers=headers)
+
+    response = await client.post("/auth/logout")
+
+    assert response.status_code == HTTPStatus.NO_CONTENT
+    assert REFRESH_TOKEN_COOKIE not in client.cookies
+    me = await client.get("/auth/me", headers=headers)
+    assert me.status_code == HTTPStatus.UNAUTHORIZED
+    refreshed = await client.post("/auth/refresh")
+    assert refreshed.status_code == HTTPStatus.UNAUTHORIZED
+
+
+async def test_revocation_reload_drops_expired_families(
+    test_session: AsyncSession,
+) -> None:
+    """Test that a reload loads live revocations and forgets expired ones."""
+    live, expired = uuid.uuid7(), uuid.uuid7()
+    now = datetime.now(tz=UTC)
+    test_session.add_all(
+        [
+            RevokedTokenFamily(family_id=live, expires_at=now + timedelta(minutes=5)),
+            RevokedTokenFamily(
+                family_id=expired, expires_at=now - timedelta(minutes=5)
+            ),
+        ]
+    )
+    await test_session.commit()
+    revocations = RevocationList(error_rate=0.01)
+    revocations.add(expired)
+
+    assert await revocations.reload(test_session) == 1
+    assert revocations.is_revoked(live)
+    assert not revocations.is_revoked(expired)
+    assert await test_session.scalar(select(RevokedTokenFamily.family_id)) == live
+
+
+def test_bloom_filter_error_rate() -> None:
+    """Test that the filter keeps every key and lets few others through."""
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    added = [uuid.uuid7().bytes for _ in range(1000)]
+    for key in added:
+        bloom.add(key)
+
+    false_positives = sum(uuid.uuid4().bytes in bloom for _ in range(10_000))
+
+    assert all(key in bloom for key in added)
+    assert false_positives < 300  # noqa: PLR2004 - about 100 expected
@@ -4,6 +4,7 @@ from collections.abc import AsyncGenerator, Generator
 
 import pytest
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -45,6 +46,29 @@ async def test_async_engine() -> AsyncGenerator[AsyncEngine]:
     await engine.dispose()
 
 
+@pytest.fixture
+def query_counter(test_async_engine: AsyncEngine) -> Generator[list[str]]:
+    """Record every SQL statement sent to the test engine.
+
+    This fixture is shared across all test modules.
+
+    Args:
+        test_async_engine: The test database engine.
+
+    Yields:
+        The list the executed statements are appended to.
+
+    """
+    statements: list[str] = []
+
+    def record(*args: object) -> None:
+        statements.append(str(args[2]))
+
+    event.listen(test_async_engine.sync_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(test_async_engine.sync_engine, "before_cursor_execute", record)
+
+
 @pytest.fixture
 async def test_session(test_async_engine: AsyncEngine) -> AsyncGenerator[AsyncSession]:
     """Create a test async session bound to the test engine.
@@ -1,7 +1,70 @@
+from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
+
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from learn_fastapi.src.constants import IMAGES_DIR
+from learn_fastapi.src.items.cache import get_item_cache
+from learn_fastapi.src.items.image_index import get_image_index
 from learn_fastapi.src.items.models import Item as ItemModel
+from learn_fastapi.src.items.search import get_search_index
+from learn_fastapi.src.items.variants import VariantPipeline, get_variant_pipeline
+from learn_fastapi.src.main import app
+
+
+@pytest.fixture(autouse=True)
+def clear_item_cache() -> None:
+    """Start every test with an empty item cache."""
+    get_item_cache().clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_image_index() -> None:
+    """Rebuild the image index from disk on first use in every test."""
+    get_image_index().clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_search_index() -> None:
+    """Rebuild the search index from the database on first use in every test."""
+    get_search_index().clear()
+
+
+@pytest.fixture(autouse=True)
+def variant_pipeline() -> Generator[VariantPipeline]:
+    """Render image variants on a thread instead of a worker process.
+
+    Yields:
+        The pipeline the app uses for the duration of the test.
+
+    """
+    pipeline = VariantPipeline(lambda: ThreadPoolExecutor(max_workers=1), max_pending=4)
+    app.dependency_overrides[get_variant_pipeline] = lambda: pipeline
+    yield pipeline
+    app.dependency_overrides.pop(get_variant_pipeline, None)
+    pipeline.shutdown()
+
+
+@pytest.fixture
+def cleanup_images() -> Generator[None]:
+    """Remove every file and shard directory a test adds under IMAGES_DIR.
+
+    Yields:
+        None, once the existing tree has been recorded.
+
+    """
+    before = set(IMAGES_DIR.rglob("*")) if IMAGES_DIR.exists() else set()
+    yield
+    if not IMAGES_DIR.exists():
+        return
+    # Deepest paths first, so directories are empty by the time they are removed
+    for path in sorted(set(IMAGES_DIR.rglob("*")) - before, reverse=True):
+        if path.is_dir():
+            path.rmdir()
+        else:
+            path.unlink(missing_ok=True)
 
 
 @pytest.fixture
@@ -41,3 +104,32 @@ async def seeded_item(test_session: AsyncSession) -> ItemModel:
     await test_session.commit()
     await test_session.refresh(item)
     return item
+
+
+@pytest.fixture
+async def seeded_items(test_session: AsyncSession) -> list[ItemModel]:
+    """Insert several items with strictly increasing creation timestamps.
+
+    Args:
+        test_session: The test database session (from global fixture).
+
+    Returns:
+        list[ItemModel]: The persisted ORM instances, oldest first.
+
+    """
+    start = datetime(2026, 1, 1, tzinfo=UTC)
+    items = [
+        ItemModel(
+            name=f"Item {index}",
+            description="Seeded test item description",
+            price=float(index),
+            tax=0.0,
+            created_at=start + timedelta(minutes=index),
+        )
+        for index in range(5)
+    ]
+    test_session.add_all(items)
+    await test_session.commit()
+    for item in items:
+        await test_session.refresh(item)
+    return items
@@ -1,22 +1,70 @@
+import csv
+import hashlib
+import io
+import json
 import uuid
+from pathlib import Path
 from typing import TYPE_CHECKING
 
+import pyarrow as pa
 import pytest
+from fastapi import HTTPException
+from PIL import Image
+from sqlalchemy import delete, func, select, text, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy.schema import CreateTable
 from starlette.status import (
     HTTP_200_OK,
     HTTP_201_CREATED,
+    HTTP_206_PARTIAL_CONTENT,
+    HTTP_304_NOT_MODIFIED,
     HTTP_404_NOT_FOUND,
+    HTTP_409_CONFLICT,
+    HTTP_412_PRECONDITION_FAILED,
+    HTTP_413_CONTENT_TOO_LARGE,
     HTTP_422_UNPROCESSABLE_CONTENT,
+    HTTP_428_PRECONDITION_REQUIRED,
 )
 
+from learn_fastapi.src.config import settings
 from learn_fastapi.src.constants import IMAGES_DIR
+from learn_fastapi.src.items import router as items_router
+from learn_fastapi.src.items import storage
+from learn_fastapi.src.items.annotations import MAX_BATCH_QUERY_IDS, MAX_PAGE_SIZE
+from learn_fastapi.src.items.cache import get_item_cache
+from learn_fastapi.src.items.filtering import (
+    ItemFilterParams,
+    apply_filters,
+    prefix_upper_bound,
+)
+from learn_fastapi.src.items.models import (
+    PRICE_BUCKET_BOUNDS,
+    SEARCH_DOCUMENT,
+    ImageBlob,
+    ItemPriceBucket,
+    ItemStatsDelta,
+)
+from learn_fastapi.src.items.models import Item as ItemModel
+from learn_fastapi.src.items.pagination import NEXT_CURSOR_HEADER, encode_cursor
+from learn_fastapi.src.items.schema import ImageSize, ItemSchema, ItemSort
+from learn_fastapi.src.items.search import postgres_search
+from learn_fastapi.src.items.stats import recompute_item_stats, roll_up_item_stats
+from learn_fastapi.src.items.variants import VARIANT_EDGES, variant_path
+from learn_fastapi.src.static_files import (
+    IMMUTABLE_CACHE_CONTROL,
+    REVALIDATE_CACHE_CONTROL,
+)
+from learn_fastapi.src.utils.etag import version_etag
 
 if TYPE_CHECKING:
-    from collections.abc import AsyncGenerator
-
     from httpx import AsyncClient
+    from sqlalchemy.ext.asyncio import AsyncSession
 
-    from learn_fastapi.src.items.models import Item as ItemModel
+    from learn_fastapi.src.items.variants import VariantPipeline
+
+# Conditional write headers for an item never modified since it was created
+IF_UNMODIFIED = {"If-Match": version_etag(1)}
 
 
 # ---------------------------------------------------------------------------
@@ -48,6 +96,198 @@ class TestReadItems:
         names = [item["name"] for item in response.json()]
         assert "Foo" in names
 
+    async def test_ordered_by_creation(
+        self, client: AsyncClient, seeded_items: list[ItemModel]
+    ) -> None:
+        response = await client.get("/items/", params={"limit": 5})
+        names = [item["name"] for item in response.json()]
+        assert names == [item.name for item in seeded_items]
+
+    @pytest.mark.parametrize(
+        "params",
+        [{"limit": 0}, {"limit": -1}, {"limit": MAX_PAGE_SIZE + 1}, {"offset": -1}],
+    )
+    async def test_out_of_range_page_returns_422(
+        self, client: AsyncClient, params: dict[str, int]
+    ) -> None:
+        response = await client.get("/items/", params=params)
+        assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
+
+
+class TestReadItemsCursor:
+    async def test_full_page_sets_next_cursor(
+        self, client: AsyncClient, seeded_items: list[ItemModel]
+    ) -> None:
+        response = await client.get("/items/", params={"limit": 2})
+        assert NEXT_CURSOR_HEADER in response.headers
+
+    async def test_last_page_has_no_next_cursor(
+        self, client: AsyncClient, seeded_items: list[ItemModel]
+    ) -> None:
+        response = await client.get("/items/", params={"limit": 10})
+        assert NEXT_CURSOR_HEADER not in response.headers
+
+    async def test_walks_all_items_in_order(
+        self, client: AsyncClient, seeded_items: list[ItemModel]
+    ) -> None:
+        names: list[str] = []
+        params: dict[str, str | int] = {"limit": 2}
+        while True:
+            response = await client.get("/items/", params=params)
+            assert response.status_code == HTTP_200_OK
+            names.extend(item["name"] for item in response.json())
+            if NEXT_CURSOR_HEADER not in response.headers:
+                break
+            params = {"limit": 2, "cursor": response.headers[NEXT_CURSOR_HEADER]}
+        assert names == [item.name for item in seeded_items]
+
+    async def test_cursor_matches_offset_page(
+        self, client: AsyncClient, seeded_items: list[ItemModel]
+    ) -> None:
+        cursor = encode_cursor(
+            "created_at", seeded_items[1].created_at, seeded_items[1].id
+        )
+        by_cursor = await client.get("/items/", params={"limit": 2, "cursor": cursor})
+        by_offset = await client.get("/items/", params={"limit": 2, "offset": 2})
+        assert by_cursor.json() == by_offset.json()
+
+    async def test_invalid_cursor_returns_422(self, client: AsyncClient) -> None:
+        response = await client.get("/items/", params={"cursor": "not-a-cursor"})
+        assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
+
+    async def test_cursor_of_another_sort_returns_422(
+        self, client: AsyncClient, seeded_items: list[ItemModel]
+    ) -> None:
+        response = await client.get("/items/", params={"limit": 2, "sort": "price"})
+        cursor = response.headers[NEXT_CURSOR_HEADER]
+        for sort in ("created_at", "-price"):
+            response = await client.get(
+                "/items/", params={"limit": 2, "sort": sort, "cursor": cursor}
+            )
+            assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
+
+    async def test_cursor_with_offset_returns_422(
+        self, client: AsyncClient, seeded_items: list[ItemModel]
+    ) -> None:
+        cursor = encode_cursor(
+            "created_at", seeded_items[0].created_at, seeded_items[0].id
+        )
+        response = await client.get("/items/", params={"cursor": cursor, "offset": 1})
+        assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
+
+
+class TestReadItemsFilters:
+    async def test_price_range(
+        self, client: AsyncClient, seeded_items: list[ItemModel]
+    ) -> None:
+        response = await client.get(
+            "/items/", params={"min_price": 1, "max_price": 3, "sort": "price"}
+        )
+        assert [item["price"] for item in response.json()] == [1.0, 2.0, 3.0]
+
+    async def test_name_prefix(
+        self, client: AsyncClient, seeded_items: list[ItemModel]
+    ) -> None:
+        response = await client.get(
+            "/items/", params={"name_prefix": "Item 3", "sort": "name"}
+        )
+        assert [item["name"] for item in response.json()] == ["Item 3"]
+
+    async def test_name_prefix_is_case_sensitive(
+        self, client: AsyncClient, test_session: AsyncSession
+    ) -> None:
+        test_session.add_all([ItemModel(name="apple"), ItemModel(name="Apple")])
+        await test_session.commit()
+        response = await client.get(
+            "/items/", params={"name_prefix": "a", "sort": "name"}
+        )
+        assert [item["name"] for item in response.json()] == ["apple"]
+
+    def test_name_is_compared_by_code_point_on_postgres(self) -> None:
+        ddl = str(
+            CreateTable(ItemModel.__table__).compile(dialect=postgresql.dialect())
+        )
+        assert 'name VARCHAR COLLATE "C"' in ddl
+
+    @pytest.mark.parametrize(
+        ("prefix", "upper"),
+        [
+            ("Item", "Iten"),
+            ("a\ud7ff", "a\ue000"),
+            ("a\U0010ffff", "b"),
+            ("\U0010ffff", None),
+        ],
+    )
+    def test_prefix_upper_bound(self, prefix: str, upper: str | None) -> None:
+        assert prefix_upper_bound(prefix) == upper
+
+    async def test_created_at_window(
+        self, client: AsyncClient, seeded_items: list[ItemModel]
+    ) -> None:
+        params = {
+            "created_after": seeded_items[1].created_at.isoformat(),
+            "created_before": seeded_items[3].created_at.isoformat(),
+        }
+        response = await client.get("/items/", params=params)
+        assert [item["name"] for item in response.json()] == ["Item 1", "Item 2"]
+
+    async def test_total_is_price_plus_tax(
+        self, client: AsyncClient, test_session: AsyncSession
+    ) -> None:
+        test_session.add(ItemModel(name="Taxed", price=10.0, tax=2.5))
+        await test_session.commit()
+        response = await client.get(
+            "/items/", params={"min_total": 12.5, "max_total": 12.5, "sort": "total"}
+        )
+        assert [item["name"] for item in response.json()] == ["Taxed"]
+
+    async def test_descending_sort_walks_with_cursor(
+        self, client: AsyncClient, seeded_items: list[ItemModel]
+    ) -> None:
+        prices: list[float] = []
+        params: dict[str, str | int] = {"limit": 2, "sort": "-price"}
+        while True:
+            response = await client.get("/items/", params=params)
+            prices.extend(item["price"] for item in response.json())
+            if NEXT_CURSOR_HEADER not in response.headers:
+                break
+            params["cursor"] = response.headers[NEXT_CURSOR_HEADER]
+        assert prices == [4.0, 3.0, 2.0, 1.0, 0.0]
+
+    async def test_filter_and_sort_use_one_index(
+        self, test_session: AsyncSession, seeded_items: list[ItemModel]
+    ) -> None:
+        filters = ItemFilterParams(min_price=1, sort=ItemSort.PRICE_DESC)
+        statement = apply_filters(select(ItemModel.id), filters)
+        compiled = statement.compile(
+            test_session.bind, compile_kwargs={"literal_binds": True}
+        )
+        plan = " ".join(
+            str(row[-1])
+            for row in await test_session.execute(
+                text(f"EXPLAIN QUERY PLAN {compiled}")
+            )
+        )
+        assert "ix_items_price_id" in plan
+        assert "TEMP B-TREE" not in plan
+
+    async def test_filters_on_two_fields_return_422(self, client: AsyncClient) -> None:
+        response = await client.get(
+            "/items/", params={"min_price": 1, "max_tax": 2, "sort": "price"}
+        )
+        assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
+
+    async def test_sorting_by_another_field_returns_422(
+        self, client: AsyncClient
+    ) -> None:
+        response = await client.get("/items/", params={"min_price": 1})
+        assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
+        assert "price" in response.json()["detail"]
+
+    async def test_unknown_sort_returns_422(self, client: AsyncClient) -> None:
+        response = await client.get("/items/", params={"sort": "description"})
+        assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
+
 
 # ---------------------------------------------------------------------------
 # GET /items/{id_param}
@@ -78,6 +318,221 @@ class TestReadItem:
         response = await client.get("/items/not-an-id")
         assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
 
+    async def test_repeated_read_skips_database(
+        self, client: AsyncClient, seeded_item: ItemModel, query_counter: list[str]
+    ) -> None:
+        first = await client.get(f"/items/{seeded_item.id}")
+        query_counter.clear()
+        second = await client.get(f"/items/{seeded_item.id}")
+        assert second.json() == first.json()
+        assert query_counter == []
+
+    @pytest.mark.parametrize("method", ["put", "patch"])
+    async def test_update_invalidates_cache(
+        self, client: AsyncClient, seeded_item: ItemModel, method: str
+    ) -> None:
+        item_id = seeded_item.id
+        await client.get(f"/items/{item_id}")
+        await client.request(
+            method, f"/items/{item_id}", json={"name": "Renamed"}, headers=IF_UNMODIFIED
+        )
+        response = await client.get(f"/items/{item_id}")
+        assert response.json()["name"] == "Renamed"
+
+    async def test_delete_invalidates_cache(
+        self, client: AsyncClient, seeded_item: ItemModel
+    ) -> None:
+        await client.get(f"/items/{seeded_item.id}")
+        await client.delete(f"/items/{seeded_item.id}", headers=IF_UNMODIFIED)
+        response = await client.get(f"/items/{seeded_item.id}")
+        assert response.status_code == HTTP_404_NOT_FOUND
+
+
+class TestFastReadPath:
+    async def test_item_json_matches_schema(
+        self, client: AsyncClient, seeded_item: ItemModel
+    ) -> None:
+        expected = ItemSchema.model_validate(seeded_item, from_attributes=True)
+        response = await client.get(f"/items/{seeded_item.id}")
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == expected.model_dump(mode="json")
+
+    async def test_list_json_matches_schema(
+        self, client: AsyncClient, seeded_items: list[ItemModel]
+    ) -> None:
+        expected = [
+            ItemSchema.model_validate(item, from_attributes=True).model_dump(
+                mode="json"
+            )
+            for item in seeded_items
+        ]
+        response = await client.get("/items/")
+        assert response.json() == expected
+
+    async def test_list_does_not_load_orm_instances(
+        self,
+        client: AsyncClient,
+        seeded_items: list[ItemModel],
+        test_session: AsyncSession,
+    ) -> None:
+        test_session.expunge_all()
+        await client.get("/items/")
+        assert not test_session.identity_map
+
+
+class TestSparseFieldsets:
+    async def test_list_returns_only_requested_fields(
+        self, client: AsyncClient, seeded_items: list[ItemModel]
+    ) -> None:
+        response = await client.get("/items/", params={"fields": "name,id"})
+        assert response.status_code == HTTP_200_OK
+        assert [list(item) for item in response.json()] == [["id", "name"]] * len(
+            seeded_items
+        )
+
+    async def test_item_returns_only_requested_fields(
+        self, client: AsyncClient, seeded_item: ItemModel
+    ) -> None:
+        response = await client.get(
+            f"/items/{seeded_item.id}", params={"fields": "price"}
+        )
+        assert response.json() == {"price": seeded_item.price}
+
+    async def test_unrequested_columns_are_not_selected(
+        self,
+        client: AsyncClient,
+        seeded_items: list[ItemModel],
+        query_counter: list[str],
+    ) -> None:
+        query_counter.clear()
+        await client.get("/items/", params={"fields": "id,name"})
+        (statement,) = query_counter
+        assert "description" not in statement
+        assert "image_url" not in statement
+
+    async def test_sparse_read_is_served_from_cache(
+        self, client: AsyncClient, seeded_item: ItemModel, query_counter: list[str]
+    ) -> None:
+        item_id = seeded_item.id
+        full = (await client.get(f"/items/{item_id}")).json()
+        query_counter.clear()
+        response = await client.get(f"/items/{item_id}", params={"fields": "name"})
+        assert response.json() == {"name": full["name"]}
+        assert not query_counter
+
+    async def test_unknown_field_returns_422(self, client: AsyncClient) -> None:
+        response = await client.get("/items/", params={"fields": "name,secret"})
+        assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
+        assert "secret" in response.json()["detail"]
+
+    async def test_empty_fields_returns_422(
+        self, client: AsyncClient, seeded_item: ItemModel
+    ) -> None:
+        response = await client.get(f"/items/{seeded_item.id}", params={"fields": ","})
+        assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
+
+
+class TestReadItemETag:
+    async def test_response_has_version_etag(
+        self, client: AsyncClient, seeded_item: ItemModel
+    ) -> None:
+        response = await client.get(f"/items/{seeded_item.id}")
+        assert response.headers["etag"] == version_etag(1)
+
+    async def test_sparse_response_has_weak_etag(
+        self, client: AsyncClient, seeded_item: ItemModel
+    ) -> None:
+        response = await client.get(
+            f"/items/{seeded_item.id}", params={"fields": "name"}
+        )
+        assert response.headers["etag"] == f"W/{version_etag(1)}"
+
+    async def test_matching_etag_returns_304(
+        self, client: AsyncClient, seeded_item: ItemModel
+    ) -> None:
+        item_id = seeded_item.id
+        etag = (await client.get(f"/items/{item_id}")).headers["etag"]
+        response = await client.get(
+            f"/items/{item_id}", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == HTTP_304_NOT_MODIFIED
+        assert not response.content
+        assert response.headers["etag"] == etag
+
+    async def test_uncached_revalidation_reads_only_version(
+        self, client: AsyncClient, seeded_item: ItemModel, query_counter: list[str]
+    ) -> None:
+        item_id = seeded_item.id
+        etag = (await client.get(f"/items/{item_id}")).headers["etag"]
+        get_item_cache().clear()
+        query_counter.clear()
+        response = await client.get(
+            f"/items/{item_id}", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == HTTP_304_NOT_MODIFIED
+        assert len(query_counter) == 1
+        assert "items.name" not in query_counter[0]
+
+    @pytest.mark.parametrize("warming_reads", [0, 1])
+    async def test_update_changes_etag(
+        self, client: AsyncClient, seeded_item: ItemModel, warming_reads: int
+    ) -> None:
+        item_id = seeded_item.id
+        etag = (await client.get(f"/items/{item_id}")).headers["etag"]
+        await client.patch(
+            f"/items/{item_id}", json={"name": "Renamed"}, headers=IF_UNMODIFIED
+        )
+        for _ in range(warming_reads):
+            await client.get(f"/items/{item_id}")
+        response = await client.get(
+            f"/items/{item_id}", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == HTTP_200_OK
+        assert response.headers["etag"] != etag
+        assert response.json()["name"] == "Renamed"
+
+    async def test_revalidating_missing_item_returns_404(
+        self, client: AsyncClient
+    ) -> None:
+        response = await client.get(
+            f"/items/{uuid.uuid4()}", headers={"If-None-Match": 'W/"stale"'}
+        )
+        assert response.status_code == HTTP_404_NOT_FOUND
+
+
+class TestReadItemsETag:
+    async def test_matching_etag_returns_304(
+        self, client: AsyncClient, seeded_items: list[ItemModel]
+    ) -> None:
+        first = await client.get("/items/", params={"limit": 2})
+        response = await client.get(
+            "/items/",
+            params={"limit": 2},
+            headers={"If-None-Match": first.headers["etag"]},
+        )
+        assert response.status_code == HTTP_304_NOT_MODIFIED
+        assert not response.content
+        assert response.headers[NEXT_CURSOR_HEADER] == first.headers[NEXT_CURSOR_HEADER]
+
+    async def test_updating_a_row_changes_etag(
+        self, client: AsyncClient, seeded_items: list[ItemModel]
+    ) -> None:
+        first_id = seeded_items[0].id
+        etag = (await client.get("/items/")).headers["etag"]
+        await client.patch(
+            f"/items/{first_id}", json={"price": 42.0}, headers=IF_UNMODIFIED
+        )
+        response = await client.get("/items/", headers={"If-None-Match": etag})
+        assert response.status_code == HTTP_200_OK
+        assert response.headers["etag"] != etag
+
+    async def test_pages_have_different_etags(
+        self, client: AsyncClient, seeded_items: list[ItemModel]
+    ) -> None:
+        first = await client.get("/items/", params={"limit": 2})
+        second = await client.get("/items/", params={"limit": 2, "offset": 2})
+        assert first.headers["etag"] != second.headers["etag"]
+
 
 # ---------------------------------------------------------------------------
 # POST /items/
@@ -135,7 +590,9 @@ class TestUpdateItem:
     async def test_returns_200(
         self, client: AsyncClient, sample_item: dict, seeded_item: ItemModel
     ) -> None:
-        response = await client.put(f"/items/{seeded_item.id}", json=sample_item)
+        response = await client.put(
+            f"/items/{seeded_item.id}", json=sample_item, headers=IF_UNMODIFIED
+        )
         assert response.status_code == HTTP_200_OK
 
     async def test_response_reflects_update(
@@ -144,7 +601,9 @@ class TestUpdateItem:
         sample_item: dict,
         seeded_item: ItemModel,
     ) -> None:
-        response = await client.put(f"/items/{seeded_item.id}", json=sample_item)
+        response = await client.put(
+            f"/items/{seeded_item.id}", json=sample_item, headers=IF_UNMODIFIED
+        )
         body = response.json()
         assert body["name"] == sample_item["name"]
         assert body["price"] == sample_item["price"]
@@ -155,8 +614,9 @@ class TestUpdateItem:
         sample_item: dict,
         seeded_item: ItemModel,
     ) -> None:
-        await client.put(f"/items/{seeded_item.id}", json=sample_item)
-        response = await client.get(f"/items/{seeded_item.id}")
+        item_id = seeded_item.id
+        await client.put(f"/items/{item_id}", json=sample_item, headers=IF_UNMODIFIED)
+        response = await client.get(f"/items/{item_id}")
         body = response.json()
         assert body["name"] == sample_item["name"]
 
@@ -168,6 +628,129 @@ class TestUpdateItem:
         )
         assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
 
+    async def test_non_existing_id_returns_404(
+        self, client: AsyncClient, sample_item: dict
+    ) -> None:
+        response = await client.put(
+            f"/items/{uuid.uuid4()}", json=sample_item, headers=IF_UNMODIFIED
+        )
+        assert response.status_code == HTTP_404_NOT_FOUND
+
+    @pytest.mark.parametrize("method", ["put", "patch"])
+    async def test_single_roundtrip(
+        self,
+        client: AsyncClient,
+        sample_item: dict,
+        seeded_item: ItemModel,
+        query_counter: list[str],
+        method: str,
+    ) -> None:
+        await client.request(
+            method, f"/items/{seeded_item.id}", json=sample_item, headers=IF_UNMODIFIED
+        )
+        assert len(query_counter) == 1
+
+
+class TestConditionalUpdate:
+    @pytest.mark.parametrize("method", ["put", "patch"])
+    async def test_missing_if_match_returns_428(
+        self, client: AsyncClient, seeded_item: ItemModel, method: str
+    ) -> None:
+        response = await client.request(
+            method, f"/items/{seeded_item.id}", json={"name": "Renamed"}
+        )
+        assert response.status_code == HTTP_428_PRECONDITION_REQUIRED
+
+    @pytest.mark.parametrize("method", ["put", "patch"])
+    async def test_write_returns_next_version_etag(
+        self, client: AsyncClient, seeded_item: ItemModel, method: str
+    ) -> None:
+        item_id = seeded_item.id
+        response = await client.request(
+            method, f"/items/{item_id}", json={"name": "Renamed"}, headers=IF_UNMODIFIED
+        )
+        assert response.headers["etag"] == version_etag(2)
+        assert (await client.get(f"/items/{item_id}")).headers["etag"] == version_etag(
+            2
+        )
+
+    async def test_stale_if_match_returns_412(
+        self, client: AsyncClient, seeded_item: ItemModel
+    ) -> None:
+        item_id = seeded_item.id
+        await client.patch(
+            f"/items/{item_id}", json={"name": "First"}, headers=IF_UNMODIFIED
+        )
+        response = await client.patch(
+            f"/items/{item_id}", json={"name": "Second"}, headers=IF_UNMODIFIED
+        )
+        assert response.status_code == HTTP_412_PRECONDITION_FAILED
+        assert (await client.get(f"/items/{item_id}")).json()["name"] == "First"
+
+    async def test_any_listed_version_matches(
+        self, client: AsyncClient, seeded_item: ItemModel
+    ) -> None:
+        response = await client.patch(
+            f"/items/{seeded_item.id}",
+            json={"name": "Renamed"},
+            headers={"If-Match": f"{version_etag(7)}, {version_etag(1)}"},
+        )
+        assert response.status_code == HTTP_200_OK
+
+    async def test_star_matches_any_version(
+        self, client: AsyncClient, seeded_item: ItemModel
+    ) -> None:
+        item_id = seeded_item.id
+        await client.patch(
+            f"/items/{item_id}", json={"name": "First"}, headers=IF_UNMODIFIED
+        )
+        response = await client.patch(
+            f"/items/{item_id}", json={"name": "Second"}, headers={"If-Match": "*"}
+        )
+        assert response.status_code == HTTP_200_OK
+
+    async def test_weak_etag_never_matches(
+        self, client: AsyncClient, seeded_item: ItemModel
+    ) -> None:
+        response = await client.patch(
+            f"/items/{seeded_item.id}",
+            json={"name": "Renamed"},
+            headers={"If-Match": f"W/{version_etag(1)}"},
+        )
+        assert response.status_code == HTTP_412_PRECONDITION_FAILED
+
+    async def test_bulk_update_bumps_version(
+        self, client: AsyncClient, seeded_item: ItemModel
+    ) -> None:
+        item_id = str(seeded_item.id)
+        await client.patch(
+            "/items/bulk", json=[{"id": item_id, "version": 1, "price": 1.0}]
+        )
+        response = await client.patch(
+            f"/items/{item_id}", json={"name": "Renamed"}, headers=IF_UNMODIFIED
+        )
+        assert response.status_code == HTTP_412_PRECONDITION_FAILED
+
+    async def test_orm_flush_checks_version(
+        self, test_session: AsyncSession, seeded_item: ItemModel
+    ) -> None:
+        item_id = seeded_item.id
+        seeded_item.name = "Renamed"
+        await test_session.commit()
+        await test_session.refresh(seeded_item)
+        assert seeded_item.version == 2  # noqa: PLR2004
+
+        await test_session.execute(
+            update(ItemModel)
+            .where(ItemModel.id == item_id)
+            .values(version=ItemModel.version + 1)
+            # As if written by another process: the loaded item is not told
+            .execution_options(synchronize_session=False)
+        )
+        seeded_item.name = "Stale"
+        with pytest.raises(StaleDataError):
+            await test_session.flush()
+
 
 # ---------------------------------------------------------------------------
 # DELETE /items/{id_param}
@@ -178,13 +761,17 @@ class TestDeleteItem:
     async def test_returns_200(
         self, client: AsyncClient, seeded_item: ItemModel
     ) -> None:
-        response = await client.delete(f"/items/{seeded_item.id}")
+        response = await client.delete(
+            f"/items/{seeded_item.id}", headers=IF_UNMODIFIED
+        )
         assert response.status_code == HTTP_200_OK
 
     async def test_response_contains_detail(
         self, client: AsyncClient, seeded_item: ItemModel
     ) -> None:
-        response = await client.delete(f"/items/{seeded_item.id}")
+        response = await client.delete(
+            f"/items/{seeded_item.id}", headers=IF_UNMODIFIED
+        )
         body = response.json()
         assert body["detail"] == "Item deleted successfully"
         assert body["status_code"] == HTTP_200_OK
@@ -192,7 +779,7 @@ class TestDeleteItem:
     async def test_item_removed_from_db(
         self, client: AsyncClient, seeded_item: ItemModel
     ) -> None:
-        await client.delete(f"/items/{seeded_item.id}")
+        await client.delete(f"/items/{seeded_item.id}", headers=IF_UNMODIFIED)
         response = await client.get(f"/items/{seeded_item.id}")
         assert response.status_code == HTTP_404_NOT_FOUND
 
@@ -200,26 +787,53 @@ class TestDeleteItem:
         self, client: AsyncClient
     ) -> None:
         random_id = uuid.uuid4()
-        response = await client.delete(f"/items/{random_id}")
+        response = await client.delete(f"/items/{random_id}", headers=IF_UNMODIFIED)
         assert response.status_code == HTTP_404_NOT_FOUND
 
+    async def test_missing_if_match_returns_428(
+        self, client: AsyncClient, seeded_item: ItemModel
+    ) -> None:
+        response = await client.delete(f"/items/{seeded_item.id}")
+        assert response.status_code == HTTP_428_PRECONDITION_REQUIRED
+        assert (await client.get(f"/items/{seeded_item.id}")).status_code == HTTP_200_OK
+
+    async def test_stale_if_match_returns_412(
+        self, client: AsyncClient, seeded_item: ItemModel
+    ) -> None:
+        item_id = seeded_item.id
+        await client.patch(
+            f"/items/{item_id}", json={"name": "Renamed"}, headers=IF_UNMODIFIED
+        )
+        response = await client.delete(f"/items/{item_id}", headers=IF_UNMODIFIED)
+        assert response.status_code == HTTP_412_PRECONDITION_FAILED
+        assert (await client.get(f"/items/{item_id}")).json()["name"] == "Renamed"
+
+    async def test_star_deletes_any_version(
+        self, client: AsyncClient, seeded_item: ItemModel
+    ) -> None:
+        item_id = seeded_item.id
+        await client.patch(
+            f"/items/{item_id}", json={"name": "Renamed"}, headers=IF_UNMODIFIED
+        )
+        response = await client.delete(f"/items/{item_id}", headers={"If-Match": "*"})
+        assert response.status_code == HTTP_200_OK
+
+    async def test_single_roundtrip(
+        self, client: AsyncClient, seeded_item: ItemModel, query_counter: list[str]
+    ) -> None:
+        await client.delete(f"/items/{seeded_item.id}", headers=IF_UNMODIFIED)
+        assert len(query_counter) == 1
+
 
 # ---------------------------------------------------------------------------
 # POST /items/image/{id_param}
 # ---------------------------------------------------------------------------
 
 
+@pytest.mark.usefixtures("cleanup_images")
 class TestSubmitItemImage:
     FAKE_PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 100
-
-    @pytest.fixture(autouse=True)
-    async def cleanup_images(self) -> AsyncGenerator[None]:
-        before = set(IMAGES_DIR.iterdir()) if IMAGES_DIR.exists() else set()
-        yield
-        if IMAGES_DIR.exists():
-            for f in IMAGES_DIR.iterdir():
-                if f not in before:
-                    f.unlink(missing_ok=True)
+    FAKE_PNG_URL = storage.blob_url(hashlib.sha256(FAKE_PNG).hexdigest(), ".png")
 
     async def test_returns_200(
         self, client: AsyncClient, seeded_item: ItemModel
@@ -237,7 +851,7 @@ class TestSubmitItemImage:
             f"/items/image/{seeded_item.id}",
             files={"image_file": ("test.png", self.FAKE_PNG, "image/png")},
         )
-        assert response.json()["image_url"] == "/static/images/test.png"
+        assert response.json()["image_url"] == self.FAKE_PNG_URL
 
     async def test_item_name_unchanged(
         self, client: AsyncClient, seeded_item: ItemModel
@@ -255,6 +869,28 @@ class TestSubmitItemImage:
             files={"image_file": ("test.png", self.FAKE_PNG, "image/png")},
         )
         assert response.status_code == HTTP_404_NOT_FOUND
+        assert not storage.blob_path(self.FAKE_PNG_URL).exists()
+
+    async def test_failed_update_leaves_the_blob_file_to_the_sweep(
+        self,
+        client: AsyncClient,
+        seeded_item: ItemModel,
+        test_session: AsyncSession,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        async def fail(*_args: object) -> None:
+            raise HTTPException(status_code=HTTP_409_CONFLICT)
+
+        monkeypatch.setattr(items_router, "_update_item_returning", fail)
+        response = await client.post(
+            f"/items/image/{seeded_item.id}",
+            files={"image_file": ("test.png", self.FAKE_PNG, "image/png")},
+        )
+        assert response.status_code == HTTP_409_CONFLICT
+        await test_session.rollback()
+        assert await _blob_refs(test_session) == {}
+        # A concurrent upload of the same content may still commit a row for it
+        assert storage.blob_path(self.FAKE_PNG_URL).exists()
 
     async def test_missing_file_returns_422(
         self, client: AsyncClient, seeded_item: ItemModel
@@ -262,38 +898,415 @@ class TestSubmitItemImage:
         response = await client.post(f"/items/image/{seeded_item.id}")
         assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
 
+    async def test_three_roundtrips(
+        self, client: AsyncClient, seeded_item: ItemModel, query_counter: list[str]
+    ) -> None:
+        # Item lock, blob upsert, then UPDATE ... RETURNING; there is no previous
+        # image to release
+        expected_statements = 3
+        await client.post(
+            f"/items/image/{seeded_item.id}",
+            files={"image_file": ("test.png", self.FAKE_PNG, "image/png")},
+        )
+        assert len(query_counter) == expected_statements
 
-# ---------------------------------------------------------------------------
-# POST /items/with-image/
-# ---------------------------------------------------------------------------
-
-
-class TestCreateItemWithImage:
-    FAKE_PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 100
-
-    @pytest.fixture(autouse=True)
-    async def cleanup_images(self) -> AsyncGenerator[None]:
-        before = set(IMAGES_DIR.iterdir()) if IMAGES_DIR.exists() else set()
-        yield
-        if IMAGES_DIR.exists():
-            for f in IMAGES_DIR.iterdir():
-                if f not in before:
-                    f.unlink(missing_ok=True)
-
-    async def test_returns_200_without_image(self, client: AsyncClient) -> None:
+    async def test_streams_upload_in_chunks(
+        self,
+        client: AsyncClient,
+        seeded_item: ItemModel,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(storage, "UPLOAD_CHUNK_SIZE", 7)
+        content = bytes(range(256)) * 4
         response = await client.post(
-            "/items/with-image/",
-            data={
-                "name": "Test Item",
-                "description": "A long enough description",
-                "price": "9.99",
-                "tax": "1.0",
-            },
+            f"/items/image/{seeded_item.id}",
+            files={"image_file": ("chunked.png", content, "image/png")},
         )
-        assert response.status_code in {HTTP_200_OK, HTTP_201_CREATED}
+        url = response.json()["image_url"]
+        assert url == storage.blob_url(hashlib.sha256(content).hexdigest(), ".png")
+        assert storage.blob_path(url).read_bytes() == content
 
-    async def test_response_fields_without_image(self, client: AsyncClient) -> None:
-        response = await client.post(
+    async def test_oversized_upload_returns_413(
+        self,
+        client: AsyncClient,
+        seeded_item: ItemModel,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(settings, "image_max_upload_bytes", 50)
+        response = await client.post(
+            f"/items/image/{seeded_item.id}",
+            files={"image_file": ("big.png", self.FAKE_PNG, "image/png")},
+        )
+        assert response.status_code == HTTP_413_CONTENT_TOO_LARGE
+        assert not any(path.suffix == ".part" for path in IMAGES_DIR.rglob("*"))
+
+    async def test_client_directories_are_ignored(
+        self, client: AsyncClient, seeded_item: ItemModel
+    ) -> None:
+        response = await client.post(
+            f"/items/image/{seeded_item.id}",
+            files={"image_file": ("../../escape.png", self.FAKE_PNG, "image/png")},
+        )
+        assert response.json()["image_url"] == self.FAKE_PNG_URL
+        assert not (IMAGES_DIR.parent.parent / "escape.png").exists()
+
+    async def test_identical_uploads_share_one_blob(
+        self,
+        client: AsyncClient,
+        seeded_items: list[ItemModel],
+        test_session: AsyncSession,
+    ) -> None:
+        first_id, second_id = seeded_items[0].id, seeded_items[1].id
+        urls = set()
+        for item_id, filename in ((first_id, "a.png"), (second_id, "b.png")):
+            response = await client.post(
+                f"/items/image/{item_id}",
+                files={"image_file": (filename, self.FAKE_PNG, "image/png")},
+            )
+            urls.add(response.json()["image_url"])
+        assert urls == {self.FAKE_PNG_URL}
+        assert await _blob_refs(test_session) == {self.FAKE_PNG_URL: 2}
+        stored = [path for path in IMAGES_DIR.rglob("*") if path.is_file()]
+        assert storage.blob_path(self.FAKE_PNG_URL) in stored
+
+    async def test_replacing_an_image_releases_the_old_blob(
+        self, client: AsyncClient, seeded_item: ItemModel, test_session: AsyncSession
+    ) -> None:
+        item_id = seeded_item.id
+        other_png = self.FAKE_PNG + b"\x01"
+        for content in (self.FAKE_PNG, other_png):
+            await client.post(
+                f"/items/image/{item_id}",
+                files={"image_file": ("test.png", content, "image/png")},
+            )
+        other_url = storage.blob_url(hashlib.sha256(other_png).hexdigest(), ".png")
+        assert await _blob_refs(test_session) == {
+            self.FAKE_PNG_URL: 0,
+            other_url: 1,
+        }
+
+    async def test_reuploading_the_same_image_keeps_one_reference(
+        self, client: AsyncClient, seeded_item: ItemModel, test_session: AsyncSession
+    ) -> None:
+        item_id = seeded_item.id
+        for _ in range(2):
+            await client.post(
+                f"/items/image/{item_id}",
+                files={"image_file": ("test.png", self.FAKE_PNG, "image/png")},
+            )
+        assert await _blob_refs(test_session) == {self.FAKE_PNG_URL: 1}
+
+    async def test_deleting_items_releases_their_blob(
+        self,
+        client: AsyncClient,
+        seeded_items: list[ItemModel],
+        test_session: AsyncSession,
+    ) -> None:
+        ids = [str(item.id) for item in seeded_items[:3]]
+        for item_id in ids:
+            await client.post(
+                f"/items/image/{item_id}",
+                files={"image_file": ("test.png", self.FAKE_PNG, "image/png")},
+            )
+        # Each upload bumped its item to version 2
+        await client.delete(f"/items/{ids[0]}", headers={"If-Match": version_etag(2)})
+        await client.post(
+            "/items/bulk/delete",
+            json=[{"id": item_id, "version": 2} for item_id in ids[1:]],
+        )
+        assert await _blob_refs(test_session) == {self.FAKE_PNG_URL: 0}
+
+    async def test_prune_removes_unreferenced_blobs(
+        self, client: AsyncClient, seeded_item: ItemModel, test_session: AsyncSession
+    ) -> None:
+        item_id = seeded_item.id
+        await client.post(
+            f"/items/image/{item_id}",
+            files={"image_file": ("test.png", self.FAKE_PNG, "image/png")},
+        )
+        assert await storage.prune_unreferenced_blobs(test_session) == 0
+
+        await client.delete(f"/items/{item_id}", headers={"If-Match": "*"})
+        assert await storage.prune_unreferenced_blobs(test_session) == 1
+        assert await _blob_refs(test_session) == {}
+        assert not storage.blob_path(self.FAKE_PNG_URL).exists()
+
+    async def test_prune_sweeps_files_without_a_row(
+        self, test_session: AsyncSession, tmp_path: Path
+    ) -> None:
+        digest = hashlib.sha256(self.FAKE_PNG).hexdigest()
+        orphan = tmp_path / digest[:2] / digest[2:4] / f"{digest}.png"
+        variant = orphan.with_name(f"{digest}.thumb.webp")
+        orphan.parent.mkdir(parents=True)
+        for path in (orphan, variant, tmp_path / ".upload.part"):
+            path.write_bytes(self.FAKE_PNG)
+        legacy = tmp_path / "legacy.png"
+        legacy.write_bytes(self.FAKE_PNG)
+
+        assert await storage.prune_orphaned_files(test_session, tmp_path) == 1
+        assert not orphan.exists()
+        assert not variant.exists()
+        assert not (tmp_path / ".upload.part").exists()
+        assert legacy.exists()
+
+    async def test_prune_sweeps_blob_files_without_a_suffix(
+        self, test_session: AsyncSession, tmp_path: Path
+    ) -> None:
+        digest = hashlib.sha256(self.FAKE_PNG).hexdigest()
+        orphan = tmp_path / digest[:2] / digest[2:4] / digest
+        orphan.parent.mkdir(parents=True)
+        orphan.write_bytes(self.FAKE_PNG)
+
+        assert await storage.prune_orphaned_files(test_session, tmp_path) == 1
+        assert not orphan.exists()
+
+    async def test_unknown_type_is_stored_with_fallback_suffix(
+        self, client: AsyncClient, seeded_item: ItemModel
+    ) -> None:
+        response = await client.post(
+            f"/items/image/{seeded_item.id}",
+            files={"image_file": ("image", self.FAKE_PNG, "application/x-unknown")},
+        )
+        assert response.json()["image_url"].endswith(storage.FALLBACK_SUFFIX)
+
+
+async def _blob_refs(session: AsyncSession) -> dict[str, int]:
+    result = await session.execute(select(ImageBlob.url, ImageBlob.ref_count))
+    return dict(result.tuples().all())
+
+
+# ---------------------------------------------------------------------------
+# GET /items/image/
+# ---------------------------------------------------------------------------
+
+
+def _png(width: int, height: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "teal").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.mark.usefixtures("cleanup_images")
+class TestGetImage:
+    PNG = b"\x89PNG\r\n\x1a\n" + b"\x01" * 100
+
+    @pytest.fixture
+    async def uploaded_url(self, client: AsyncClient, seeded_item: ItemModel) -> str:
+        response = await client.post(
+            f"/items/image/{seeded_item.id}",
+            files={"image_file": ("photo.png", self.PNG, "image/png")},
+        )
+        return response.json()["image_url"]
+
+    async def test_serves_uploaded_image(
+        self, client: AsyncClient, uploaded_url: str
+    ) -> None:
+        digest = hashlib.sha256(self.PNG).hexdigest()
+        response = await client.get("/items/image/", params={"filename": digest})
+        assert response.status_code == HTTP_200_OK
+        assert response.headers["content-type"] == "image/png"
+        assert response.content == self.PNG
+
+    @pytest.mark.parametrize("filename", ["missing", "*", "?" * 64])
+    async def test_unknown_or_pattern_names_return_404(
+        self, client: AsyncClient, uploaded_url: str, filename: str
+    ) -> None:
+        response = await client.get("/items/image/", params={"filename": filename})
+        assert response.status_code == HTTP_404_NOT_FOUND
+
+    async def test_indexed_lookup_does_not_scan_the_directory(
+        self,
+        client: AsyncClient,
+        uploaded_url: str,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        def fail(*_: object) -> None:
+            pytest.fail("the images directory was scanned")
+
+        digest = hashlib.sha256(self.PNG).hexdigest()
+        # The first lookup builds the index, as the lifespan does at startup
+        await client.get("/items/image/", params={"filename": "missing"})
+        monkeypatch.setattr(Path, "glob", fail)
+        monkeypatch.setattr(Path, "rglob", fail)
+        response = await client.get("/items/image/", params={"filename": digest})
+        assert response.status_code == HTTP_200_OK
+
+    async def test_finds_blob_stored_by_another_worker(
+        self, client: AsyncClient, uploaded_url: str
+    ) -> None:
+        content = self.PNG + b"\x02"
+        digest = hashlib.sha256(content).hexdigest()
+        path = storage.blob_path(storage.blob_url(digest, ".png"))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+        response = await client.get("/items/image/", params={"filename": digest})
+        assert response.content == content
+
+    async def test_repeat_view_returns_304(
+        self, client: AsyncClient, uploaded_url: str
+    ) -> None:
+        digest = hashlib.sha256(self.PNG).hexdigest()
+        first = await client.get("/items/image/", params={"filename": digest})
+        assert first.headers["etag"] == f'"{digest}.png"'
+        assert first.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+        response = await client.get(
+            "/items/image/",
+            params={"filename": digest},
+            headers={"If-None-Match": first.headers["etag"]},
+        )
+        assert response.status_code == HTTP_304_NOT_MODIFIED
+        assert not response.content
+
+    async def test_range_resumes_download(
+        self, client: AsyncClient, uploaded_url: str
+    ) -> None:
+        digest = hashlib.sha256(self.PNG).hexdigest()
+        response = await client.get(
+            "/items/image/",
+            params={"filename": digest},
+            headers={"Range": "bytes=8-"},
+        )
+        assert response.status_code == HTTP_206_PARTIAL_CONTENT
+        assert response.content == self.PNG[8:]
+
+    async def test_missing_variant_is_not_cached(
+        self, client: AsyncClient, uploaded_url: str
+    ) -> None:
+        # Not decodable, so no variant is ever rendered for this image
+        digest = hashlib.sha256(self.PNG).hexdigest()
+        response = await client.get(
+            "/items/image/",
+            params={"filename": digest, "size": "thumbnail"},
+            headers={"Accept": "image/webp"},
+        )
+        assert response.headers["content-type"] == "image/png"
+        assert response.headers["cache-control"] == REVALIDATE_CACHE_CONTROL
+
+    async def test_pruned_blob_is_dropped_from_index(
+        self, client: AsyncClient, seeded_item: ItemModel, test_session: AsyncSession
+    ) -> None:
+        item_id = seeded_item.id
+        await client.post(
+            f"/items/image/{item_id}",
+            files={"image_file": ("photo.png", self.PNG, "image/png")},
+        )
+        await client.delete(f"/items/{item_id}", headers={"If-Match": "*"})
+        await storage.prune_unreferenced_blobs(test_session)
+        digest = hashlib.sha256(self.PNG).hexdigest()
+        response = await client.get("/items/image/", params={"filename": digest})
+        assert response.status_code == HTTP_404_NOT_FOUND
+
+
+@pytest.mark.usefixtures("cleanup_images")
+class TestImageVariants:
+    @pytest.fixture
+    async def uploaded_digest(self, client: AsyncClient, seeded_item: ItemModel) -> str:
+        response = await client.post(
+            f"/items/image/{seeded_item.id}",
+            files={"image_file": ("photo.png", _png(400, 300), "image/png")},
+        )
+        return storage.blob_path(response.json()["image_url"]).name.split(".")[0]
+
+    async def test_variants_rendered_after_upload(
+        self, uploaded_digest: str, variant_pipeline: VariantPipeline
+    ) -> None:
+        original = next(IMAGES_DIR.rglob(f"{uploaded_digest}.png"))
+        assert variant_pipeline.processed == 1
+        assert variant_path(original, ImageSize.THUMBNAIL, "image/webp").exists()
+
+    @pytest.mark.parametrize(
+        ("accept", "media_type"),
+        [
+            ("image/avif,image/webp,*/*", "image/avif"),
+            ("image/avif;q=0, image/webp", "image/webp"),
+            ("*/*", "image/png"),
+        ],
+    )
+    async def test_size_served_in_best_accepted_encoding(
+        self, client: AsyncClient, uploaded_digest: str, accept: str, media_type: str
+    ) -> None:
+        response = await client.get(
+            "/items/image/",
+            params={"filename": uploaded_digest, "size": "thumbnail"},
+            headers={"Accept": accept},
+        )
+        assert response.status_code == HTTP_200_OK
+        assert response.headers["content-type"] == media_type
+        assert response.headers["vary"] == "Accept"
+
+    async def test_thumbnail_is_resized(
+        self, client: AsyncClient, uploaded_digest: str
+    ) -> None:
+        response = await client.get(
+            "/items/image/",
+            params={"filename": uploaded_digest, "size": "thumbnail"},
+            headers={"Accept": "image/webp"},
+        )
+        with Image.open(io.BytesIO(response.content)) as image:
+            assert max(image.size) == VARIANT_EDGES[ImageSize.THUMBNAIL]
+
+    async def test_original_served_without_size(
+        self, client: AsyncClient, uploaded_digest: str
+    ) -> None:
+        response = await client.get(
+            "/items/image/",
+            params={"filename": uploaded_digest},
+            headers={"Accept": "image/webp"},
+        )
+        assert response.headers["content-type"] == "image/png"
+
+    async def test_undecodable_image_is_counted_as_failed(
+        self,
+        client: AsyncClient,
+        seeded_item: ItemModel,
+        variant_pipeline: VariantPipeline,
+    ) -> None:
+        response = await client.post(
+            f"/items/image/{seeded_item.id}",
+            files={"image_file": ("broken.png", b"not an image", "image/png")},
+        )
+        assert response.status_code == HTTP_200_OK
+        assert variant_pipeline.failed == 1
+
+    async def test_saturated_pipeline_skips_variants(
+        self,
+        client: AsyncClient,
+        seeded_item: ItemModel,
+        variant_pipeline: VariantPipeline,
+    ) -> None:
+        variant_pipeline.max_pending = 0
+        await client.post(
+            f"/items/image/{seeded_item.id}",
+            files={"image_file": ("photo.png", _png(40, 30), "image/png")},
+        )
+        assert variant_pipeline.dropped == 1
+        assert variant_pipeline.processed == 0
+
+
+# ---------------------------------------------------------------------------
+# POST /items/with-image/
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.usefixtures("cleanup_images")
+class TestCreateItemWithImage:
+    FAKE_PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 100
+    FAKE_PNG_URL = storage.blob_url(hashlib.sha256(FAKE_PNG).hexdigest(), ".png")
+
+    async def test_returns_200_without_image(self, client: AsyncClient) -> None:
+        response = await client.post(
+            "/items/with-image/",
+            data={
+                "name": "Test Item",
+                "description": "A long enough description",
+                "price": "9.99",
+                "tax": "1.0",
+            },
+        )
+        assert response.status_code in {HTTP_200_OK, HTTP_201_CREATED}
+
+    async def test_response_fields_without_image(self, client: AsyncClient) -> None:
+        response = await client.post(
             "/items/with-image/",
             data={
                 "name": "Test Item",
@@ -330,7 +1343,8 @@ class TestCreateItemWithImage:
             },
             files={"image_file": ("product.png", self.FAKE_PNG, "image/png")},
         )
-        assert response.json()["image_url"] == "/static/images/product.png"
+        assert response.json()["image_url"] == self.FAKE_PNG_URL
+        assert storage.blob_path(self.FAKE_PNG_URL).read_bytes() == self.FAKE_PNG
 
     async def test_default_values_used_when_no_data_sent(
         self, client: AsyncClient
@@ -367,3 +1381,643 @@ class TestCreateItemWithImage:
             },
         )
         assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
+
+
+# ---------------------------------------------------------------------------
+# POST /items/bulk
+# ---------------------------------------------------------------------------
+
+
+class TestBulkCreateItems:
+    async def test_creates_all_items_in_order(
+        self, client: AsyncClient, sample_item: dict
+    ) -> None:
+        payload = [sample_item | {"name": f"Bulk {index}"} for index in range(3)]
+        response = await client.post("/items/bulk", json=payload)
+        assert response.status_code == HTTP_200_OK
+        results = response.json()
+        assert [result["item"]["name"] for result in results] == [
+            "Bulk 0",
+            "Bulk 1",
+            "Bulk 2",
+        ]
+        assert all(result["status_code"] == HTTP_201_CREATED for result in results)
+        assert all(result["id"] for result in results)
+
+    async def test_items_persisted_in_db(
+        self, client: AsyncClient, sample_item: dict
+    ) -> None:
+        payload = [sample_item | {"name": f"Bulk {index}"} for index in range(3)]
+        results = (await client.post("/items/bulk", json=payload)).json()
+        response = await client.get(f"/items/{results[1]['id']}")
+        assert response.json()["name"] == "Bulk 1"
+
+    async def test_single_insert_statement(
+        self, client: AsyncClient, sample_item: dict, query_counter: list[str]
+    ) -> None:
+        payload = [sample_item | {"name": f"Bulk {index}"} for index in range(20)]
+        await client.post("/items/bulk", json=payload)
+        assert len(query_counter) == 1
+
+    async def test_invalid_element_rejects_batch(
+        self, client: AsyncClient, sample_item: dict
+    ) -> None:
+        payload = [sample_item, sample_item | {"price": -1}]
+        response = await client.post("/items/bulk", json=payload)
+        assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
+
+    async def test_empty_batch_returns_422(self, client: AsyncClient) -> None:
+        response = await client.post("/items/bulk", json=[])
+        assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
+
+
+# ---------------------------------------------------------------------------
+# PATCH /items/bulk
+# ---------------------------------------------------------------------------
+
+
+class TestBulkUpdateItems:
+    async def test_updates_existing_and_reports_missing(
+        self, client: AsyncClient, seeded_items: list[ItemModel]
+    ) -> None:
+        missing_id = str(uuid.uuid4())
+        payload = [
+            {"id": str(seeded_items[0].id), "version": 1, "name": "Renamed 0"},
+            {"id": missing_id, "version": 1, "name": "Nobody"},
+            {"id": str(seeded_items[1].id), "version": 1, "price": 99.0},
+        ]
+        response = await client.patch("/items/bulk", json=payload)
+        results = response.json()
+        assert [result["status_code"] for result in results] == [
+            HTTP_200_OK,
+            HTTP_404_NOT_FOUND,
+            HTTP_200_OK,
+        ]
+        assert results[0]["item"]["name"] == "Renamed 0"
+        assert results[1]["id"] == missing_id
+        assert results[2]["item"]["price"] == payload[2]["price"]
+        assert results[2]["item"]["name"] == "Item 1"
+
+    async def test_stale_version_returns_412_and_keeps_item(
+        self, client: AsyncClient, seeded_items: list[ItemModel]
+    ) -> None:
+        stale_id, fresh_id = str(seeded_items[0].id), str(seeded_items[1].id)
+        await client.patch(
+            f"/items/{stale_id}", json={"name": "Concurrent"}, headers=IF_UNMODIFIED
+        )
+        payload = [
+            {"id": stale_id, "version": 1, "name": "Stale"},
+            {"id": fresh_id, "version": 1, "name": "Fresh"},
+        ]
+        results = (await client.patch("/items/bulk", json=payload)).json()
+        assert [result["status_code"] for result in results] == [
+            HTTP_412_PRECONDITION_FAILED,
+            HTTP_200_OK,
+        ]
+        assert results[0]["item"] is None
+        assert (await client.get(f"/items/{stale_id}")).json()["name"] == "Concurrent"
+        assert (await client.get(f"/items/{fresh_id}")).json()["name"] == "Fresh"
+
+    async def test_repeated_item_chains_versions(
+        self, client: AsyncClient, seeded_item: ItemModel
+    ) -> None:
+        item_id = str(seeded_item.id)
+        payload = [
+            {"id": item_id, "version": 1, "name": "First"},
+            {"id": item_id, "version": 2, "price": 5.0},
+            {"id": item_id, "version": 2, "name": "Stale"},
+        ]
+        results = (await client.patch("/items/bulk", json=payload)).json()
+        assert [result["status_code"] for result in results] == [
+            HTTP_200_OK,
+            HTTP_200_OK,
+            HTTP_412_PRECONDITION_FAILED,
+        ]
+        response = await client.get(f"/items/{item_id}")
+        assert response.json()["name"] == "First"
+        assert response.headers["etag"] == version_etag(3)
+
+    async def test_missing_version_returns_422(
+        self, client: AsyncClient, seeded_item: ItemModel
+    ) -> None:
+        payload = [{"id": str(seeded_item.id), "name": "Renamed"}]
+        response = await client.patch("/items/bulk", json=payload)
+        assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
+
+    async def test_invalidates_cache(
+        self, client: AsyncClient, seeded_item: ItemModel
+    ) -> None:
+        item_id = str(seeded_item.id)
+        await client.get(f"/items/{item_id}")
+        await client.patch(
+            "/items/bulk", json=[{"id": item_id, "version": 1, "name": "Fresh"}]
+        )
+        response = await client.get(f"/items/{item_id}")
+        assert response.json()["name"] == "Fresh"
+
+    async def test_statement_count_independent_of_batch_size(
+        self,
+        client: AsyncClient,
+        seeded_items: list[ItemModel],
+        query_counter: list[str],
+    ) -> None:
+        payload = [
+            {"id": str(item.id), "version": 1, "tax": 2.0} for item in seeded_items
+        ]
+        await client.patch("/items/bulk", json=payload)
+        lock_update_and_select = 3
+        assert len(query_counter) == lock_update_and_select
+
+
+# ---------------------------------------------------------------------------
+# POST /items/bulk/delete
+# ---------------------------------------------------------------------------
+
+
+class TestBulkDeleteItems:
+    async def test_deletes_existing_and_reports_missing(
+        self, client: AsyncClient, seeded_items: list[ItemModel]
+    ) -> None:
+        ids = [str(seeded_items[0].id), str(uuid.uuid4()), str(seeded_items[1].id)]
+        payload = [{"id": item_id, "version": 1} for item_id in ids]
+        response = await client.post("/items/bulk/delete", json=payload)
+        results = response.json()
+        assert [result["status_code"] for result in results] == [
+            HTTP_200_OK,
+            HTTP_404_NOT_FOUND,
+            HTTP_200_OK,
+        ]
+        remaining = await client.get("/items/", params={"limit": 10})
+        assert len(remaining.json()) == len(seeded_items) - 2
+
+    async def test_stale_version_returns_412_and_keeps_item(
+        self, client: AsyncClient, seeded_items: list[ItemModel]
+    ) -> None:
+        stale_id, fresh_id = str(seeded_items[0].id), str(seeded_items[1].id)
+        await client.patch(
+            f"/items/{stale_id}", json={"name": "Concurrent"}, headers=IF_UNMODIFIED
+        )
+        payload = [{"id": stale_id, "version": 1}, {"id": fresh_id, "version": 1}]
+        results = (await client.post("/items/bulk/delete", json=payload)).json()
+        assert [result["status_code"] for result in results] == [
+            HTTP_412_PRECONDITION_FAILED,
+            HTTP_200_OK,
+        ]
+        assert (await client.get(f"/items/{stale_id}")).status_code == HTTP_200_OK
+
+    async def test_single_delete_statement(
+        self,
+        client: AsyncClient,
+        seeded_items: list[ItemModel],
+        query_counter: list[str],
+    ) -> None:
+        payload = [{"id": str(item.id), "version": 1} for item in seeded_items]
+        query_counter.clear()
+        await client.post("/items/bulk/delete", json=payload)
+        assert len(query_counter) == 1
+
+
+# ---------------------------------------------------------------------------
+# GET and POST /items/batch
+# ---------------------------------------------------------------------------
+
+
+class TestReadItemBatch:
+    async def test_keeps_request_order_and_reports_missing(
+        self, client: AsyncClient, seeded_items: list[ItemModel]
+    ) -> None:
+        first, second = str(seeded_items[0].id), str(seeded_items[1].id)
+        unknown = str(uuid.uuid4())
+        response = await client.get(
+            "/items/batch", params={"ids": f"{second},{unknown},{first}"}
+        )
+        assert response.status_code == HTTP_200_OK
+        body = response.json()
+        assert [item["id"] for item in body["items"]] == [second, first]
+        assert body["missing"] == [unknown]
+
+    async def test_ids_may_be_separated_by_spaces(
+        self, client: AsyncClient, seeded_items: list[ItemModel]
+    ) -> None:
+        first, second = str(seeded_items[0].id), str(seeded_items[1].id)
+        response = await client.get(
+            "/items/batch", params={"ids": f"{first}, {second}"}
+        )
+        assert response.status_code == HTTP_200_OK
+        assert [item["id"] for item in response.json()["items"]] == [first, second]
+
+    async def test_items_match_single_reads(
+        self, client: AsyncClient, seeded_items: list[ItemModel]
+    ) -> None:
+        ids = [str(item.id) for item in seeded_items]
+        single = [(await client.get(f"/items/{item_id}")).json() for item_id in ids]
+        get_item_cache().clear()
+        response = await client.get("/items/batch", params={"ids": ",".join(ids)})
+        assert response.json()["items"] == single
+
+    async def test_single_query(
+        self,
+        client: AsyncClient,
+        seeded_items: list[ItemModel],
+        query_counter: list[str],
+    ) -> None:
+        ids = ",".join(str(item.id) for item in seeded_items)
+        query_counter.clear()
+        await client.get("/items/batch", params={"ids": ids})
+        assert len(query_counter) == 1
+
+    async def test_cached_items_are_not_queried(
+        self,
+        client: AsyncClient,
+        seeded_items: list[ItemModel],
+        query_counter: list[str],
+    ) -> None:
+        ids = ",".join(str(item.id) for item in seeded_items)
+        await client.get("/items/batch", params={"ids": ids})
+        query_counter.clear()
+        response = await client.get("/items/batch", params={"ids": ids})
+        assert len(response.json()["items"]) == len(seeded_items)
+        assert not query_counter
+
+    async def test_duplicate_ids_are_returned_once(
+        self, client: AsyncClient, seeded_item: ItemModel
+    ) -> None:
+        item_id = str(seeded_item.id)
+        response = await client.get(
+            "/items/batch", params={"ids": f"{item_id},{item_id}"}
+        )
+        assert [item["id"] for item in response.json()["items"]] == [item_id]
+
+    async def test_sparse_fields(
+        self, client: AsyncClient, seeded_item: ItemModel
+    ) -> None:
+        response = await client.get(
+            "/items/batch", params={"ids": str(seeded_item.id), "fields": "id,name"}
+        )
+        assert response.json()["items"] == [
+            {"id": str(seeded_item.id), "name": seeded_item.name}
+        ]
+
+    async def test_post_reads_ids_from_body(
+        self, client: AsyncClient, seeded_items: list[ItemModel]
+    ) -> None:
+        ids = [str(item.id) for item in reversed(seeded_items)]
+        response = await client.post("/items/batch", json=ids)
+        assert [item["id"] for item in response.json()["items"]] == ids
+
+    async def test_malformed_id_returns_422(self, client: AsyncClient) -> None:
+        response = await client.get("/items/batch", params={"ids": "not-a-uuid"})
+        assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
+
+    async def test_too_many_ids_returns_422(self, client: AsyncClient) -> None:
+        ids = ",".join(str(uuid.uuid4()) for _ in range(MAX_BATCH_QUERY_IDS + 1))
+        response = await client.get("/items/batch", params={"ids": ids})
+        assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
+
+
+# ---------------------------------------------------------------------------
+# GET /items/search
+# ---------------------------------------------------------------------------
+
+
+class TestSearchItems:
+    @pytest.fixture
+    async def catalog(self, test_session: AsyncSession) -> None:
+        test_session.add_all(
+            [
+                ItemModel(name="Walnut desk", description="Solid wood writing desk"),
+                ItemModel(name="Desk lamp", description="Adjustable reading lamp"),
+                ItemModel(name="Bookshelf", description="Walnut veneer, fits any desk"),
+            ]
+        )
+        await test_session.commit()
+
+    async def _names(self, client: AsyncClient, **params: str | int) -> list[str]:
+        response = await client.get("/items/search", params=params)
+        assert response.status_code == HTTP_200_OK
+        return [item["name"] for item in response.json()]
+
+    @pytest.mark.parametrize("params", [{"limit": 0}, {"offset": -1}])
+    async def test_out_of_range_page_returns_422(
+        self, client: AsyncClient, params: dict[str, int]
+    ) -> None:
+        response = await client.get("/items/search", params={"q": "desk"} | params)
+        assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
+
+    @pytest.mark.usefixtures("catalog")
+    async def test_name_matches_rank_first(self, client: AsyncClient) -> None:
+        assert await self._names(client, q="walnut") == ["Walnut desk", "Bookshelf"]
+
+    @pytest.mark.usefixtures("catalog")
+    async def test_partial_word_autocompletes(self, client: AsyncClient) -> None:
+        assert await self._names(client, q="la") == ["Desk lamp"]
+
+    @pytest.mark.usefixtures("catalog")
+    async def test_every_word_must_match(self, client: AsyncClient) -> None:
+        assert await self._names(client, q="desk wood") == ["Walnut desk"]
+
+    @pytest.mark.usefixtures("catalog")
+    async def test_paginates_ranked_results(self, client: AsyncClient) -> None:
+        everything = await self._names(client, q="desk")
+        assert sorted(everything) == ["Bookshelf", "Desk lamp", "Walnut desk"]
+        assert await self._names(client, q="desk", offset=1, limit=1) == [everything[1]]
+
+    @pytest.mark.usefixtures("catalog")
+    async def test_reports_latency(self, client: AsyncClient) -> None:
+        response = await client.get("/items/search", params={"q": "desk"})
+        assert response.headers["server-timing"].startswith("search;dur=")
+
+    @pytest.mark.usefixtures("catalog")
+    async def test_follows_item_writes(self, client: AsyncClient) -> None:
+        (lamp,) = (await client.get("/items/search", params={"q": "lamp"})).json()
+        await client.patch(
+            f"/items/{lamp['id']}", json={"name": "Desk light"}, headers=IF_UNMODIFIED
+        )
+        created = await client.post(
+            "/items/", json={"name": "Floor lamp", "price": 1.0}
+        )
+        assert created.status_code == HTTP_200_OK
+        assert await self._names(client, q="light") == ["Desk light"]
+        assert await self._names(client, q="lamp") == ["Floor lamp", "Desk light"]
+
+        (floor,) = (await client.get("/items/search", params={"q": "floor"})).json()
+        await client.delete(f"/items/{floor['id']}", headers=IF_UNMODIFIED)
+        assert await self._names(client, q="floor") == []
+
+    async def test_query_without_words_returns_422(self, client: AsyncClient) -> None:
+        response = await client.get("/items/search", params={"q": "!!"})
+        assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
+
+    def test_postgres_query_uses_the_indexed_document(self) -> None:
+        statement = postgres_search([ItemModel.id], "walnut de")
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        assert f"{SEARCH_DOCUMENT} @@ to_tsquery('simple'" in sql
+        assert "items.name %" in sql
+
+
+# ---------------------------------------------------------------------------
+# GET /items/stats
+# ---------------------------------------------------------------------------
+
+
+class TestItemStats:
+    async def test_empty_table(self, client: AsyncClient) -> None:
+        stats = (await client.get("/items/stats")).json()
+        assert stats["count"] == 0
+        assert stats["price_avg"] is None
+        assert len(stats["price_histogram"]) == len(PRICE_BUCKET_BOUNDS) + 1
+        assert all(bucket["count"] == 0 for bucket in stats["price_histogram"])
+
+    async def test_aggregates_items(
+        self, client: AsyncClient, seeded_items: list[ItemModel]
+    ) -> None:
+        stats = (await client.get("/items/stats")).json()
+        prices = [float(index) for index in range(len(seeded_items))]
+        assert stats["count"] == len(prices)
+        assert stats["price_sum"] == pytest.approx(sum(prices))
+        assert stats["price_avg"] == pytest.approx(sum(prices) / len(prices))
+        assert stats["tax_sum"] == 0
+        assert stats["price_histogram"][0] == {
+            "lower": 0.0,
+            "upper": PRICE_BUCKET_BOUNDS[0],
+            "count": len(prices),
+        }
+
+    async def test_follows_updates_and_deletes(
+        self, client: AsyncClient, seeded_items: list[ItemModel]
+    ) -> None:
+        moved, deleted = seeded_items[0].id, seeded_items[1].id
+        await client.patch(
+            f"/items/{moved}", json={"price": 75.0, "tax": 5.0}, headers=IF_UNMODIFIED
+        )
+        await client.delete(f"/items/{deleted}", headers=IF_UNMODIFIED)
+        stats = (await client.get("/items/stats")).json()
+        assert stats["count"] == len(seeded_items) - 1
+        assert stats["tax_sum"] == pytest.approx(5.0)
+        assert [bucket["count"] for bucket in stats["price_histogram"][:3]] == [
+            len(seeded_items) - 2,
+            0,
+            1,
+        ]
+
+    async def test_follows_bulk_writes(self, client: AsyncClient) -> None:
+        items = [{"name": f"Bulk {index}", "price": 600.0} for index in range(3)]
+        await client.post("/items/bulk", json=items)
+        stats = (await client.get("/items/stats")).json()
+        assert stats["price_histogram"][4]["count"] == len(items)
+
+    async def test_read_does_not_scan_items(
+        self,
+        client: AsyncClient,
+        seeded_items: list[ItemModel],
+        query_counter: list[str],
+    ) -> None:
+        query_counter.clear()
+        await client.get("/items/stats")
+        (statement,) = query_counter
+        assert "FROM item_stats" in statement
+        assert "FROM items" not in statement
+
+    async def test_writes_append_deltas_instead_of_updating_totals(
+        self,
+        seeded_items: list[ItemModel],
+        test_session: AsyncSession,
+    ) -> None:
+        assert await test_session.scalar(select(func.sum(ItemPriceBucket.count))) == 0
+        assert await test_session.scalar(
+            select(func.count()).select_from(ItemStatsDelta)
+        ) == len(seeded_items)
+
+    async def test_roll_up_folds_deltas_into_totals(
+        self,
+        client: AsyncClient,
+        seeded_items: list[ItemModel],
+        test_session: AsyncSession,
+    ) -> None:
+        before = (await client.get("/items/stats")).json()
+        assert await roll_up_item_stats(test_session) == len(seeded_items)
+        assert (
+            await test_session.scalar(select(func.count()).select_from(ItemStatsDelta))
+            == 0
+        )
+        assert (await client.get("/items/stats")).json() == before
+        assert await roll_up_item_stats(test_session) == 0
+
+    async def test_recompute_corrects_drift(
+        self,
+        client: AsyncClient,
+        seeded_items: list[ItemModel],
+        test_session: AsyncSession,
+    ) -> None:
+        await test_session.execute(delete(ItemStatsDelta))
+        await test_session.commit()
+        assert await recompute_item_stats(test_session) == len(seeded_items)
+        stats = (await client.get("/items/stats")).json()
+        assert stats["count"] == len(seeded_items)
+        assert await recompute_item_stats(test_session) == 0
+
+    async def test_count(
+        self, client: AsyncClient, seeded_items: list[ItemModel]
+    ) -> None:
+        response = await client.get("/items/stats/count")
+        assert response.json() == {"count": len(seeded_items), "approximate": False}
+
+    async def test_approximate_count_falls_back_to_exact_on_sqlite(
+        self, client: AsyncClient, seeded_items: list[ItemModel]
+    ) -> None:
+        response = await client.get("/items/stats/count", params={"approximate": True})
+        assert response.json() == {"count": len(seeded_items), "approximate": False}
+
+
+# ---------------------------------------------------------------------------
+# POST /items/import
+# ---------------------------------------------------------------------------
+
+
+class TestImportItems:
+    @staticmethod
+    def ndjson(count: int) -> bytes:
+        return "\n".join(
+            json.dumps({"name": f"Imported {index}", "price": index})
+            for index in range(count)
+        ).encode()
+
+    async def test_imports_ndjson(self, client: AsyncClient) -> None:
+        response = await client.post(
+            "/items/import",
+            files={
+                "import_file": ("items.ndjson", self.ndjson(3), "application/x-ndjson")
+            },
+        )
+        assert response.status_code == HTTP_200_OK
+        assert response.json() == {"imported": 3, "rejected": 0, "errors": []}
+        listing = await client.get("/items/")
+        assert sorted(item["name"] for item in listing.json()) == [
+            "Imported 0",
+            "Imported 1",
+            "Imported 2",
+        ]
+
+    async def test_imported_ids_follow_file_order(self, client: AsyncClient) -> None:
+        await client.post(
+            "/items/import",
+            files={
+                "import_file": ("items.ndjson", self.ndjson(5), "application/x-ndjson")
+            },
+        )
+        listing = (await client.get("/items/")).json()
+        assert [item["name"] for item in listing] == [
+            f"Imported {index}" for index in range(5)
+        ]
+        assert {uuid.UUID(item["id"]).version for item in listing} == {7}
+
+    async def test_imports_csv(self, client: AsyncClient) -> None:
+        content = (
+            b"name,description,price,tax\n"
+            b'Chair,"A comfortable, wooden chair",25.5,2\n'
+            b"Table,,80,\n"
+        )
+        response = await client.post(
+            "/items/import", files={"import_file": ("items.csv", content, "text/csv")}
+        )
+        assert response.json()["imported"] == len(content.splitlines()) - 1
+        listing = (await client.get("/items/")).json()
+        by_name = {item["name"]: item for item in listing}
+        assert by_name["Chair"]["description"] == "A comfortable, wooden chair"
+        assert by_name["Table"]["description"] == "No description provided"
+
+    async def test_reports_invalid_rows(self, client: AsyncClient) -> None:
+        content = b'{"name": "Valid", "price": 1}\n{"name": "No"}\nnot json\n'
+        response = await client.post(
+            "/items/import",
+            files={"import_file": ("items.ndjson", content, "application/x-ndjson")},
+        )
+        body = response.json()
+        assert body["imported"] == 1
+        assert body["rejected"] == len(body["errors"])
+        assert [error["line"] for error in body["errors"]] == [2, 3]
+
+    async def test_format_query_overrides_extension(self, client: AsyncClient) -> None:
+        response = await client.post(
+            "/items/import",
+            params={"format": "csv"},
+            files={
+                "import_file": ("dump.txt", b"name,price\nBench,10\n", "text/plain")
+            },
+        )
+        assert response.json()["imported"] == 1
+
+    async def test_writes_in_batches(
+        self,
+        client: AsyncClient,
+        query_counter: list[str],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(settings, "item_import_batch_size", 2)
+        await client.post(
+            "/items/import",
+            files={
+                "import_file": ("items.ndjson", self.ndjson(5), "application/x-ndjson")
+            },
+        )
+        inserts = [statement for statement in query_counter if "INSERT" in statement]
+        expected_batches = 3
+        assert len(inserts) == expected_batches
+
+    async def test_non_utf8_returns_422(self, client: AsyncClient) -> None:
+        response = await client.post(
+            "/items/import",
+            files={
+                "import_file": ("items.ndjson", b"\xff\xfe\x00", "application/x-ndjson")
+            },
+        )
+        assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
+
+
+# ---------------------------------------------------------------------------
+# GET /items/export
+# ---------------------------------------------------------------------------
+
+
+class TestExportItems:
+    async def test_ndjson_streams_every_row(
+        self, client: AsyncClient, seeded_items: list[ItemModel]
+    ) -> None:
+        response = await client.get("/items/export")
+        assert response.status_code == HTTP_200_OK
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["name"] for row in rows] == [item.name for item in seeded_items]
+        assert rows[0]["id"] == str(seeded_items[0].id)
+
+    async def test_csv_has_header_and_rows(
+        self,
+        client: AsyncClient,
+        seeded_items: list[ItemModel],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(settings, "item_export_chunk_size", 2)
+        response = await client.get("/items/export", params={"format": "csv"})
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [row["name"] for row in rows] == [item.name for item in seeded_items]
+        assert float(rows[3]["price"]) == seeded_items[3].price
+
+    async def test_csv_empty_table_has_header(self, client: AsyncClient) -> None:
+        response = await client.get("/items/export", params={"format": "csv"})
+        assert response.text.startswith("id,name,description")
+
+    async def test_arrow_stream_round_trips(
+        self,
+        client: AsyncClient,
+        seeded_items: list[ItemModel],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(settings, "item_export_chunk_size", 2)
+        response = await client.get("/items/export", params={"format": "arrow"})
+        table = pa.ipc.open_stream(response.content).read_all()
+        assert table.column("name").to_pylist() == [item.name for item in seeded_items]
+        assert table.num_rows == len(seeded_items)
+
+    async def test_unknown_format_returns_422(self, client: AsyncClient) -> None:
+        response = await client.get("/items/export", params={"format": "xml"})
+        assert response.status_code == HTTP_422_UNPROCESSABLE_CONTENT
@@ -14,3 +14,23 @@ class TestHelloWorld:
     async def test_response_body(self, client: AsyncClient) -> None:
         response = await client.get("/")
         assert response.json() == {"message": "Hello World"}
+
+
+# ---------------------------------------------------------------------------
+# GET /metrics
+# ---------------------------------------------------------------------------
+
+
+class TestMetrics:
+    async def test_reports_item_cache(self, client: AsyncClient) -> None:
+        response = await client.get("/metrics")
+        assert response.status_code == HTTP_200_OK
+        assert "hits" in response.json()["items.cache"]
+
+    async def test_reports_image_variant_pipeline(self, client: AsyncClient) -> None:
+        response = await client.get("/metrics")
+        assert "queue_depth" in response.json()["items.image_variants"]
+
+    async def test_reports_item_stats_recomputes(self, client: AsyncClient) -> None:
+        response = await client.get("/metrics")
+        assert "last_count_drift" in response.json()["items.stats"]
@@ -0,0 +1,150 @@
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.status import (
+    HTTP_200_OK,
+    HTTP_206_PARTIAL_CONTENT,
+    HTTP_304_NOT_MODIFIED,
+)
+
+from learn_fastapi.src.static_files import (
+    IMMUTABLE_CACHE_CONTROL,
+    REVALIDATE_CACHE_CONTROL,
+    ZEROCOPY_EXTENSION,
+    CachedFileResponse,
+    CachedStaticFiles,
+)
+
+HASHED_NAME = "ab" * 32 + ".png"
+
+# ---------------------------------------------------------------------------
+# CachedStaticFiles
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+async def static_client(tmp_path: Path) -> AsyncGenerator[AsyncClient]:
+    """Serve a temporary directory through CachedStaticFiles.
+
+    Yields:
+        AsyncClient bound to a minimal app mounting the directory at /static.
+
+    """
+    (tmp_path / HASHED_NAME).write_bytes(b"hashed")
+    (tmp_path / "logo.png").write_bytes(b"plain")
+    app = Starlette(routes=[Mount("/static", CachedStaticFiles(directory=tmp_path))])
+    async with AsyncClient(
+        transport=ASGITransport(app), base_url="http://testserver"
+    ) as async_client:
+        yield async_client
+
+
+class TestCachedStaticFiles:
+    async def test_hashed_names_are_immutable(self, static_client: AsyncClient) -> None:
+        response = await static_client.get(f"/static/{HASHED_NAME}")
+        assert response.status_code == HTTP_200_OK
+        assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+    async def test_hashed_names_use_their_name_as_etag(
+        self, static_client: AsyncClient
+    ) -> None:
+        response = await static_client.get(f"/static/{HASHED_NAME}")
+        assert response.headers["etag"] == f'"{HASHED_NAME}"'
+
+    async def test_other_names_are_revalidated(
+        self, static_client: AsyncClient
+    ) -> None:
+        response = await static_client.get("/static/logo.png")
+        assert response.status_code == HTTP_200_OK
+        assert response.headers["cache-control"] == REVALIDATE_CACHE_CONTROL
+
+    @pytest.mark.parametrize("path", [f"/static/{HASHED_NAME}", "/static/logo.png"])
+    async def test_matching_etag_returns_304(
+        self, static_client: AsyncClient, path: str
+    ) -> None:
+        etag = (await static_client.get(path)).headers["etag"]
+        response = await static_client.get(path, headers={"If-None-Match": etag})
+        assert response.status_code == HTTP_304_NOT_MODIFIED
+        assert not response.content
+        assert response.headers["etag"] == etag
+
+    async def test_unmodified_since_returns_304(
+        self, static_client: AsyncClient
+    ) -> None:
+        last_modified = (await static_client.get("/static/logo.png")).headers[
+            "last-modified"
+        ]
+        response = await static_client.get(
+            "/static/logo.png", headers={"If-Modified-Since": last_modified}
+        )
+        assert response.status_code == HTTP_304_NOT_MODIFIED
+
+    async def test_stale_etag_returns_file(self, static_client: AsyncClient) -> None:
+        response = await static_client.get(
+            "/static/logo.png", headers={"If-None-Match": '"stale"'}
+        )
+        assert response.status_code == HTTP_200_OK
+        assert response.content == b"plain"
+
+    async def test_range_returns_partial_content(
+        self, static_client: AsyncClient
+    ) -> None:
+        response = await static_client.get(
+            f"/static/{HASHED_NAME}", headers={"Range": "bytes=2-"}
+        )
+        assert response.status_code == HTTP_206_PARTIAL_CONTENT
+        assert response.content == b"shed"
+        assert response.headers["content-range"] == "bytes 2-5/6"
+
+
+# ---------------------------------------------------------------------------
+# CachedFileResponse zero-copy send
+# ---------------------------------------------------------------------------
+
+
+class TestZeroCopySend:
+    @staticmethod
+    async def call(path: Path, headers: list[tuple[bytes, bytes]]) -> list[dict]:
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "headers": headers,
+            "extensions": {ZEROCOPY_EXTENSION: {}},
+        }
+        messages: list[dict] = []
+
+        async def receive() -> dict:
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message: dict) -> None:
+            if message["type"] == ZEROCOPY_EXTENSION:
+                message["file"].seek(message["offset"])
+                message = message | {"body": message["file"].read(message["count"])}
+            messages.append(message)
+
+        await CachedFileResponse(path)(scope, receive, send)
+        return messages
+
+    async def test_whole_file_is_sent_as_a_file_descriptor(
+        self, tmp_path: Path
+    ) -> None:
+        path = tmp_path / HASHED_NAME
+        path.write_bytes(b"zero-copy")
+        start, body = await self.call(path, [])
+        assert start["status"] == HTTP_200_OK
+        assert body["type"] == ZEROCOPY_EXTENSION
+        assert body["body"] == b"zero-copy"
+
+    async def test_range_is_sent_as_offset_and_count(self, tmp_path: Path) -> None:
+        path = tmp_path / HASHED_NAME
+        path.write_bytes(b"zero-copy")
+        start, body = await self.call(path, [(b"range", b"bytes=5-8")])
+        range_length = 4
+        assert start["status"] == HTTP_206_PARTIAL_CONTENT
+        assert (body["offset"], body["count"]) == (5, range_length)
+        assert body["body"] == b"copy"
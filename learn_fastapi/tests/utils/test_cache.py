@@ -0,0 +1,57 @@
+import pytest
+
+from learn_fastapi.src.utils import cache as cache_module
+from learn_fastapi.src.utils.cache import LRUCache
+
+# ---------------------------------------------------------------------------
+# LRUCache
+# ---------------------------------------------------------------------------
+
+
+class TestLRUCache:
+    def test_get_missing_key_counts_miss(self) -> None:
+        cache: LRUCache[str, int] = LRUCache(max_size=2, ttl=60)
+        assert cache.get("missing") is None
+        assert cache.stats()["misses"] == 1
+
+    def test_get_stored_value_counts_hit(self) -> None:
+        cache: LRUCache[str, int] = LRUCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert cache.stats()["hits"] == 1
+
+    def test_evicts_least_recently_used(self) -> None:
+        cache: LRUCache[str, int] = LRUCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats()["evictions"] == 1
+
+    def test_expired_entry_is_a_miss(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        now = 1000.0
+        monkeypatch.setattr(cache_module.time, "monotonic", lambda: now)
+        cache: LRUCache[str, int] = LRUCache(max_size=2, ttl=10)
+        cache.set("a", 1)
+        now += 11
+        assert cache.get("a") is None
+        assert cache.stats()["size"] == 0
+
+    def test_per_entry_ttl_overrides_default(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        now = 1000.0
+        monkeypatch.setattr(cache_module.time, "monotonic", lambda: now)
+        cache: LRUCache[str, int] = LRUCache(max_size=2, ttl=10)
+        cache.set("a", 1, ttl=60)
+        now += 30
+        assert cache.get("a") == 1
+
+    def test_delete_removes_entry(self) -> None:
+        cache: LRUCache[str, int] = LRUCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.delete("a")
+        cache.delete("a")
+        assert cache.get("a") is None
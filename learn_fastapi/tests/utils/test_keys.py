@@ -0,0 +1,98 @@
+import uuid
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from learn_fastapi.src.auth.models import RefreshToken, User
+from learn_fastapi.src.auth.refresh import issue_refresh_token
+from learn_fastapi.src.items.models import Item
+from learn_fastapi.src.utils.keys import UUID7_VERSION, rekey_to_uuid7, uuid7_at
+
+# ---------------------------------------------------------------------------
+# UUIDv7 keys
+# ---------------------------------------------------------------------------
+
+
+class TestUUID7Keys:
+    async def test_new_rows_get_time_ordered_ids(
+        self, test_session: AsyncSession
+    ) -> None:
+        for name in ("first", "second", "third"):
+            test_session.add(Item(name=name))
+            await test_session.commit()
+
+        by_id = (await test_session.scalars(select(Item).order_by(Item.id))).all()
+        assert [item.name for item in by_id] == ["first", "second", "third"]
+        assert {item.id.version for item in by_id} == {UUID7_VERSION}
+
+    def test_uuid7_at_sorts_by_time(self) -> None:
+        moment = datetime(2026, 1, 1, tzinfo=UTC)
+        earlier = uuid7_at(moment)
+        later = uuid7_at(moment + timedelta(milliseconds=1))
+        assert earlier.version == UUID7_VERSION
+        assert earlier < later
+
+    def test_uuid7_at_reads_naive_times_as_utc(self) -> None:
+        naive = datetime(2026, 1, 1, 12)  # noqa: DTZ001
+        assert (
+            uuid7_at(naive).int >> 80 == uuid7_at(naive.replace(tzinfo=UTC)).int >> 80
+        )
+
+
+# ---------------------------------------------------------------------------
+# rekey_to_uuid7
+# ---------------------------------------------------------------------------
+
+
+class TestRekeyToUUID7:
+    async def test_rekeys_random_ids_in_creation_order(
+        self, test_session: AsyncSession
+    ) -> None:
+        start = datetime(2026, 1, 1, tzinfo=UTC)
+        # Two rows share a millisecond; "kept" already has a UUIDv7 id
+        created = {
+            "a": start,
+            "b": start + timedelta(microseconds=10),
+            "kept": start + timedelta(seconds=1),
+            "c": start + timedelta(seconds=2),
+        }
+        kept_id = uuid7_at(created["kept"])
+        for name, created_at in created.items():
+            item_id = kept_id if name == "kept" else uuid.uuid4()
+            test_session.add(Item(id=item_id, name=name, created_at=created_at))
+        await test_session.commit()
+
+        assert await rekey_to_uuid7(test_session, Item) == len(created) - 1
+
+        by_id = (
+            await test_session.execute(select(Item.id, Item.name).order_by(Item.id))
+        ).all()
+        assert [name for _, name in by_id] == ["a", "b", "kept", "c"]
+        assert {item_id.version for item_id, _ in by_id} == {UUID7_VERSION}
+        assert by_id[2] == (kept_id, "kept")
+
+    async def test_second_run_changes_nothing(self, test_session: AsyncSession) -> None:
+        test_session.add(Item(id=uuid.uuid4(), name="old"))
+        await test_session.commit()
+
+        assert await rekey_to_uuid7(test_session, Item) == 1
+        assert await rekey_to_uuid7(test_session, Item) == 0
+
+    async def test_refresh_tokens_follow_rekeyed_users(
+        self, test_async_engine: AsyncEngine
+    ) -> None:
+        async with test_async_engine.connect() as connection:
+            await connection.exec_driver_sql("PRAGMA foreign_keys = ON")
+            session = AsyncSession(bind=connection)
+            user = User(id=uuid.uuid4(), email="old@example.com", password_hash="")
+            session.add(user)
+            await session.flush()
+            issue_refresh_token(session, user.id, uuid.uuid7())
+            await session.commit()
+
+            assert await rekey_to_uuid7(session, User) == 1
+
+            user_id = await session.scalar(select(User.id))
+            assert await session.scalar(select(RefreshToken.user_id)) == user_id
+            await session.close()